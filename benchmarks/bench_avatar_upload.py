@@ -0,0 +1,77 @@
+"""
+Measure the avatar upload pipeline against local storage.
+
+    python -m benchmarks.bench_avatar_upload --uploads 50 --width 4000 --height 3000
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from io import BytesIO
+
+from fastapi import UploadFile
+from PIL import Image
+
+from src.services.storage import LocalStorage
+from src.services.upload_file import UploadFileService
+
+
+def make_photo(width: int, height: int, seed: int) -> bytes:
+    """
+    Encode a noisy JPEG that resembles a phone photo in size.
+
+    Args:
+        width (int): Image width in pixels.
+        height (int): Image height in pixels.
+        seed (int): Varies the content so every photo hashes differently.
+
+    Returns:
+        bytes: The JPEG.
+    """
+    image = Image.effect_noise((width, height), 64 + seed % 64).convert("RGB")
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+async def upload_all(service: UploadFileService, photos: list) -> float:
+    """
+    Upload photos one after another.
+
+    Args:
+        service (UploadFileService): The upload service.
+        photos (list): Encoded photos.
+
+    Returns:
+        float: Average latency in milliseconds.
+    """
+    start = time.perf_counter()
+    for data in photos:
+        await service.upload_file(UploadFile(filename="a.jpg", file=BytesIO(data)))
+    return (time.perf_counter() - start) / len(photos) * 1000
+
+
+async def run(args) -> None:
+    photos = [make_photo(args.width, args.height, i) for i in range(args.uploads)]
+    with tempfile.TemporaryDirectory() as root:
+        storage = LocalStorage(root, "/media")
+        service = UploadFileService(storage)
+        unique_ms = await upload_all(service, photos)
+        repeat_ms = await upload_all(service, photos)
+
+    print(f"input size:         {sum(map(len, photos)) / len(photos) / 1e6:8.2f} MB")
+    print(f"new avatar:         {unique_ms:8.2f} ms/upload")
+    print(f"already stored:     {repeat_ms:8.2f} ms/upload")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--uploads", type=int, default=20)
+    parser.add_argument("--width", type=int, default=4000)
+    parser.add_argument("--height", type=int, default=3000)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Compare response_model serialization of a contact page with the TypeAdapter path.
+
+    python -m benchmarks.bench_contact_serialization --contacts 1000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import date
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from src.api.responses import contact_list_response
+from src.database.models import Contact
+from src.schemas import ContactResponse
+
+
+def make_contacts(count: int) -> List[Contact]:
+    """
+    Build detached contact rows.
+
+    Args:
+        count (int): Number of contacts.
+
+    Returns:
+        List[Contact]: The contacts.
+    """
+    return [
+        Contact(
+            id=i,
+            first_name="John",
+            last_name="Doe",
+            email=f"john.doe{i}@example.com",
+            phone_number="+380501234567",
+            birthday=date(1990, 1, 1 + i % 28),
+            additional_info="Met at the conference",
+        )
+        for i in range(count)
+    ]
+
+
+def per_call_ms(func, iterations: int) -> float:
+    """
+    Measure the average latency of a function.
+
+    Args:
+        func (Callable[[], Any]): The function to measure.
+        iterations (int): Number of calls.
+
+    Returns:
+        float: Average latency in milliseconds.
+    """
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--contacts", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    contacts = make_contacts(args.contacts)
+    field = create_model_field(
+        name="Response", type_=List[ContactResponse], mode="serialization"
+    )
+    loop = asyncio.new_event_loop()
+
+    def response_model_path() -> bytes:
+        # What FastAPI does for a route that returns ORM objects.
+        content = loop.run_until_complete(
+            serialize_response(field=field, response_content=contacts)
+        )
+        return JSONResponse(content).body
+
+    def adapter_path() -> bytes:
+        return contact_list_response(contacts).body
+
+    assert json.loads(response_model_path()) == json.loads(adapter_path())
+
+    before = per_call_ms(response_model_path, args.iterations)
+    after = per_call_ms(adapter_path, args.iterations)
+    loop.close()
+
+    print(f"response_model + json: {before:8.2f} ms/page")
+    print(f"TypeAdapter.dump_json: {after:8.2f} ms/page")
+    print(f"speedup:               {before / after:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Measure bcrypt hash and verify latency for a range of cost factors.
+
+Run it on the deployment host to pick a ``BCRYPT_ROUNDS`` value that fits the
+login latency budget:
+
+    python -m benchmarks.bench_password_hash --min-rounds 10 --max-rounds 14
+"""
+
+import argparse
+import statistics
+import time
+
+from passlib.context import CryptContext
+
+
+def measure(func, iterations: int) -> list[float]:
+    """
+    Call a function repeatedly and collect its latency.
+
+    Args:
+        func (Callable[[], Any]): The function to measure.
+        iterations (int): Number of calls.
+
+    Returns:
+        list[float]: Latency of every call in milliseconds.
+    """
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--min-rounds", type=int, default=10)
+    parser.add_argument("--max-rounds", type=int, default=14)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--password", default="correct horse battery staple")
+    args = parser.parse_args()
+
+    print(f"{'rounds':>6} {'hash p50 ms':>12} {'hash max ms':>12} {'verify p50 ms':>14}")
+    for rounds in range(args.min_rounds, args.max_rounds + 1):
+        context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds)
+        hashed = context.hash(args.password)
+        hash_times = measure(lambda: context.hash(args.password), args.iterations)
+        verify_times = measure(
+            lambda: context.verify(args.password, hashed), args.iterations
+        )
+        print(
+            f"{rounds:>6} {statistics.median(hash_times):>12.1f} "
+            f"{max(hash_times):>12.1f} {statistics.median(verify_times):>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Compare one SMTP connection per email with pooled, batched delivery.
+
+    python -m benchmarks.bench_smtp_throughput --messages 500 --connections 4
+"""
+
+import argparse
+import asyncio
+import socket
+import time
+
+from aiosmtpd.controller import Controller
+from aiosmtpd.handlers import Sink
+from fastapi_mail import ConnectionConfig
+
+from src.services.email import build_verification_email, conf
+from src.services.smtp import SMTPConnectionPool
+
+
+def local_config(port: int) -> ConnectionConfig:
+    """
+    Build the settings of a plain-text local SMTP server.
+
+    Args:
+        port (int): Port of the server on 127.0.0.1.
+
+    Returns:
+        ConnectionConfig: SMTP settings.
+    """
+    return ConnectionConfig(
+        MAIL_USERNAME="",
+        MAIL_PASSWORD="",
+        MAIL_FROM="noreply@example.com",
+        MAIL_PORT=port,
+        MAIL_SERVER="127.0.0.1",
+        MAIL_STARTTLS=False,
+        MAIL_SSL_TLS=False,
+        USE_CREDENTIALS=False,
+        VALIDATE_CERTS=False,
+        TEMPLATE_FOLDER=conf.TEMPLATE_FOLDER,
+    )
+
+
+async def per_message(config: ConnectionConfig, messages: list) -> None:
+    """Send every message over its own connection, as FastMail does."""
+    for message in messages:
+        pool = SMTPConnectionPool(config, size=1)
+        await pool.send(message)
+        await pool.close()
+
+
+async def pooled(config: ConnectionConfig, messages: list, connections: int) -> None:
+    """Split the messages across pooled connections and send them in batches."""
+    pool = SMTPConnectionPool(config, size=connections, max_messages=len(messages))
+    chunks = [messages[i::connections] for i in range(connections)]
+    await asyncio.gather(*(pool.send_many(chunk) for chunk in chunks))
+    await pool.close()
+
+
+async def run(args) -> None:
+    messages = [
+        await build_verification_email(f"user{i}@example.com", "user", "http://h/")
+        for i in range(args.messages)
+    ]
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    controller = Controller(Sink(), hostname="127.0.0.1", port=port)
+    controller.start()
+    config = local_config(port)
+    try:
+        start = time.perf_counter()
+        await per_message(config, messages)
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        await pooled(config, messages, args.connections)
+        batched = time.perf_counter() - start
+    finally:
+        controller.stop()
+
+    print(f"connection per email: {args.messages / single:8.0f} emails/s")
+    print(f"pooled, batched:      {args.messages / batched:8.0f} emails/s")
+    print(f"speedup:              {single / batched:8.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--connections", type=int, default=4)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
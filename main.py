@@ -1,8 +1,16 @@
 import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from src.api import contants, utils, auth, users
+from src.api import admin, contants, utils, auth, users
 from fastapi.staticfiles import StaticFiles
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
+from src.conf.config import settings
+from src.metrics import metrics_endpoint
+from src.middleware.compression import CompressionMiddleware
+from src.middleware.metrics import MetricsMiddleware
+from src.middleware.profiling import ProfilingMiddleware, profile_store
+from src.middleware.query_stats import QueryStatsMiddleware
+from src.services.storage import ImmutableStaticFiles
 
 app = FastAPI()
 origins = ["<http://localhost:8000>"]
@@ -13,15 +21,37 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(
+    CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE
+)
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(
+    ProfilingMiddleware,
+    store=profile_store,
+    sample_rate=settings.PROFILING_SAMPLE_RATE,
+    interval=settings.PROFILING_INTERVAL,
+)
+app.add_middleware(ProxyHeadersMiddleware, trusted_hosts=settings.FORWARDED_ALLOW_IPS)
 
 app.include_router(utils.router, prefix="/api")
 app.include_router(contants.router, prefix="/api")
 app.include_router(auth.router, prefix="/api")
 app.include_router(users.router, prefix="/api")
+app.include_router(admin.router, prefix="/api")
+app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
 
 docs_path = os.path.join(os.path.dirname(__file__), "docs", "_build", "html")
 app.mount("/docs-html", StaticFiles(directory=docs_path, html=True), name="docs-html")
 
+if settings.AVATAR_STORAGE == "local":
+    os.makedirs(settings.MEDIA_ROOT, exist_ok=True)
+    app.mount(
+        settings.MEDIA_URL,
+        ImmutableStaticFiles(directory=settings.MEDIA_ROOT),
+        name="media",
+    )
+
 if __name__ == "__main__":
     import uvicorn
 
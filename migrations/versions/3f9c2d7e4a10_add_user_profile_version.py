@@ -0,0 +1,33 @@
+"""add user profile version
+
+Revision ID: 3f9c2d7e4a10
+Revises: 7ab1d4939112
+Create Date: 2026-10-19 09:12:04.118274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2d7e4a10'
+down_revision: Union[str, None] = '7ab1d4939112'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column(
+        'profile_version',
+        sa.Integer(),
+        server_default='1',
+        nullable=False
+    ))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'profile_version')
@@ -0,0 +1,32 @@
+"""drop user refresh token
+
+Revision ID: a84e51c0d2b7
+Revises: 3f9c2d7e4a10
+Create Date: 2026-10-19 11:40:52.603917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a84e51c0d2b7'
+down_revision: Union[str, None] = '3f9c2d7e4a10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_column('users', 'refresh_token')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('users', sa.Column(
+        'refresh_token',
+        sa.String(length=255),
+        nullable=True
+    ))
@@ -0,0 +1,72 @@
+"""add contact sync columns and tombstones
+
+Revision ID: c5e81f2a9d43
+Revises: a84e51c0d2b7
+Create Date: 2026-10-19 14:05:31.482916
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e81f2a9d43'
+down_revision: Union[str, None] = 'a84e51c0d2b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('contacts', sa.Column(
+        'updated_at',
+        sa.DateTime(timezone=True),
+        server_default=sa.text('now()'),
+        nullable=False
+    ))
+    op.add_column('contacts', sa.Column(
+        'version',
+        sa.Integer(),
+        server_default='1',
+        nullable=False
+    ))
+    op.create_index(
+        'ix_contacts_user_id_updated_at',
+        'contacts',
+        ['user_id', 'updated_at'],
+        unique=False
+    )
+    op.create_table(
+        'contact_tombstones',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('contact_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column(
+            'deleted_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.text('now()'),
+            nullable=False
+        ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_contact_tombstones_user_id_deleted_at',
+        'contact_tombstones',
+        ['user_id', 'deleted_at'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        'ix_contact_tombstones_user_id_deleted_at',
+        table_name='contact_tombstones'
+    )
+    op.drop_table('contact_tombstones')
+    op.drop_index('ix_contacts_user_id_updated_at', table_name='contacts')
+    op.drop_column('contacts', 'version')
+    op.drop_column('contacts', 'updated_at')
@@ -0,0 +1,105 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.db import get_db, sessionmanager
+from src.middleware.profiling import profile_store
+from src.schemas import Principal, RequestProfile, SlowQueryPlan, User, UserRoleUpdate
+from src.services.auth import get_current_admin_user
+from src.services.users import UserService
+
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/slow-queries", response_model=List[SlowQueryPlan])
+async def slow_queries(user: Principal = Depends(get_current_admin_user)):
+    """
+    List the execution plans captured for slow read statements, newest first.
+
+    Plans are kept in memory by each worker process, so the list covers the
+    process that serves the request. It is empty when capture is disabled.
+
+    Args:
+        user (Principal): The authenticated admin principal.
+
+    Returns:
+        List[SlowQueryPlan]: The captured plans.
+    """
+    if sessionmanager.plan_capture is None:
+        return []
+    return sessionmanager.plan_capture.snapshot()
+
+
+@router.get("/profiles", response_model=List[RequestProfile])
+async def profiles(user: Principal = Depends(get_current_admin_user)):
+    """
+    List the request profiles kept by this process, newest first.
+
+    Args:
+        user (Principal): The authenticated admin principal.
+
+    Returns:
+        List[RequestProfile]: The stored profiles.
+    """
+    return profile_store.list()
+
+
+@router.get("/profiles/{profile_id}", response_class=Response)
+async def profile(profile_id: str, user: Principal = Depends(get_current_admin_user)):
+    """
+    Download a request profile for https://www.speedscope.app.
+
+    Args:
+        profile_id (str): The id from ``X-Profile-Id`` or the profile list.
+        user (Principal): The authenticated admin principal.
+
+    Raises:
+        HTTPException: If the profile is not stored by this process.
+
+    Returns:
+        Response: The profile in the speedscope JSON format.
+    """
+    content = profile_store.render(profile_id)
+    if content is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found"
+        )
+    filename = f"{profile_id}.speedscope.json"
+    return Response(
+        content=content,
+        media_type="application/json",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.put("/users/role", response_model=User)
+async def update_user_role(
+    body: UserRoleUpdate,
+    user: Principal = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Change the role of a user.
+
+    Access tokens embedding the previous role are reloaded from the database
+    on their next use, so the change applies without waiting for them to expire.
+
+    Args:
+        body (UserRoleUpdate): The user's email and the new role.
+        user (Principal): The authenticated admin principal.
+        db (AsyncSession): The database session.
+
+    Raises:
+        HTTPException: If the user does not exist.
+
+    Returns:
+        User: The updated user.
+    """
+    user_service = UserService(db)
+    if await user_service.get_user_by_email(body.email) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+        )
+    return await user_service.update_role(body.email, body.role)
@@ -1,8 +1,12 @@
+import logging
+from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status, Request, BackgroundTasks
 from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from src.services.auth import generate_reset_token
 from jose import JWTError, jwt
+from redis.exceptions import RedisError
 from src.schemas import (
     UserCreate,
     Token,
@@ -10,35 +14,53 @@ from src.schemas import (
     RequestEmail,
     TokenRefreshRequest,
     ResetPasswordRequest,
+    RefreshSession,
+    Principal,
 )
 from src.services.auth import (
     create_access_token,
-    create_refresh_token,
-    verify_refresh_token,
     Hash,
     get_email_from_token,
+    rehash_password,
+    access_token_claims,
+    authenticate_token,
+    get_current_principal,
+    oauth2_scheme,
 )
+from src.services.sessions import RefreshSessionService
 from src.services.users import UserService
-from src.services.email import send_email, send_password_reset_email
+from src.services.rate_limit import rate_limit, EMAIL_COST, LOGIN_COST
+from src.services.login_throttle import login_throttle
+from src.cache.client import redis_client
+from src.cache.revocation import revocation_list
+from src.services.outbox import PASSWORD_RESET, VERIFY_EMAIL, email_outbox
 from src.database.db import get_db
 from src.conf.config import settings
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
-@router.post("/register", response_model=User, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/register",
+    response_model=User,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(rate_limit(EMAIL_COST))],
+)
 async def register_user(
     user_data: UserCreate,
-    background_tasks: BackgroundTasks,
     request: Request,
     db: Session = Depends(get_db),
 ):
     """
     Register a new user and send an email verification link.
 
+    The account is created even if the email cannot be queued; the user can
+    ask for a new link through ``/request_email``.
+
     Args:
         user_data (UserCreate): User registration information.
-        background_tasks (BackgroundTasks): Background task handler to send emails.
         request (Request): HTTP request object for URL generation.
         db (Session): SQLAlchemy session for database interaction.
 
@@ -65,20 +87,41 @@ async def register_user(
         )
     user_data.password = Hash().get_password_hash(user_data.password)
     new_user = await user_service.create_user(user_data)
-    background_tasks.add_task(
-        send_email, new_user.email, new_user.username, request.base_url
-    )
+    if await email_outbox.reserve(VERIFY_EMAIL, new_user.email):
+        try:
+            await email_outbox.send_verification(
+                new_user.email, new_user.username, str(request.base_url)
+            )
+        except RedisError as e:
+            logger.warning("Could not queue verification email: %s", e)
+            await email_outbox.release(VERIFY_EMAIL, new_user.email)
     return new_user
 
 
-@router.post("/login", response_model=Token)
+@router.post(
+    "/login",
+    response_model=Token,
+    dependencies=[Depends(rate_limit(LOGIN_COST))],
+)
 async def login_user(
-    form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
+    request: Request,
+    background_tasks: BackgroundTasks,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: Session = Depends(get_db),
 ):
     """
     Authenticate a user and issue access and refresh tokens.
 
+    Each login starts a new refresh session, so sessions on other devices
+    stay valid. If the stored password hash was created with an outdated
+    bcrypt cost, it is re-hashed in the background with the current policy.
+
+    Repeated failures for a username or client IP block further attempts
+    with an exponentially growing delay, before any password is checked.
+
     Args:
+        request (Request): HTTP request used to identify the client.
+        background_tasks (BackgroundTasks): Background task handler to re-hash passwords.
         form_data (OAuth2PasswordRequestForm): User credentials from form.
         db (Session): SQLAlchemy session for database interaction.
 
@@ -86,11 +129,24 @@ async def login_user(
         Token: Access and refresh tokens for the authenticated user.
 
     Raises:
-        HTTPException: If credentials are invalid or email is unverified.
+        HTTPException: If credentials are invalid, email is unverified or
+            too many attempts have failed.
     """
+    client_ip = request.client.host if request.client else "unknown"
+    retry_after = await login_throttle.retry_after(form_data.username, client_ip)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many failed login attempts",
+            headers={"Retry-After": str(retry_after)},
+        )
     user_service = UserService(db)
     user = await user_service.get_user_by_username(form_data.username)
-    if not user or not Hash().verify_password(form_data.password, user.hashed_password):
+    hasher = Hash()
+    if not user or not await run_in_threadpool(
+        hasher.verify_password, form_data.password, user.hashed_password
+    ):
+        await login_throttle.register_failure(form_data.username, client_ip)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect login or password",
@@ -101,12 +157,15 @@ async def login_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email is not verified",
         )
-    access_token = await create_access_token(data={"sub": user.username})
-    refresh_token = await create_refresh_token(data={"sub": user.username})
-    user.refresh_token = refresh_token
-    db.add(user)
-    await db.commit()
-    await db.refresh(user)
+    await login_throttle.reset(user.username)
+    if hasher.needs_update(user.hashed_password):
+        background_tasks.add_task(rehash_password, user.email, form_data.password)
+    epoch = await revocation_list.current_epoch(user.username)
+    session_id, refresh_token = await RefreshSessionService(
+        redis_client
+    ).create_session(user, epoch, request.headers.get("user-agent"))
+    claims = access_token_claims(user, epoch, session_id)
+    access_token = await create_access_token(data=claims)
     return {
         "access_token": access_token,
         "refresh_token": refresh_token,
@@ -142,79 +201,198 @@ async def confirmed_email(token: str, db: Session = Depends(get_db)):
     return {"message": "Email is verified successfully"}
 
 
-@router.post("/request_email")
+@router.post(
+    "/request_email",
+    dependencies=[Depends(rate_limit(EMAIL_COST))],
+)
 async def request_email(
     body: RequestEmail,
-    background_tasks: BackgroundTasks,
     request: Request,
     db: Session = Depends(get_db),
 ):
     """
     Send a new email verification link.
 
+    Repeated requests inside the dedup window get the same response without
+    queuing another email.
+
     Args:
         body (RequestEmail): Email address of the user.
-        background_tasks (BackgroundTasks): Background task handler.
         request (Request): HTTP request for base URL.
         db (Session): SQLAlchemy session for database interaction.
 
     Returns:
         dict: Message indicating result.
+
+    Raises:
+        HTTPException: If the email cannot be queued.
     """
     user_service = UserService(db)
     user = await user_service.get_user_by_email(body.email)
 
     if user.confirmed:
         return {"message": "Your email is already verified"}
-    if user:
-        background_tasks.add_task(
-            send_email, user.email, user.username, request.base_url
-        )
+    if user and await email_outbox.reserve(VERIFY_EMAIL, user.email):
+        try:
+            await email_outbox.send_verification(
+                user.email, user.username, str(request.base_url)
+            )
+        except RedisError as e:
+            logger.warning("Could not queue verification email: %s", e)
+            await email_outbox.release(VERIFY_EMAIL, user.email)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Email could not be sent, try again later",
+            )
     return {"message": "Check your email for verification"}
 
 
 @router.post("/refresh-token", response_model=Token)
 async def new_token(request: TokenRefreshRequest, db: Session = Depends(get_db)):
     """
-    Generate a new access token using a refresh token.
+    Rotate a refresh token and issue a new access token.
+
+    The presented refresh token is invalidated. Reusing an already rotated
+    token revokes its whole session. The access token claims are built from
+    the current user row, so role and profile changes apply on refresh, and
+    the session is revoked if the user no longer exists.
 
     Args:
         request (TokenRefreshRequest): Request containing the refresh token.
         db (Session): SQLAlchemy session for database interaction.
 
     Returns:
-        Token: New access token and the same refresh token.
+        Token: New access token and a new refresh token.
 
     Raises:
-        HTTPException: If the refresh token is invalid or expired.
+        HTTPException: If the refresh token is invalid, expired or reused.
     """
-    user = await verify_refresh_token(request.refresh_token, db)
+    session_service = RefreshSessionService(redis_client)
+    rotated = await session_service.rotate(request.refresh_token)
+    if rotated is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+        )
+    session, refresh_token = rotated
+    user = await UserService(db).get_user_by_username(session["username"])
     if user is None:
+        await session_service.revoke_session(session["username"], session["family"])
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired refresh token",
         )
-    new_access_token = await create_access_token(data={"sub": user.username})
+    claims = access_token_claims(user, session["epoch"], session["family"])
+    new_access_token = await create_access_token(data=claims)
     return {
         "access_token": new_access_token,
-        "refresh_token": request.refresh_token,
+        "refresh_token": refresh_token,
         "token_type": "bearer",
     }
 
 
-@router.post("/password-reset-request")
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(token: str = Depends(oauth2_scheme)):
+    """
+    Sign out of the current session.
+
+    Revokes the presented access token until it expires, together with the
+    refresh session it was issued with, so the client cannot refresh either.
+    Other sessions stay signed in; see ``/logout-all`` and ``/sessions``.
+
+    Args:
+        token (str): JWT token from OAuth2.
+
+    Raises:
+        HTTPException: If the token is invalid or already revoked.
+    """
+    payload = await authenticate_token(token)
+    if "jti" in payload:
+        await revocation_list.revoke(payload["jti"], payload["exp"])
+    if "sid" in payload:
+        await RefreshSessionService(redis_client).revoke_session(
+            payload["sub"], payload["sid"]
+        )
+
+
+@router.post("/logout-all", status_code=status.HTTP_204_NO_CONTENT)
+async def logout_all(user: Principal = Depends(get_current_principal)):
+    """
+    Sign the current user out on every device.
+
+    Bumps the user's token epoch, which invalidates every access token issued
+    so far, and revokes all refresh sessions.
+
+    Args:
+        user (Principal): The authenticated principal.
+    """
+    await revocation_list.bump_epoch(user.username)
+    await RefreshSessionService(redis_client).revoke_all(user.username)
+
+
+@router.get("/sessions", response_model=List[RefreshSession])
+async def list_sessions(user: Principal = Depends(get_current_principal)):
+    """
+    List the active refresh sessions of the current user.
+
+    Args:
+        user (Principal): The authenticated principal.
+
+    Returns:
+        List[RefreshSession]: One entry per signed-in device.
+    """
+    sessions = await RefreshSessionService(redis_client).list_sessions(user.username)
+    return [
+        {
+            "id": session["family"],
+            "device": session["device"],
+            "created_at": session["created_at"],
+            "expires_at": session["expires_at"],
+        }
+        for session in sessions
+    ]
+
+
+@router.delete("/sessions/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def revoke_session(
+    session_id: str, user: Principal = Depends(get_current_principal)
+):
+    """
+    Revoke a refresh session of the current user.
+
+    Args:
+        session_id (str): ID of the session to revoke.
+        user (Principal): The authenticated principal.
+
+    Raises:
+        HTTPException: If the session does not exist.
+    """
+    revoked = await RefreshSessionService(redis_client).revoke_session(
+        user.username, session_id
+    )
+    if not revoked:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Session not found"
+        )
+
+
+@router.post(
+    "/password-reset-request",
+    dependencies=[Depends(rate_limit(EMAIL_COST))],
+)
 async def reset_password_request(
     body: RequestEmail,
-    background_tasks: BackgroundTasks,
     request: Request,
     db: Session = Depends(get_db),
 ):
     """
     Initiate a password reset process by sending a reset link via email.
 
+    Repeated requests inside the dedup window get the same response without
+    signing a new token or queuing another email.
+
     Args:
         body (RequestEmail): User's email address.
-        background_tasks (BackgroundTasks): Background task handler.
         request (Request): HTTP request for base URL.
         db (Session): SQLAlchemy session for database interaction.
 
@@ -222,7 +400,7 @@ async def reset_password_request(
         dict: Confirmation message.
 
     Raises:
-        HTTPException: If the user is not found.
+        HTTPException: If the user is not found or the email cannot be queued.
     """
     user_service = UserService(db)
     user = await user_service.get_user_by_email(body.email)
@@ -232,10 +410,19 @@ async def reset_password_request(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
 
-    token = await generate_reset_token(user.email)
-    background_tasks.add_task(
-        send_password_reset_email, user.email, token, request.base_url
-    )
+    if await email_outbox.reserve(PASSWORD_RESET, user.email):
+        token = await generate_reset_token(user.email)
+        try:
+            await email_outbox.send_password_reset(
+                user.email, token, str(request.base_url)
+            )
+        except RedisError as e:
+            logger.warning("Could not queue password reset email: %s", e)
+            await email_outbox.release(PASSWORD_RESET, user.email)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Email could not be sent, try again later",
+            )
     return {"message": "Reset link sent"}
 
 
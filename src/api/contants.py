@@ -1,18 +1,36 @@
-from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Depends, status
+from datetime import date
+from typing import Annotated, List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import EmailStr
 from src.database.db import get_db
 from src.database.models import User
-from src.schemas import ContactModel, ContactResponse
+from src.schemas import ContactChanges, ContactModel, ContactResponse
 from src.services.contacts import ContactService
+from src.services.contact_events import contact_events
+from src.services.idempotency import fingerprint, idempotency
 from src.services.auth import get_current_user
+from src.services.rate_limit import rate_limit, DEFAULT_COST, SEARCH_COST
+from src.api.responses import (
+    contact_changes_response,
+    contact_list_response,
+    contact_response,
+    contacts_etag,
+    etag_matches,
+    not_modified,
+)
 
 router = APIRouter(prefix="/contacts", tags=["contacts"])
 
 
-@router.get("/", response_model=List[ContactResponse])
+@router.get(
+    "/",
+    response_model=List[ContactResponse],
+    dependencies=[Depends(rate_limit(DEFAULT_COST))],
+)
 async def read_contacts(
+    request: Request,
     skip: int = 0,
     limit: int = 10,
     db: AsyncSession = Depends(get_db),
@@ -21,7 +39,10 @@ async def read_contacts(
     """
     Retrieve a list of contacts for the authenticated user.
 
+    Answers 304 without querying when If-None-Match holds the current ETag.
+
     Args:
+        request (Request): HTTP request carrying conditional headers.
         skip (int): Number of records to skip.
         limit (int): Maximum number of contacts to return.
         db (AsyncSession): Database session.
@@ -30,12 +51,92 @@ async def read_contacts(
     Returns:
         List[ContactResponse]: List of user's contacts.
     """
+    etag = await contacts_etag(request, user.id)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    service = ContactService(db)
+    contacts = await service.get_contacts(skip, limit, user)
+    return contact_list_response(contacts, etag=etag)
+
+
+# Declared before "/{contact_id}", which would otherwise match "changes".
+@router.get(
+    "/changes",
+    response_model=ContactChanges,
+    dependencies=[Depends(rate_limit(DEFAULT_COST))],
+)
+async def read_contact_changes(
+    since: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """
+    Retrieve the contacts created, updated or deleted since a sync cursor.
+
+    Start without ``since`` for a full sync, then pass the returned cursor on
+    the next call. Keep calling while ``has_more`` is true.
+
+    Args:
+        since (Optional[str]): Cursor returned by the previous call.
+        limit (int): Maximum number of changed and of deleted contacts per page.
+        db (AsyncSession): Database session.
+        user (User): Currently authenticated user.
+
+    Returns:
+        ContactChanges: Changed contacts, deleted IDs and the next cursor.
+
+    Raises:
+        HTTPException: If the cursor is malformed.
+    """
     service = ContactService(db)
-    return await service.get_contacts(skip, limit, user)
+    changes = await service.get_changes(user, since, limit)
+    return contact_changes_response(**changes)
+
+
+@router.get(
+    "/events",
+    response_class=StreamingResponse,
+    dependencies=[Depends(rate_limit(DEFAULT_COST))],
+)
+async def stream_contact_events(
+    request: Request,
+    user: User = Depends(get_current_user),
+):
+    """
+    Stream the authenticated user's contact changes as server-sent events.
 
+    Events are ``created``, ``updated`` and ``deleted`` with the contact ID as
+    data. A reconnecting client that sends Last-Event-ID receives the events
+    it missed, or a ``reset`` event if they are no longer kept, after which
+    it should resync through ``GET /contacts/changes``.
+
+    Args:
+        request (Request): HTTP request carrying the Last-Event-ID header.
+        user (User): Currently authenticated user.
 
-@router.get("/{contact_id}", response_model=ContactResponse)
+    Returns:
+        StreamingResponse: The ``text/event-stream`` response.
+
+    Raises:
+        HTTPException: If the user has too many open streams or the event
+            store is unavailable.
+    """
+    subscription = await contact_events.open(user.id)
+    return StreamingResponse(
+        contact_events.stream(subscription, request.headers.get("last-event-id")),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get(
+    "/{contact_id}",
+    response_model=ContactResponse,
+    dependencies=[Depends(rate_limit(DEFAULT_COST))],
+)
 async def read_contact(
+    request: Request,
     contact_id: int,
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
@@ -43,7 +144,10 @@ async def read_contact(
     """
     Retrieve a specific contact by ID.
 
+    Answers 304 without querying when If-None-Match holds the current ETag.
+
     Args:
+        request (Request): HTTP request carrying conditional headers.
         contact_id (int): ID of the contact to retrieve.
         db (AsyncSession): Database session.
         user (User): Currently authenticated user.
@@ -54,51 +158,83 @@ async def read_contact(
     Raises:
         HTTPException: If contact is not found.
     """
+    etag = await contacts_etag(request, user.id)
+    if etag_matches(request, etag):
+        return not_modified(etag)
     service = ContactService(db)
     contact = await service.get_contact(contact_id, user)
     if contact is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found"
         )
-    return contact
+    return contact_response(contact, etag=etag)
 
 
-@router.post("/", response_model=ContactResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/",
+    response_model=ContactResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(rate_limit(DEFAULT_COST))],
+)
 async def create_contact(
     body: ContactModel,
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
+    idempotency_key: Annotated[Optional[str], Header()] = None,
 ):
     """
     Create a new contact for the authenticated user.
 
+    A retry with the same Idempotency-Key gets the first response again
+    instead of creating another contact.
+
     Args:
         body (ContactModel): Contact data to create.
         db (AsyncSession): Database session.
         user (User): Currently authenticated user.
+        idempotency_key (Optional[str]): Client-chosen key of the operation.
 
     Returns:
         ContactResponse: The created contact.
     """
-    service = ContactService(db)
-    return await service.create_contact(body, user)
 
+    async def create():
+        service = ContactService(db)
+        contact = await service.create_contact(body, user)
+        return contact_response(contact, status_code=status.HTTP_201_CREATED)
+
+    return await idempotency.run(
+        f"{user.id}:create_contact",
+        idempotency_key,
+        fingerprint(body.model_dump_json()),
+        create,
+    )
 
-@router.put("/{contact_id}", response_model=ContactResponse)
+
+@router.put(
+    "/{contact_id}",
+    response_model=ContactResponse,
+    dependencies=[Depends(rate_limit(DEFAULT_COST))],
+)
 async def update_contact(
     contact_id: int,
     body: ContactModel,
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
+    idempotency_key: Annotated[Optional[str], Header()] = None,
 ):
     """
     Update an existing contact by ID.
 
+    A retry with the same Idempotency-Key gets the first response again
+    without another write.
+
     Args:
         contact_id (int): ID of the contact to update.
         body (ContactModel): Updated contact data.
         db (AsyncSession): Database session.
         user (User): Currently authenticated user.
+        idempotency_key (Optional[str]): Client-chosen key of the operation.
 
     Returns:
         ContactResponse: The updated contact.
@@ -106,16 +242,29 @@ async def update_contact(
     Raises:
         HTTPException: If contact is not found.
     """
-    service = ContactService(db)
-    contact = await service.update_contact(contact_id, body, user)
-    if contact is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found"
-        )
-    return contact
+
+    async def update():
+        service = ContactService(db)
+        contact = await service.update_contact(contact_id, body, user)
+        if contact is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found"
+            )
+        return contact_response(contact)
+
+    return await idempotency.run(
+        f"{user.id}:update_contact:{contact_id}",
+        idempotency_key,
+        fingerprint(body.model_dump_json()),
+        update,
+    )
 
 
-@router.delete("/{contact_id}", response_model=ContactResponse)
+@router.delete(
+    "/{contact_id}",
+    response_model=ContactResponse,
+    dependencies=[Depends(rate_limit(DEFAULT_COST))],
+)
 async def delete_contact(
     contact_id: int,
     db: AsyncSession = Depends(get_db),
@@ -141,11 +290,16 @@ async def delete_contact(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found"
         )
-    return contact
+    return contact_response(contact)
 
 
-@router.get("/search/", response_model=List[ContactResponse])
+@router.get(
+    "/search/",
+    response_model=List[ContactResponse],
+    dependencies=[Depends(rate_limit(SEARCH_COST))],
+)
 async def search_contacts(
+    request: Request,
     first_name: Optional[str] = None,
     last_name: Optional[str] = None,
     email: Optional[EmailStr] = None,
@@ -155,7 +309,10 @@ async def search_contacts(
     """
     Search contacts by first name, last name, or email.
 
+    Answers 304 without querying when If-None-Match holds the current ETag.
+
     Args:
+        request (Request): HTTP request carrying conditional headers.
         first_name (Optional[str]): First name to search for.
         last_name (Optional[str]): Last name to search for.
         email (Optional[EmailStr]): Email to search for.
@@ -165,26 +322,42 @@ async def search_contacts(
     Returns:
         List[ContactResponse]: List of contacts matching the search criteria.
     """
+    etag = await contacts_etag(request, user.id)
+    if etag_matches(request, etag):
+        return not_modified(etag)
     service = ContactService(db)
-    return await service.search_contacts(
+    contacts = await service.search_contacts(
         user=user, first_name=first_name, last_name=last_name, email=email
     )
+    return contact_list_response(contacts, etag=etag)
 
 
-@router.get("/upcoming_birthdays/", response_model=List[ContactResponse])
+@router.get(
+    "/upcoming_birthdays/",
+    response_model=List[ContactResponse],
+    dependencies=[Depends(rate_limit(SEARCH_COST))],
+)
 async def upcoming_birthdays(
+    request: Request,
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
     """
     Retrieve contacts with upcoming birthdays within the next 7 days.
 
+    The result also depends on the date, so the ETag changes every day.
+
     Args:
+        request (Request): HTTP request carrying conditional headers.
         db (AsyncSession): Database session.
         user (User): Currently authenticated user.
 
     Returns:
         List[ContactResponse]: Contacts with upcoming birthdays.
     """
+    etag = await contacts_etag(request, user.id, date.today())
+    if etag_matches(request, etag):
+        return not_modified(etag)
     service = ContactService(db)
-    return await service.get_upcoming_birthdays(user)
+    contacts = await service.get_upcoming_birthdays(user)
+    return contact_list_response(contacts, etag=etag)
@@ -0,0 +1,207 @@
+import hashlib
+from typing import Any, Iterable, List, Mapping, Optional, Type, TypeVar
+from urllib.parse import urlencode
+
+from fastapi import Request, Response, status
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+from src.cache.contacts_version import contacts_version
+from src.schemas import ContactChange, ContactChanges, ContactResponse
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+contact_adapter = TypeAdapter(ContactResponse)
+contact_list_adapter = TypeAdapter(List[ContactResponse])
+contact_changes_adapter = TypeAdapter(ContactChanges)
+
+# Clients must revalidate on every poll; the ETag makes that cheap.
+CONDITIONAL_CACHE_CONTROL = "private, no-cache"
+
+
+def trusted(model: Type[ModelT], obj: Any) -> ModelT:
+    """
+    Build a response model from an ORM object without validating it.
+
+    Rows were validated when they were written, so checking every field again
+    on the way out (including ``EmailStr``) is wasted work.
+
+    Args:
+        model (Type[ModelT]): The response model.
+        obj (Any): Object with an attribute for every model field.
+
+    Returns:
+        ModelT: The unvalidated model instance.
+    """
+    return model.model_construct(
+        **{name: getattr(obj, name) for name in model.model_fields}
+    )
+
+
+class PydanticJSONResponse(JSONResponse):
+    """
+    JSON response encoded by a pre-built ``TypeAdapter`` straight to bytes.
+
+    Returning it from a route bypasses FastAPI's ``response_model`` validation
+    and ``jsonable_encoder`` pass; the route's ``response_model`` still
+    documents the schema.
+    """
+
+    def __init__(
+        self,
+        content: Any,
+        adapter: TypeAdapter,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+    ):
+        """
+        Initialize the response.
+
+        Args:
+            content (Any): Value of the adapter's type.
+            adapter (TypeAdapter): Serializer of the content.
+            status_code (int, optional): HTTP status code. Defaults to 200.
+            headers (Optional[Mapping[str, str]]): Extra response headers.
+        """
+        self.adapter = adapter
+        super().__init__(content, status_code=status_code, headers=headers)
+
+    def render(self, content: Any) -> bytes:
+        return self.adapter.dump_json(content)
+
+
+def _etag_headers(etag: Optional[str]) -> Optional[dict]:
+    if etag is None:
+        return None
+    return {"ETag": etag, "Cache-Control": CONDITIONAL_CACHE_CONTROL}
+
+
+def contact_response(
+    contact: Any, status_code: int = 200, etag: Optional[str] = None
+) -> PydanticJSONResponse:
+    """
+    Serialize one contact.
+
+    Args:
+        contact (Any): The contact ORM object.
+        status_code (int, optional): HTTP status code. Defaults to 200.
+        etag (Optional[str]): ETag of the response, if it has one.
+
+    Returns:
+        PydanticJSONResponse: The encoded contact.
+    """
+    return PydanticJSONResponse(
+        trusted(ContactResponse, contact),
+        contact_adapter,
+        status_code=status_code,
+        headers=_etag_headers(etag),
+    )
+
+
+def contact_list_response(
+    contacts: Iterable[Any], etag: Optional[str] = None
+) -> PydanticJSONResponse:
+    """
+    Serialize a list of contacts.
+
+    Args:
+        contacts (Iterable[Any]): The contact ORM objects.
+        etag (Optional[str]): ETag of the response, if it has one.
+
+    Returns:
+        PydanticJSONResponse: The encoded list.
+    """
+    return PydanticJSONResponse(
+        [trusted(ContactResponse, contact) for contact in contacts],
+        contact_list_adapter,
+        headers=_etag_headers(etag),
+    )
+
+
+def contact_changes_response(
+    changed: Iterable[Any], deleted: List[int], cursor: str, has_more: bool
+) -> PydanticJSONResponse:
+    """
+    Serialize a page of contact changes.
+
+    Args:
+        changed (Iterable[Any]): The changed contact ORM objects.
+        deleted (List[int]): IDs of deleted contacts.
+        cursor (str): Cursor of the next page.
+        has_more (bool): Whether more changes are waiting.
+
+    Returns:
+        PydanticJSONResponse: The encoded page.
+    """
+    return PydanticJSONResponse(
+        ContactChanges.model_construct(
+            changed=[trusted(ContactChange, contact) for contact in changed],
+            deleted=deleted,
+            cursor=cursor,
+            has_more=has_more,
+        ),
+        contact_changes_adapter,
+    )
+
+
+async def contacts_etag(request: Request, user_id: int, *extra: Any) -> Optional[str]:
+    """
+    Build a weak ETag for a contact read without touching the database.
+
+    The tag combines the user's contacts version with a short hash of the path,
+    the sorted query parameters and ``extra`` values the result depends on, so
+    every distinct read has its own tag and any write to the user's contacts
+    changes all of them.
+
+    Args:
+        request (Request): The incoming request.
+        user_id (int): Owner of the contacts.
+        *extra (Any): Further inputs of the result, such as the current date.
+
+    Returns:
+        Optional[str]: The ETag, or None if the contacts version is unavailable.
+    """
+    version = await contacts_version.get(user_id)
+    if version is None:
+        return None
+    query = urlencode(sorted(request.query_params.multi_items()))
+    key = "|".join([request.url.path, query, *map(str, extra)])
+    digest = hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+    return f'W/"{version:x}-{digest}"'
+
+
+def etag_matches(request: Request, etag: Optional[str]) -> bool:
+    """
+    Check the request's If-None-Match header against an ETag.
+
+    Uses the weak comparison required for If-None-Match.
+
+    Args:
+        request (Request): The incoming request.
+        etag (Optional[str]): ETag of the current representation.
+
+    Returns:
+        bool: True if the client's copy is current.
+    """
+    header = request.headers.get("if-none-match")
+    if etag is None or not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    """
+    Build a 304 response for a client whose copy is current.
+
+    Args:
+        etag (str): ETag of the current representation.
+
+    Returns:
+        Response: Empty 304 response carrying the ETag.
+    """
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED, headers=_etag_headers(etag)
+    )
@@ -1,34 +1,34 @@
-from fastapi import APIRouter, Depends, Request, UploadFile, File
+from fastapi import APIRouter, Depends, UploadFile, File
 
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.db import get_db
-from src.schemas import User
-from src.conf.config import settings
-from src.services.auth import get_current_user, get_current_admin_user
+from src.schemas import User, Principal
+from src.services.auth import get_current_principal, get_current_admin_user
 from src.services.users import UserService
 from src.services.upload_file import UploadFileService
+from src.services.storage import get_avatar_storage
+from src.services.rate_limit import rate_limit, PROFILE_COST, UPLOAD_COST
 
 
 router = APIRouter(prefix="/users", tags=["users"])
-limiter = Limiter(key_func=get_remote_address)
 
 
 @router.get(
-    "/me", response_model=User, description="No more than 10 requests per minute"
+    "/me",
+    response_model=User,
+    description="No more than 10 requests per minute",
+    dependencies=[Depends(rate_limit(PROFILE_COST))],
 )
-@limiter.limit("10/minute")
-async def me(request: Request, user: User = Depends(get_current_user)):
+async def me(user: Principal = Depends(get_current_principal)):
     """
     Retrieve the currently authenticated user's profile.
 
-    This endpoint is rate-limited to 10 requests per minute.
+    This endpoint is rate-limited to 10 requests per minute. When access tokens
+    embed identity claims the profile is served without a database lookup.
 
     Args:
-        request (Request): The incoming HTTP request.
-        user (User): The authenticated user, extracted from the JWT token.
+        user (Principal): The authenticated principal, extracted from the JWT token.
 
     Returns:
         User: The current user's profile data.
@@ -36,28 +36,28 @@ async def me(request: Request, user: User = Depends(get_current_user)):
     return user
 
 
-@router.patch("/avatar", response_model=User)
+@router.patch(
+    "/avatar", response_model=User, dependencies=[Depends(rate_limit(UPLOAD_COST))]
+)
 async def update_avatar_user(
     file: UploadFile = File(),
-    user: User = Depends(get_current_admin_user),
+    user: Principal = Depends(get_current_admin_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
     Update the avatar image of the currently authenticated admin user.
 
-    The uploaded file is sent to the cloud service, and the new avatar URL is stored in the database.
+    The uploaded file is resized and saved to the avatar storage, and the new avatar URL is stored in the database.
 
     Args:
         file (UploadFile): The avatar image to upload.
-        user (User): The authenticated admin user.
+        user (Principal): The authenticated admin principal.
         db (AsyncSession): Database session.
 
     Returns:
         User: Updated user object with the new avatar URL.
     """
-    avatar_url = UploadFileService(
-        settings.CLD_NAME, settings.CLD_API_KEY, settings.CLD_API_SECRET
-    ).upload_file(file, user.username)
+    avatar_url = await UploadFileService(get_avatar_storage()).upload_file(file)
 
     user_service = UserService(db)
     user = await user_service.update_avatar_url(user.email, avatar_url)
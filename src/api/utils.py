@@ -1,9 +1,13 @@
+import logging
+
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
 from src.database.db import get_db
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(tags=["utils"])
 
 
@@ -36,7 +40,7 @@ async def healthchecker(db: AsyncSession = Depends(get_db)):
             )
         return {"message": "Welcome to FastAPI!"}
     except Exception as e:
-        print(e)
+        logger.exception("Database health check failed")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Error connecting to the database",
@@ -1,13 +1,17 @@
 import pickle
+import time
 from functools import wraps
 from typing import Callable, Any, Awaitable
 from src.cache.client import redis_client
+from src.metrics import CACHE_LATENCY, CACHE_REQUESTS, cache_prefix
 
 
 def redis_cache(key_builder: Callable[..., str], expire: int = 300):
     """
     Decorator for caching the result of an asynchronous function in Redis.
 
+    Hits, misses and Redis latency are recorded per key prefix.
+
     Args:
         key_builder (Callable[..., str]): A function that generates a Redis key from the target function's arguments.
         expire (int, optional): Time-to-live (TTL) for the cache in seconds. Defaults to 300 seconds.
@@ -20,15 +24,24 @@ def redis_cache(key_builder: Callable[..., str], expire: int = 300):
         @wraps(func)
         async def wrapper(*args, **kwargs):
             key = key_builder(*args, **kwargs)
+            prefix = cache_prefix(key)
+            start = time.perf_counter()
             cached_data = await redis_client.get(key)
+            CACHE_LATENCY.labels(prefix, "get").observe(time.perf_counter() - start)
 
             if cached_data:
+                CACHE_REQUESTS.labels(prefix, "hit").inc()
                 return pickle.loads(cached_data)
+            CACHE_REQUESTS.labels(prefix, "miss").inc()
 
             result = await func(*args, **kwargs)
 
             if result:
+                start = time.perf_counter()
                 await redis_client.set(key, pickle.dumps(result), ex=expire)
+                CACHE_LATENCY.labels(prefix, "set").observe(
+                    time.perf_counter() - start
+                )
 
             return result
 
@@ -0,0 +1,73 @@
+import logging
+import time
+from typing import Optional
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.cache.client import redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class ContactsVersion:
+    """
+    Per-user counter that changes whenever any of the user's contacts change.
+
+    It lets contact reads build an ETag before querying the database. A
+    missing counter starts from the current time instead of zero, so versions
+    handed out before Redis lost the key are never reused.
+    """
+
+    def __init__(self, redis: Redis):
+        """
+        Initialize the counter store.
+
+        Args:
+            redis (Redis): Asynchronous Redis client.
+        """
+        self.redis = redis
+
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"contacts_version:{user_id}"
+
+    async def get(self, user_id: int) -> Optional[int]:
+        """
+        Return the current contacts version of a user.
+
+        Args:
+            user_id (int): The user's ID.
+
+        Returns:
+            Optional[int]: The version, or None if Redis is unavailable.
+        """
+        key = self._key(user_id)
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.set(key, time.time_ns(), nx=True)
+                pipe.get(key)
+                _, version = await pipe.execute()
+        except RedisError as e:
+            logger.warning("Contacts version unavailable: %s", e)
+            return None
+        return int(version)
+
+    async def bump(self, user_id: int) -> None:
+        """
+        Record that a user's contacts changed.
+
+        Args:
+            user_id (int): The user's ID.
+        """
+        key = self._key(user_id)
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.set(key, time.time_ns(), nx=True)
+                pipe.incr(key)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning("Contacts version unavailable: %s", e)
+
+
+contacts_version = ContactsVersion(redis_client)
@@ -0,0 +1,189 @@
+import logging
+import time
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.cache.client import redis_client
+from src.conf.config import settings
+
+logger = logging.getLogger(__name__)
+
+REVOKED_KEY = "revoked_tokens"
+EPOCHS_KEY = "token_epochs"
+VERSION_KEY = "revocation_version"
+PROFILE_VERSIONS_KEY = "profile_versions"
+
+# Raises a user's profile version, never lowers it, and bumps the snapshot
+# version only if the stored value changed.
+PUBLISH_PROFILE_SCRIPT = """
+local current = tonumber(redis.call('HGET', KEYS[1], ARGV[1]) or '0')
+if tonumber(ARGV[2]) > current then
+    redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+    redis.call('INCR', KEYS[2])
+end
+return 0
+"""
+
+
+class RevocationList:
+    """
+    Access-token revocation list with an in-process snapshot.
+
+    Revoked token IDs (``jti``) live in a Redis sorted set scored by the
+    token's ``exp``. Per-user token epochs and the latest profile version of
+    each user live in Redis hashes. Every change bumps a version counter. Each process keeps a copy of both and only
+    asks Redis for the version once per sync interval, so revocation checks
+    on the request path are plain dictionary lookups.
+    """
+
+    def __init__(self, redis: Redis, sync_interval: float):
+        """
+        Initialize an empty snapshot.
+
+        Args:
+            redis (Redis): Asynchronous Redis client.
+            sync_interval (float): Minimum number of seconds between version checks.
+        """
+        self.redis = redis
+        self.sync_interval = sync_interval
+        self._revoked: dict[str, float] = {}
+        self._epochs: dict[str, int] = {}
+        self._profile_versions: dict[int, int] = {}
+        self._publish_profile = redis.register_script(PUBLISH_PROFILE_SCRIPT)
+        self._version: bytes | None = None
+        self._checked_at = float("-inf")
+
+    def is_revoked(self, claims: dict) -> bool:
+        """
+        Check verified token claims against the local snapshot.
+
+        Args:
+            claims (dict): Verified access token claims.
+
+        Returns:
+            bool: True if the token was revoked or predates the user's epoch.
+        """
+        jti = claims.get("jti")
+        if jti is not None and jti in self._revoked:
+            return True
+        return claims.get("epoch", 0) < self._epochs.get(claims.get("sub"), 0)
+
+    def is_stale(self, user_id: int, version: int) -> bool:
+        """
+        Check whether a token's embedded profile version is outdated.
+
+        Args:
+            user_id (int): The user's ID.
+            version (int): Profile version embedded in the token.
+
+        Returns:
+            bool: True if a newer version has been published.
+        """
+        return version < self._profile_versions.get(user_id, 0)
+
+    def observe_profile_version(self, user_id: int, version: int | None) -> None:
+        """
+        Record a profile version loaded from the database in the local snapshot.
+
+        Args:
+            user_id (int): The user's ID.
+            version (int | None): The profile version of the loaded row.
+        """
+        if version is not None and version > self._profile_versions.get(user_id, 0):
+            self._profile_versions[user_id] = version
+
+    async def sync(self, force: bool = False) -> None:
+        """
+        Reload the snapshot if the shared version has changed.
+
+        Redis errors are logged and the previous snapshot stays in use.
+
+        Args:
+            force (bool): Check the version even if the sync interval has not elapsed.
+        """
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.sync_interval:
+            return
+        self._checked_at = now
+        try:
+            version = await self.redis.get(VERSION_KEY)
+            if version is not None and version == self._version:
+                return
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.zremrangebyscore(REVOKED_KEY, "-inf", time.time())
+                pipe.zrange(REVOKED_KEY, 0, -1, withscores=True)
+                pipe.hgetall(EPOCHS_KEY)
+                pipe.hgetall(PROFILE_VERSIONS_KEY)
+                _, revoked, epochs, profiles = await pipe.execute()
+        except RedisError as e:
+            logger.warning("Could not sync revocation list: %s", e)
+            return
+        self._revoked = {jti.decode(): exp for jti, exp in revoked}
+        self._epochs = {user.decode(): int(epoch) for user, epoch in epochs.items()}
+        self._profile_versions = {
+            int(user_id): int(version) for user_id, version in profiles.items()
+        }
+        self._version = version
+
+    async def revoke(self, jti: str, exp: float) -> None:
+        """
+        Revoke a single token until it expires.
+
+        Args:
+            jti (str): Token ID.
+            exp (float): Token expiration as a Unix timestamp.
+        """
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zadd(REVOKED_KEY, {jti: exp})
+            pipe.incr(VERSION_KEY)
+            await pipe.execute()
+        self._revoked[jti] = exp
+
+    async def bump_epoch(self, username: str) -> int:
+        """
+        Invalidate every access token issued to a user so far.
+
+        Args:
+            username (str): The token subject.
+
+        Returns:
+            int: The new epoch.
+        """
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hincrby(EPOCHS_KEY, username, 1)
+            pipe.incr(VERSION_KEY)
+            epoch, _ = await pipe.execute()
+        self._epochs[username] = int(epoch)
+        return int(epoch)
+
+    async def publish_profile_version(self, user_id: int, version: int) -> None:
+        """
+        Mark access tokens with an older embedded profile version as stale.
+
+        Other processes see the new version on their next sync.
+
+        Args:
+            user_id (int): The user's ID.
+            version (int): The user's new profile version.
+        """
+        await self._publish_profile(
+            keys=[PROFILE_VERSIONS_KEY, VERSION_KEY], args=[user_id, version]
+        )
+        self.observe_profile_version(user_id, version)
+
+    async def current_epoch(self, username: str) -> int:
+        """
+        Read a user's current epoch from Redis for embedding into new tokens.
+
+        Args:
+            username (str): The token subject.
+
+        Returns:
+            int: The current epoch, 0 if never bumped.
+        """
+        epoch = await self.redis.hget(EPOCHS_KEY, username)
+        return int(epoch) if epoch is not None else 0
+
+
+revocation_list = RevocationList(redis_client, settings.REVOCATION_SYNC_SECONDS)
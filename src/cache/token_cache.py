@@ -0,0 +1,79 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any
+
+from src.conf.config import settings
+
+
+class TokenClaimsCache:
+    """
+    Bounded in-process LRU cache of verified JWT claims.
+
+    Entries are keyed by a SHA-256 digest of the raw token, so the token itself
+    is never kept in memory, and expire together with the token's ``exp`` claim.
+    """
+
+    def __init__(self, maxsize: int):
+        """
+        Initialize an empty cache.
+
+        Args:
+            maxsize (int): Maximum number of tokens to keep.
+        """
+        self.maxsize = maxsize
+        self._entries: OrderedDict[bytes, tuple[float, dict[str, Any]]] = OrderedDict()
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> dict[str, Any] | None:
+        """
+        Return cached claims for a token if they have not expired.
+
+        Args:
+            token (str): The raw JWT.
+
+        Returns:
+            dict | None: Verified claims, or None on a miss.
+        """
+        key = self._digest(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, claims = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return claims
+
+    def set(self, token: str, claims: dict[str, Any]) -> None:
+        """
+        Store verified claims until the token expires.
+
+        Tokens without an ``exp`` claim are not cached.
+
+        Args:
+            token (str): The raw JWT.
+            claims (dict): Claims returned by a successful verification.
+        """
+        expires_at = claims.get("exp")
+        if self.maxsize <= 0 or expires_at is None:
+            return
+        key = self._digest(token)
+        self._entries[key] = (float(expires_at), claims)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached claims."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+token_cache = TokenClaimsCache(maxsize=settings.TOKEN_CACHE_MAXSIZE)
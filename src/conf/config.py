@@ -7,10 +7,24 @@ load_dotenv()
 class Settings(BaseSettings):
     DB_URL: str
     TEST_DB_URL: str
+    SQL_SLOW_QUERY_MS: float = 200.0
+    SQL_REPEAT_THRESHOLD: int = 5
+    EXPLAIN_SLOW_QUERIES: bool = True
+    EXPLAIN_THRESHOLD_MS: float = 500.0
+    EXPLAIN_ANALYZE_SAMPLE_RATE: float = 0.0
+    EXPLAIN_BUFFER_SIZE: int = 100
+    EXPLAIN_COOLDOWN_SECONDS: float = 300.0
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_INTERVAL: float = 0.001
+    PROFILING_BUFFER_SIZE: int = 20
     JWT_SECRET: str
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 3600
     REFRESH_TOKEN_EXPIRE_MINUTES: int = 10080 # 7 days
+    BCRYPT_ROUNDS: int = 12
+    TOKEN_CACHE_MAXSIZE: int = 10000
+    TOKEN_EMBED_CLAIMS: bool = False
+    REVOCATION_SYNC_SECONDS: float = 5
 
     MAIL_USERNAME: str = "example@meta.ua"
     MAIL_PASSWORD: str = "secretPassword"
@@ -25,13 +39,59 @@ class Settings(BaseSettings):
     USE_CREDENTIALS: bool = True
     VALIDATE_CERTS: bool = True
 
+    SMTP_POOL_SIZE: int = 5
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = 100
+    SMTP_IDLE_TIMEOUT: float = 60.0
+
+    EMAIL_WORKER_CONCURRENCY: int = 10
+    EMAIL_WORKER_BATCH_SIZE: int = 50
+    EMAIL_WORKER_METRICS_PORT: int = 9101
+    EMAIL_MAX_ATTEMPTS: int = 5
+    EMAIL_RETRY_BASE_DELAY: float = 5.0
+    EMAIL_CLAIM_IDLE_MS: int = 60000
+    EMAIL_DEDUP_WINDOW: int = 300
+
     CLD_NAME: str
     CLD_API_KEY: int = 326488457974591
     CLD_API_SECRET: str = "secret"
 
+    UPLOAD_MAX_CONCURRENCY: int = 4
+    UPLOAD_QUEUE_TIMEOUT: float = 10.0
+    UPLOAD_TIMEOUT: float = 30.0
+    AVATAR_MAX_BYTES: int = 10 * 1024 * 1024
+    AVATAR_MAX_PIXELS: int = 50_000_000
+    AVATAR_QUALITY: int = 85
+    AVATAR_STORAGE: str = "cloudinary"
+    MEDIA_ROOT: str = "media"
+    MEDIA_URL: str = "/media"
+
     REDIS_HOST: str = 'localhost'
     REDIS_PORT: int = 6379
 
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+
+    SYNC_SETTLE_SECONDS: float = 2.0
+    CONTACT_EVENTS_MAXLEN: int = 1000
+    CONTACT_EVENTS_TTL: int = 86400
+    SSE_BUFFER_SIZE: int = 100
+    SSE_MAX_STREAMS_PER_USER: int = 5
+    SSE_HEARTBEAT_INTERVAL: float = 15.0
+    IDEMPOTENCY_TTL: int = 86400
+    IDEMPOTENCY_LOCK_TIMEOUT: int = 30
+    IDEMPOTENCY_WAIT_TIMEOUT: float = 10.0
+
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_RATE: float = 1.0
+    RATE_LIMIT_CAPACITY: int = 60
+    FORWARDED_ALLOW_IPS: str = "127.0.0.1"
+    METRICS_ALLOW_IPS: str = "127.0.0.1"
+
+    LOGIN_THROTTLE_USER_THRESHOLD: int = 5
+    LOGIN_THROTTLE_IP_THRESHOLD: int = 20
+    LOGIN_THROTTLE_BASE_DELAY: float = 1.0
+    LOGIN_THROTTLE_MAX_DELAY: int = 900
+    LOGIN_THROTTLE_WINDOW: int = 900
+
     model_config = ConfigDict(
         extra="ignore", env_file=".env", env_file_encoding="utf-8", case_sensitive=True
     )
@@ -1,5 +1,11 @@
 import contextlib
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
 
+from sqlalchemy import Engine, event
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
@@ -8,11 +14,105 @@ from sqlalchemy.ext.asyncio import (
 )
 
 from src.conf.config import settings
+from src.database.explain import PlanCapture
+from src.metrics import InstrumentedAsyncAdaptedQueuePool
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    """SQL statements executed on behalf of one request."""
+
+    def __init__(self):
+        """Initialize empty statistics."""
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        """
+        Count one executed statement.
+
+        Args:
+            statement (str): SQL text with parameter placeholders.
+            duration (float): Execution time in seconds.
+        """
+        self.count += 1
+        self.duration += duration
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """
+        Return statements executed at least ``threshold`` times.
+
+        The same SQL text run many times in one request, with different
+        parameters, usually means an N+1 pattern such as lazy loading in a loop.
+
+        Args:
+            threshold (int): Minimum number of executions.
+
+        Returns:
+            List[Tuple[str, int]]: Statements with their execution counts.
+        """
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+
+# Set per request by QueryStatsMiddleware; statements run outside a request
+# (workers, startup) are not attributed.
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "current_query_stats", default=None
+)
+
+
+def instrument_engine(
+    engine: Engine, plan_capture: Optional[PlanCapture] = None
+) -> None:
+    """
+    Time every statement, attribute it to the current request and log slow ones.
+
+    Args:
+        engine (Engine): The synchronous engine (``AsyncEngine.sync_engine``).
+        plan_capture (Optional[PlanCapture], optional): Explains slow read
+            statements. Defaults to None.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        duration = time.perf_counter() - conn.info["query_start"].pop()
+        stats = current_query_stats.get()
+        if stats is not None:
+            stats.record(statement, duration)
+        if duration * 1000 >= settings.SQL_SLOW_QUERY_MS:
+            logger.warning("Slow query (%.1f ms): %s", duration * 1000, statement)
+        if plan_capture is not None:
+            plan_capture.observe(statement, parameters, duration, many)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_start"):
+            connection.info["query_start"].pop()
 
 
 class DatabaseSessionManager:
     def __init__(self, url: str):
-        self._engine: AsyncEngine | None = create_async_engine(url)
+        self._engine: AsyncEngine | None = create_async_engine(
+            url, poolclass=InstrumentedAsyncAdaptedQueuePool
+        )
+        self.plan_capture: PlanCapture | None = None
+        if settings.EXPLAIN_SLOW_QUERIES:
+            self.plan_capture = PlanCapture(
+                self._engine,
+                threshold_ms=settings.EXPLAIN_THRESHOLD_MS,
+                buffer_size=settings.EXPLAIN_BUFFER_SIZE,
+                cooldown=settings.EXPLAIN_COOLDOWN_SECONDS,
+                analyze_rate=settings.EXPLAIN_ANALYZE_SAMPLE_RATE,
+            )
+        instrument_engine(self._engine.sync_engine, self.plan_capture)
         self._session_maker: async_sessionmaker = async_sessionmaker(
             autoflush=False, autocommit=False, bind=self._engine
         )
@@ -0,0 +1,275 @@
+import asyncio
+import contextvars
+import hashlib
+import json
+import logging
+import random
+import re
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Set, Tuple
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"\$\d+|%\([^)]*\)s|%s|:\w+|\?")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACES = re.compile(r"\s+")
+_LOCKING = re.compile(r"\bFOR\s+(?:NO\s+KEY\s+)?(?:UPDATE|SHARE|KEY\s+SHARE)\b", re.I)
+# Plan keys that may quote parameter values, e.g. ``(email = 'a@b.c'::text)``.
+_CONDITIONS = re.compile(r"(?:Cond|Condition|Filter)$")
+
+
+def normalize_statement(statement: str) -> Tuple[str, str]:
+    """
+    Strip literals and placeholders from a statement and fingerprint it.
+
+    Args:
+        statement (str): SQL text.
+
+    Returns:
+        Tuple[str, str]: The normalized text and its 16-character fingerprint.
+    """
+    normalized = _STRING.sub("?", statement)
+    normalized = _PLACEHOLDER.sub("?", normalized)
+    normalized = _NUMBER.sub("?", normalized)
+    normalized = _IN_LIST.sub("(...)", normalized)
+    normalized = _SPACES.sub(" ", normalized).strip()
+    digest = hashlib.sha1(normalized.encode()).hexdigest()[:16]
+    return normalized, digest
+
+
+def is_read_statement(statement: str) -> bool:
+    """
+    Check whether a statement only reads and can be explained safely.
+
+    Args:
+        statement (str): SQL text.
+
+    Returns:
+        bool: True for a plain SELECT without row locks.
+    """
+    head = statement.lstrip().split(None, 1)
+    return bool(head) and head[0].upper() == "SELECT" and not _LOCKING.search(
+        statement
+    )
+
+
+def redact_plan(node: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Replace the literals in a plan's conditions with ``?``.
+
+    Conditions show the parameter values the statement ran with, such as
+    emails or usernames, which must not be kept.
+
+    Args:
+        node (Dict[str, Any]): A ``Plan`` node of ``EXPLAIN (FORMAT JSON)``.
+
+    Returns:
+        Dict[str, Any]: A copy of the node and its children without literals.
+    """
+    redacted = {}
+    for key, value in node.items():
+        if key == "Plans":
+            value = [redact_plan(child) for child in value]
+        elif _CONDITIONS.search(key) and isinstance(value, str):
+            value = _NUMBER.sub("?", _STRING.sub("?", value))
+        redacted[key] = value
+    return redacted
+
+
+def plan_shape(node: Dict[str, Any], depth: int = 0) -> List[str]:
+    """
+    Describe a plan tree by node type, relation and index, without estimates.
+
+    Two plans with the same shape differ only in costs, so a new shape for a
+    known fingerprint points to a plan change.
+
+    Args:
+        node (Dict[str, Any]): A ``Plan`` node of ``EXPLAIN (FORMAT JSON)``.
+        depth (int, optional): Nesting level. Defaults to 0.
+
+    Returns:
+        List[str]: One indented line per node.
+    """
+    line = node["Node Type"]
+    if "Index Name" in node:
+        line += f" using {node['Index Name']}"
+    if "Relation Name" in node:
+        line += f" on {node['Relation Name']}"
+    lines = ["  " * depth + line]
+    for child in node.get("Plans", []):
+        lines.extend(plan_shape(child, depth + 1))
+    return lines
+
+
+class PlanCapture:
+    """
+    Explains slow read statements in the background and keeps recent plans.
+
+    Statements slower than ``threshold_ms`` are re-run as
+    ``EXPLAIN (FORMAT JSON)`` on a separate connection, at most once per
+    fingerprint per ``cooldown`` seconds and with at most ``max_concurrency``
+    explains running at once. A sample of them are explained with ANALYZE,
+    inside a transaction that is rolled back. Literals are removed from the
+    plans before they are kept.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        threshold_ms: float,
+        buffer_size: int,
+        cooldown: float,
+        analyze_rate: float = 0.0,
+        analyze_timeout_ms: int = 10000,
+        max_concurrency: int = 1,
+    ):
+        """
+        Initialize the capture.
+
+        Args:
+            engine (AsyncEngine): Engine used for the EXPLAIN statements.
+            threshold_ms (float): Duration from which a statement is explained.
+            buffer_size (int): Number of plans kept.
+            cooldown (float): Seconds before the same fingerprint is explained again.
+            analyze_rate (float, optional): Fraction of captures run with ANALYZE.
+                Defaults to 0.0.
+            analyze_timeout_ms (int, optional): Statement timeout of ANALYZE runs.
+                Defaults to 10000.
+            max_concurrency (int, optional): Explains running at once; further
+                slow statements are skipped. Defaults to 1.
+        """
+        self.engine = engine
+        self.threshold_ms = threshold_ms
+        self.cooldown = cooldown
+        self.analyze_rate = analyze_rate
+        self.analyze_timeout_ms = analyze_timeout_ms
+        self.max_concurrency = max_concurrency
+        self.plans: deque = deque(maxlen=buffer_size)
+        self._last_seen: Dict[str, float] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def observe(
+        self, statement: str, parameters: Any, duration: float, many: bool
+    ) -> None:
+        """
+        Schedule an EXPLAIN if a statement qualifies.
+
+        Called from the engine's cursor events, so it never waits.
+
+        Args:
+            statement (str): SQL text as sent to the driver.
+            parameters (Any): Driver parameters of the statement.
+            duration (float): Execution time in seconds.
+            many (bool): Whether the statement ran with executemany.
+        """
+        if duration * 1000 < self.threshold_ms or many:
+            return
+        if not is_read_statement(statement):
+            return
+        if len(self._tasks) >= self.max_concurrency:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        normalized, fingerprint = normalize_statement(statement)
+        now = time.monotonic()
+        self._forget_expired(now)
+        if fingerprint in self._last_seen:
+            return
+        self._last_seen[fingerprint] = now
+        if isinstance(parameters, list):
+            parameters = tuple(parameters)
+        # A fresh context keeps the EXPLAIN out of the request's query stats.
+        task = loop.create_task(
+            self.capture(statement, parameters, duration, normalized, fingerprint),
+            context=contextvars.Context(),
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def capture(
+        self,
+        statement: str,
+        parameters: Any,
+        duration: float,
+        normalized: str,
+        fingerprint: str,
+    ) -> None:
+        """
+        Explain one statement and store the plan.
+
+        Args:
+            statement (str): SQL text as sent to the driver.
+            parameters (Any): Driver parameters of the statement.
+            duration (float): Execution time of the original run in seconds.
+            normalized (str): Statement without literals.
+            fingerprint (str): Fingerprint of the normalized statement.
+        """
+        analyze = random.random() < self.analyze_rate
+        options = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+        try:
+            async with self.engine.connect() as conn:
+                if analyze:
+                    await conn.exec_driver_sql(
+                        f"SET LOCAL statement_timeout = {int(self.analyze_timeout_ms)}"
+                    )
+                result = await conn.exec_driver_sql(
+                    f"EXPLAIN ({options}) {statement}", parameters or ()
+                )
+                raw = result.scalar_one()
+                # Leaving the block rolls the transaction back.
+        except (SQLAlchemyError, OSError) as e:
+            logger.warning("EXPLAIN of slow query %s failed: %s", fingerprint, e)
+            return
+        plan = json.loads(raw) if isinstance(raw, str) else raw
+        plan[0]["Plan"] = redact_plan(plan[0]["Plan"])
+        shape = plan_shape(plan[0]["Plan"])
+        previous = next(
+            (p for p in reversed(self.plans) if p["fingerprint"] == fingerprint), None
+        )
+        shape_hash = hashlib.sha1("\n".join(shape).encode()).hexdigest()[:16]
+        self.plans.append(
+            {
+                "fingerprint": fingerprint,
+                "statement": normalized,
+                "duration_ms": round(duration * 1000, 2),
+                "captured_at": datetime.now(timezone.utc),
+                "analyzed": analyze,
+                "shape": shape,
+                "shape_hash": shape_hash,
+                "plan_changed": previous is not None
+                and previous["shape_hash"] != shape_hash,
+                "plan": plan,
+            }
+        )
+
+    def _forget_expired(self, now: float) -> None:
+        # Fingerprints are inserted in time order, so the expired ones come first.
+        while self._last_seen:
+            fingerprint, seen = next(iter(self._last_seen.items()))
+            if now - seen < self.cooldown:
+                return
+            del self._last_seen[fingerprint]
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """
+        Return the captured plans, newest first.
+
+        Returns:
+            List[Dict[str, Any]]: The captured plans.
+        """
+        return list(reversed(self.plans))
+
+    async def drain(self) -> None:
+        """Wait for the explains in progress."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
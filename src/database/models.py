@@ -1,9 +1,17 @@
-from typing import Optional
 from sqlalchemy.orm import Mapped, mapped_column, DeclarativeBase, relationship
-from sqlalchemy import Column, String, Integer, Boolean, func, Enum as SqlEnum
+from sqlalchemy import (
+    Column,
+    String,
+    Integer,
+    Boolean,
+    Index,
+    func,
+    text,
+    Enum as SqlEnum,
+)
 from sqlalchemy.sql.schema import ForeignKey
 from sqlalchemy.sql.sqltypes import DateTime
-from datetime import date
+from datetime import date, datetime
 from enum import Enum
 
 
@@ -24,6 +32,47 @@ class Contact(Base):
         "user_id", ForeignKey("users.id", ondelete="CASCADE"), default=None
     )
     user = relationship("User", backref="contacts")
+    # clock_timestamp() rather than now(), so the time is taken at the write and
+    # not at the start of the transaction.
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=func.clock_timestamp(),
+        onupdate=func.clock_timestamp(),
+        server_default=func.now(),
+        nullable=False,
+    )
+    version: Mapped[int] = mapped_column(
+        Integer,
+        default=1,
+        server_default="1",
+        onupdate=text("version + 1"),
+        nullable=False,
+    )
+
+    __table_args__ = (
+        Index("ix_contacts_user_id_updated_at", "user_id", "updated_at"),
+    )
+
+
+class ContactTombstone(Base):
+    """Record of a deleted contact, kept for delta sync."""
+
+    __tablename__ = "contact_tombstones"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    contact_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    deleted_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=func.clock_timestamp(),
+        server_default=func.now(),
+        nullable=False,
+    )
+
+    __table_args__ = (
+        Index("ix_contact_tombstones_user_id_deleted_at", "user_id", "deleted_at"),
+    )
 
 
 class UserRole(str, Enum):
@@ -36,7 +85,6 @@ class User(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     email: Mapped[str] = mapped_column(String(100), unique=True, index=True)
     hashed_password = mapped_column(String(255), nullable=False)
-    refresh_token: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     avatar: Mapped[str] = mapped_column(String(255), nullable=True)
     username: Mapped[str] = mapped_column(String, unique=True)
     confirmed: Mapped[bool] = mapped_column(Boolean, default=False)
@@ -44,3 +92,6 @@ class User(Base):
     role: Mapped[UserRole] = mapped_column(
         SqlEnum(UserRole), default=UserRole.USER, nullable=False
     )
+    profile_version: Mapped[int] = mapped_column(
+        Integer, default=1, server_default="1", nullable=False
+    )
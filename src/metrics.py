@@ -0,0 +1,234 @@
+import logging
+import time
+import weakref
+from ipaddress import ip_address, ip_network
+from typing import Iterator, Optional
+
+from fastapi import HTTPException, Request, Response, status
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+from redis.exceptions import RedisError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.routing import Match
+
+from src.conf.config import settings
+from src.services.login_throttle import login_throttle
+from src.services.outbox import email_outbox
+
+logger = logging.getLogger(__name__)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by route template and status code.",
+    ["method", "route", "status"],
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time until the response headers are sent, by route template.",
+    ["method", "route"],
+)
+
+DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request, by route template.",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100),
+)
+DB_TIME = Histogram(
+    "http_request_db_seconds",
+    "Time spent executing SQL per request, by route template.",
+    ["method", "route"],
+)
+
+DB_POOL_WAIT = Histogram(
+    "db_pool_checkout_seconds",
+    "Time to obtain a database connection from the pool, including connecting.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "redis_cache lookups by key prefix and result.",
+    ["prefix", "result"],
+)
+CACHE_LATENCY = Histogram(
+    "cache_operation_duration_seconds",
+    "redis_cache Redis round trips by key prefix and operation.",
+    ["prefix", "operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1),
+)
+
+PASSWORD_HASH = Histogram(
+    "password_hash_duration_seconds",
+    "bcrypt hashing and verification time.",
+    ["operation"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 2),
+)
+
+EMAIL_QUEUE = Gauge(
+    "email_queue_length",
+    "Emails waiting in the outbox, retry queue and dead-letter stream.",
+    ["queue"],
+)
+EMAIL_SEND = Histogram(
+    "email_send_duration_seconds",
+    "Time to hand one email to the SMTP server, including reconnects.",
+    ["result"],
+)
+
+
+def route_template(request_scope: dict) -> str:
+    """
+    Return the route template that matches a request.
+
+    Templates such as ``/api/contacts/{contact_id}`` keep the label set
+    bounded, unlike raw paths.
+
+    Args:
+        request_scope (dict): ASGI scope of the request.
+
+    Returns:
+        str: The template, or "unmatched" if no route matches.
+    """
+    app = request_scope.get("app")
+    router = getattr(app, "router", None)
+    for route in getattr(router, "routes", []):
+        match, _ = route.matches(request_scope)
+        if match != Match.NONE:
+            return route.path
+    return "unmatched"
+
+
+class InstrumentedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Connection pool that times checkouts and reports its size to Prometheus.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        _pools.add(self)
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT.observe(time.perf_counter() - start)
+
+
+_pools: "weakref.WeakSet[InstrumentedAsyncAdaptedQueuePool]" = weakref.WeakSet()
+
+
+class PoolCollector(Collector):
+    """Reports the state of every instrumented connection pool at scrape time."""
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        pools = list(_pools)
+        checked_out = GaugeMetricFamily(
+            "db_pool_checked_out", "Database connections in use."
+        )
+        checked_out.add_metric([], sum(pool.checkedout() for pool in pools))
+        yield checked_out
+        idle = GaugeMetricFamily(
+            "db_pool_idle", "Idle database connections in the pool."
+        )
+        idle.add_metric([], sum(pool.checkedin() for pool in pools))
+        yield idle
+        overflow = GaugeMetricFamily(
+            "db_pool_overflow", "Connections open beyond the pool size."
+        )
+        overflow.add_metric([], sum(max(pool.overflow(), 0) for pool in pools))
+        yield overflow
+        size = GaugeMetricFamily("db_pool_size", "Configured pool size.")
+        size.add_metric([], sum(pool.size() for pool in pools))
+        yield size
+
+
+class LoginThrottleCollector(Collector):
+    """Exposes the login throttle's in-process counters."""
+
+    def collect(self) -> Iterator[CounterMetricFamily]:
+        family = CounterMetricFamily(
+            "login_throttle_events",
+            "Failed, blocked and rejected login attempts.",
+            labels=["event"],
+        )
+        for event in ("failed", "blocked", "rejected"):
+            family.add_metric([event], login_throttle.stats[event])
+        yield family
+
+
+REGISTRY.register(PoolCollector())
+REGISTRY.register(LoginThrottleCollector())
+
+
+def cache_prefix(key: str) -> str:
+    """
+    Return the bounded part of a cache key, e.g. "user" for "user(alice)".
+
+    Args:
+        key (str): The Redis key.
+
+    Returns:
+        str: The key prefix.
+    """
+    return key.split("(", 1)[0].split(":", 1)[0]
+
+
+def client_allowed(host: Optional[str], allowed: str) -> bool:
+    """
+    Check a client address against a comma-separated list of IPs or networks.
+
+    Args:
+        host (Optional[str]): The client address.
+        allowed (str): IPs or networks, or ``*`` for any client.
+
+    Returns:
+        bool: True if the client is in one of the networks.
+    """
+    if allowed.strip() == "*":
+        return True
+    try:
+        address = ip_address(host or "")
+    except ValueError:
+        return False
+    return any(
+        address in ip_network(network.strip(), strict=False)
+        for network in allowed.split(",")
+        if network.strip()
+    )
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    """
+    Serve the metrics in the Prometheus text format.
+
+    Only clients listed in ``METRICS_ALLOW_IPS`` may scrape. Queue lengths
+    are read from Redis on every scrape.
+
+    Args:
+        request (Request): The scrape request.
+
+    Raises:
+        HTTPException: If the client is not allowed to scrape.
+
+    Returns:
+        Response: The exposition.
+    """
+    client = request.client.host if request.client else None
+    if not client_allowed(client, settings.METRICS_ALLOW_IPS):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+    try:
+        for queue, length in (await email_outbox.queue_lengths()).items():
+            EMAIL_QUEUE.labels(queue).set(length)
+    except RedisError as e:
+        logger.warning("Email queue lengths unavailable: %s", e)
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
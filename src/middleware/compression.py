@@ -0,0 +1,266 @@
+import zlib
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+# Content types that are already compressed or must not be buffered.
+INCOMPRESSIBLE_PREFIXES = (
+    "image/",
+    "video/",
+    "audio/",
+    "font/woff",
+    "application/zip",
+    "application/gzip",
+    "application/x-gzip",
+    "application/zstd",
+    "application/octet-stream",
+    "text/event-stream",
+)
+COMPRESSIBLE_EXCEPTIONS = ("image/svg+xml",)
+
+
+class Compressor(ABC):
+    """Incremental compressor of one response body."""
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        """
+        Compress a chunk and flush it, so the client can decode it right away.
+
+        Args:
+            data (bytes): Body chunk.
+
+        Returns:
+            bytes: Compressed bytes.
+        """
+
+    @abstractmethod
+    def finish(self) -> bytes:
+        """
+        End the compressed stream.
+
+        Returns:
+            bytes: Remaining compressed bytes.
+        """
+
+
+class GzipCompressor(Compressor):
+    """gzip compressor built on zlib."""
+
+    def __init__(self, level: int = 6):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(
+            zlib.Z_SYNC_FLUSH
+        )
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliCompressor(Compressor):
+    """Brotli compressor, available with the ``brotli`` package."""
+
+    def __init__(self, quality: int = 4):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdCompressor(Compressor):
+    """zstd compressor, available with the ``zstandard`` package."""
+
+    def __init__(self, level: int = 3):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(
+            zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        )
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+def available_encodings() -> Dict[str, Callable[[], Compressor]]:
+    """
+    Return the supported encodings in order of preference.
+
+    Returns:
+        Dict[str, Callable[[], Compressor]]: Compressor factory per encoding.
+    """
+    encodings: Dict[str, Callable[[], Compressor]] = {}
+    if zstandard is not None:
+        encodings["zstd"] = ZstdCompressor
+    if brotli is not None:
+        encodings["br"] = BrotliCompressor
+    encodings["gzip"] = GzipCompressor
+    return encodings
+
+
+def negotiate(accept_encoding: str, supported: List[str]) -> Optional[str]:
+    """
+    Pick the response encoding from an Accept-Encoding header.
+
+    The client's q-values decide; ties go to the earlier supported encoding.
+
+    Args:
+        accept_encoding (str): The Accept-Encoding header value.
+        supported (List[str]): Supported encodings, most preferred first.
+
+    Returns:
+        Optional[str]: The chosen encoding, or None to send the body as is.
+    """
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            weights[name] = q
+    best, best_q = None, 0.0
+    for encoding in supported:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def is_compressible(content_type: str) -> bool:
+    """
+    Check whether a content type is worth compressing.
+
+    Args:
+        content_type (str): The Content-Type header value.
+
+    Returns:
+        bool: False for already compressed media and event streams.
+    """
+    content_type = content_type.lower()
+    if content_type.startswith(COMPRESSIBLE_EXCEPTIONS):
+        return True
+    return not content_type.startswith(INCOMPRESSIBLE_PREFIXES)
+
+
+class CompressionMiddleware:
+    """
+    Pure ASGI middleware that compresses responses with zstd, Brotli or gzip.
+
+    zstd and Brotli are used when their packages are installed. Bodies sent in
+    one message are compressed only from ``minimum_size`` bytes on; streamed
+    bodies are compressed chunk by chunk and flushed after every chunk, so
+    streaming keeps working. Responses that already have a Content-Encoding
+    or an incompressible content type pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024):
+        """
+        Initialize the middleware.
+
+        Args:
+            app (ASGIApp): The wrapped application.
+            minimum_size (int, optional): Smallest body in bytes to compress. Defaults to 1024.
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = available_encodings()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(
+            Headers(scope=scope).get("accept-encoding", ""), list(self.encodings)
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(
+            send, encoding, self.encodings[encoding], self.minimum_size
+        )
+        await self.app(scope, receive, responder)
+
+
+class _CompressionResponder:
+    def __init__(
+        self,
+        send: Send,
+        encoding: str,
+        factory: Callable[[], Compressor],
+        minimum_size: int,
+    ):
+        self.send = send
+        self.encoding = encoding
+        self.factory = factory
+        self.minimum_size = minimum_size
+        self.start: Optional[Message] = None
+        self.compressor: Optional[Compressor] = None
+        self.passthrough = False
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            if "content-encoding" in headers or not is_compressible(
+                headers.get("content-type", "")
+            ):
+                self.passthrough = True
+                await self.send(message)
+            else:
+                # Wait for the first body chunk to decide.
+                self.start = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.start is not None:
+            start, self.start = self.start, None
+            headers = MutableHeaders(raw=start["headers"])
+            headers.add_vary_header("Accept-Encoding")
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+            self.compressor = self.factory()
+            headers["Content-Encoding"] = self.encoding
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                body = self.compressor.compress(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(body))
+                await self.send(start)
+                await self.send({"type": "http.response.body", "body": body})
+                return
+            await self.send(start)
+
+        chunk = self.compressor.compress(body) if body else b""
+        if not more_body:
+            chunk += self.compressor.finish()
+        await self.send(
+            {"type": "http.response.body", "body": chunk, "more_body": more_body}
+        )
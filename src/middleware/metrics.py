@@ -0,0 +1,48 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.metrics import HTTP_LATENCY, HTTP_REQUESTS, route_template
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware that records request counts and latency per route.
+
+    Requests are labelled with the route template rather than the raw path,
+    so the number of series stays bounded. Latency is measured until the
+    response headers are sent, which keeps long-lived streams from skewing it.
+    """
+
+    def __init__(self, app: ASGIApp, exclude: tuple = ("/metrics",)):
+        """
+        Initialize the middleware.
+
+        Args:
+            app (ASGIApp): The wrapped application.
+            exclude (tuple, optional): Paths that are not recorded. Defaults
+                to the metrics endpoint itself.
+        """
+        self.app = app
+        self.exclude = exclude
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude:
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        method = scope["method"]
+        route = route_template(scope)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                HTTP_LATENCY.labels(method, route).observe(time.perf_counter() - start)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
@@ -0,0 +1,209 @@
+import logging
+import random
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException
+from redis.exceptions import RedisError
+from sqlalchemy.exc import SQLAlchemyError
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.conf.config import settings
+from src.database.db import sessionmanager
+from src.database.models import UserRole
+from src.metrics import route_template
+from src.services.auth import authenticate_token, resolve_principal
+
+try:
+    from pyinstrument import Profiler
+    from pyinstrument.renderers import SpeedscopeRenderer
+except ImportError:  # pragma: no cover - optional dependency
+    Profiler = None
+    SpeedscopeRenderer = None
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+
+class ProfileStore:
+    """Keeps the most recent request profiles of this process."""
+
+    def __init__(self, size: int):
+        """
+        Initialize the store.
+
+        Args:
+            size (int): Number of profiles kept.
+        """
+        self.profiles: deque = deque(maxlen=size)
+
+    def add(self, profile_id: str, session: Any, **details: Any) -> None:
+        """
+        Store a profiler session.
+
+        Args:
+            profile_id (str): Identifier returned to the client.
+            session (Any): The pyinstrument session.
+            **details: Request details listed alongside the profile.
+        """
+        self.profiles.append({"id": profile_id, "session": session, **details})
+
+    def list(self) -> List[Dict[str, Any]]:
+        """
+        Return the stored profiles without their samples, newest first.
+
+        Returns:
+            List[Dict[str, Any]]: Profile details.
+        """
+        return [
+            {k: v for k, v in p.items() if k != "session"}
+            for p in reversed(self.profiles)
+        ]
+
+    def render(self, profile_id: str) -> Optional[str]:
+        """
+        Render a stored profile in the speedscope format.
+
+        Args:
+            profile_id (str): The profile identifier.
+
+        Returns:
+            Optional[str]: speedscope JSON, or None if the profile is unknown.
+        """
+        for profile in self.profiles:
+            if profile["id"] == profile_id:
+                return SpeedscopeRenderer().render(profile["session"])
+        return None
+
+
+profile_store = ProfileStore(settings.PROFILING_BUFFER_SIZE)
+
+
+class ProfilingMiddleware:
+    """
+    Pure ASGI middleware that profiles requests with pyinstrument.
+
+    A fraction ``sample_rate`` of requests is profiled, as is any request from
+    an admin carrying an ``X-Profile: 1`` header. Profiles are kept in
+    ``store`` and their id is returned in ``X-Profile-Id`` to the admin who
+    asked for one. The profiler samples the request's task only, so awaits on
+    Redis, SQL or worker threads (bcrypt) show up as time spent at the await.
+    At most one request is profiled at a time; event streams never are.
+    Without pyinstrument installed every request passes through.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: ProfileStore,
+        sample_rate: float = 0.0,
+        interval: float = 0.001,
+    ):
+        """
+        Initialize the middleware.
+
+        Args:
+            app (ASGIApp): The wrapped application.
+            store (ProfileStore): Where profiles are kept.
+            sample_rate (float, optional): Fraction of requests profiled.
+                Defaults to 0.0.
+            interval (float, optional): Sampling interval in seconds.
+                Defaults to 0.001.
+        """
+        self.app = app
+        self.store = store
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self._busy = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or Profiler is None or self._busy:
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        if "text/event-stream" in headers.get("accept", ""):
+            await self.app(scope, receive, send)
+            return
+        requested = headers.get(PROFILE_HEADER) == "1" and await is_admin_request(
+            headers
+        )
+        if self._busy or (not requested and random.random() >= self.sample_rate):
+            await self.app(scope, receive, send)
+            return
+        # Claimed before any await so concurrent requests see it.
+        self._busy = True
+        try:
+            await self._profile(scope, receive, send, requested)
+        finally:
+            self._busy = False
+
+    async def _profile(
+        self, scope: Scope, receive: Receive, send: Send, requested: bool
+    ) -> None:
+        profile_id = uuid.uuid4().hex
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if requested:
+                    headers = MutableHeaders(scope=message)
+                    headers.append(PROFILE_ID_HEADER, profile_id)
+            await send(message)
+
+        profiler = Profiler(interval=self.interval, async_mode="enabled")
+        captured_at = datetime.now(timezone.utc)
+        start = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            session = profiler.stop()
+            self.store.add(
+                profile_id,
+                session,
+                method=scope["method"],
+                path=scope["path"],
+                route=route_template(scope),
+                status=status_code,
+                duration_ms=round((time.perf_counter() - start) * 1000, 2),
+                captured_at=captured_at,
+                requested=requested,
+            )
+
+
+async def is_admin_request(headers: Headers) -> bool:
+    """
+    Check whether a request carries a valid access token of an admin.
+
+    The principal is resolved as for ``get_current_principal``, so a role
+    change applies here as soon as it does on the API. If the lookup fails
+    the request is treated as not coming from an admin.
+
+    Args:
+        headers (Headers): Request headers.
+
+    Returns:
+        bool: True if the bearer token belongs to an admin.
+    """
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        payload = await authenticate_token(token)
+    except HTTPException:
+        return False
+    try:
+        async with sessionmanager.session() as db:
+            principal = await resolve_principal(payload, db)
+    except (SQLAlchemyError, RedisError) as e:
+        logger.warning("Could not check profile request of %s: %s", payload["sub"], e)
+        return False
+    return principal is not None and principal.role == UserRole.ADMIN
@@ -0,0 +1,66 @@
+import logging
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.conf.config import settings
+from src.database.db import QueryStats, current_query_stats
+from src.metrics import DB_QUERIES, DB_TIME, route_template
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStatsMiddleware:
+    """
+    Pure ASGI middleware that attributes SQL statements to the request.
+
+    Adds a ``Server-Timing: db`` entry with the number of statements and their
+    total time, records both per route template, and warns when the same
+    statement ran ``SQL_REPEAT_THRESHOLD`` times or more, which usually means
+    an N+1 query pattern.
+    """
+
+    def __init__(self, app: ASGIApp):
+        """
+        Initialize the middleware.
+
+        Args:
+            app (ASGIApp): The wrapped application.
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} queries"',
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_query_stats.reset(token)
+            self._report(scope, stats)
+
+    @staticmethod
+    def _report(scope: Scope, stats: QueryStats) -> None:
+        method, route = scope["method"], route_template(scope)
+        DB_QUERIES.labels(method, route).observe(stats.count)
+        DB_TIME.labels(method, route).observe(stats.duration)
+        for statement, count in stats.repeated(settings.SQL_REPEAT_THRESHOLD):
+            logger.warning(
+                "Possible N+1 query: %s %s ran %d times: %s",
+                method,
+                route,
+                count,
+                statement,
+            )
@@ -1,12 +1,31 @@
-from typing import List, Optional
-from sqlalchemy import select, func
+from typing import AsyncIterator, List, Optional, Tuple
+from sqlalchemy import Row, select, func, or_, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.database.models import Contact, User
+from src.database.models import Contact, ContactTombstone, User
 from src.schemas import ContactModel
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
 from pydantic import EmailStr
 
 
+def upcoming_birthdays_filter(today: date, days: int = 7):
+    """
+    Build the condition for birthdays within the next days, across New Year.
+
+    Args:
+        today (date): First day of the window.
+        days (int, optional): Length of the window. Defaults to 7.
+
+    Returns:
+        ColumnElement[bool]: SQL condition on ``Contact.birthday``.
+    """
+    start = today.strftime("%m-%d")
+    end = (today + timedelta(days=days)).strftime("%m-%d")
+    month_day = func.to_char(Contact.birthday, "MM-DD")
+    if start <= end:
+        return month_day.between(start, end)
+    return or_(month_day >= start, month_day <= end)
+
+
 class ContactRepository:
     """Repository for managing Contact entities in the database."""
 
@@ -96,6 +115,9 @@ class ContactRepository:
         """
         Deletes a contact for the authenticated user.
 
+        A tombstone is written in the same transaction, so sync clients learn
+        about the deletion.
+
         Args:
             contact_id (int): Contact ID.
             user (User): The authenticated user.
@@ -106,9 +128,78 @@ class ContactRepository:
         contact = await self.get_contact_by_id(contact_id, user)
         if contact:
             await self.db.delete(contact)
+            self.db.add(ContactTombstone(contact_id=contact.id, user_id=user.id))
             await self.db.commit()
         return contact
 
+    async def get_changed_contacts(
+        self,
+        user: User,
+        after: Optional[Tuple[datetime, int]],
+        settle: timedelta,
+        limit: int,
+    ) -> List[Contact]:
+        """
+        Returns the user's contacts written after a position, oldest first.
+
+        Rows written within ``settle`` of now are left for a later call, so a
+        slower transaction that commits an older timestamp is not skipped.
+
+        Args:
+            user (User): The authenticated user.
+            after (Optional[Tuple[datetime, int]]): ``updated_at`` and ID of the
+                last contact already seen, or None to start from the beginning.
+            settle (timedelta): How long recent writes are held back.
+            limit (int): Maximum number of contacts to return.
+
+        Returns:
+            List[Contact]: Contacts ordered by ``updated_at`` and ID.
+        """
+        stmt = select(Contact).where(
+            Contact.user_id == user.id,
+            Contact.updated_at <= func.now() - settle,
+        )
+        if after is not None:
+            stmt = stmt.where(tuple_(Contact.updated_at, Contact.id) > tuple_(*after))
+        stmt = stmt.order_by(Contact.updated_at, Contact.id).limit(limit)
+        result = await self.db.execute(stmt)
+        return result.scalars().all()
+
+    async def get_tombstones(
+        self,
+        user: User,
+        after: Optional[Tuple[datetime, int]],
+        settle: timedelta,
+        limit: int,
+    ) -> List[ContactTombstone]:
+        """
+        Returns tombstones of the user's contacts deleted after a position.
+
+        Args:
+            user (User): The authenticated user.
+            after (Optional[Tuple[datetime, int]]): ``deleted_at`` and ID of the
+                last tombstone already seen, or None to start from the beginning.
+            settle (timedelta): How long recent deletions are held back.
+            limit (int): Maximum number of tombstones to return.
+
+        Returns:
+            List[ContactTombstone]: Tombstones ordered by ``deleted_at`` and ID.
+        """
+        stmt = select(ContactTombstone).where(
+            ContactTombstone.user_id == user.id,
+            ContactTombstone.deleted_at <= func.now() - settle,
+        )
+        if after is not None:
+            stmt = stmt.where(
+                tuple_(ContactTombstone.deleted_at, ContactTombstone.id)
+                > tuple_(*after)
+            )
+        stmt = stmt.order_by(ContactTombstone.deleted_at, ContactTombstone.id).limit(
+            limit
+        )
+        result = await self.db.execute(stmt)
+        return result.scalars().all()
+
     async def search_contacts(
         self,
         user: User,
@@ -148,14 +239,54 @@ class ContactRepository:
         Returns:
             List[Contact]: List of contacts with upcoming birthdays.
         """
-        today = date.today()
-        in_seven_days = today + timedelta(days=7)
-        today_str = today.strftime("%m-%d")
-        in_seven_days_str = in_seven_days.strftime("%m-%d")
-
         stmt = select(Contact).where(
             Contact.user_id == user.id,
-            func.to_char(Contact.birthday, "MM-DD").between(today_str, in_seven_days_str)
+            upcoming_birthdays_filter(date.today()),
         )
         result = await self.db.execute(stmt)
         return result.scalars().all()
+
+    async def stream_upcoming_birthdays(
+        self,
+        today: date,
+        days: int = 7,
+        after_user_id: int = 0,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Row]:
+        """
+        Stream upcoming birthdays of all confirmed users in one query.
+
+        Rows are ordered by user and fetched from a server-side cursor in
+        batches, so memory stays bounded however many users there are.
+
+        Args:
+            today (date): First day of the window.
+            days (int, optional): Length of the window. Defaults to 7.
+            after_user_id (int, optional): Only users with a greater ID, to
+                resume an interrupted run. Defaults to 0.
+            batch_size (int, optional): Rows fetched per round trip. Defaults to 1000.
+
+        Yields:
+            Row: User ID, email and username with the contact's name and birthday.
+        """
+        stmt = (
+            select(
+                User.id.label("user_id"),
+                User.email,
+                User.username,
+                Contact.first_name,
+                Contact.last_name,
+                Contact.birthday,
+            )
+            .join(Contact, Contact.user_id == User.id)
+            .where(
+                User.id > after_user_id,
+                User.confirmed.is_(True),
+                upcoming_birthdays_filter(today, days),
+            )
+            .order_by(User.id, Contact.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.db.stream(stmt)
+        async for row in result:
+            yield row
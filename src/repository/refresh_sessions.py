@@ -0,0 +1,160 @@
+import json
+from typing import List, Optional
+
+from redis.asyncio import Redis
+
+SESSION_KEY = "refresh_session:{jti}"
+USED_KEY = "refresh_used:{jti}"
+FAMILY_KEY = "refresh_family:{family}"
+USER_KEY = "refresh_user:{username}"
+
+# Atomically consumes a session and leaves a marker behind, so a second use of
+# the same refresh token can be told apart from an unknown or expired one.
+CONSUME_SCRIPT = """
+local data = redis.call('GETDEL', KEYS[1])
+if data then
+    redis.call('SET', KEYS[2], '1', 'EX', ARGV[1])
+    return data
+end
+if redis.call('EXISTS', KEYS[2]) == 1 then
+    return -1
+end
+return false
+"""
+
+# Stores a session unless it rotates a family that has been revoked since the
+# previous token was consumed, so a revocation cannot be undone by a refresh.
+SAVE_SCRIPT = """
+if ARGV[5] ~= '' and (redis.call('GET', KEYS[2]) ~= ARGV[5]
+        or redis.call('SISMEMBER', KEYS[3], ARGV[3]) == 0) then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[4])
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[4])
+redis.call('SADD', KEYS[3], ARGV[3])
+redis.call('EXPIRE', KEYS[3], ARGV[4])
+return 1
+"""
+
+REUSED = -1
+
+
+class RefreshSessionRepository:
+    """Repository for refresh-token sessions stored in Redis."""
+
+    def __init__(self, redis: Redis):
+        """
+        Initializes the repository with a Redis client.
+
+        Args:
+            redis (Redis): Asynchronous Redis client.
+        """
+        self.redis = redis
+        self._consume = redis.register_script(CONSUME_SCRIPT)
+        self._save = redis.register_script(SAVE_SCRIPT)
+
+    async def save(
+        self, session: dict, ttl: int, previous_jti: Optional[str] = None
+    ) -> bool:
+        """
+        Stores a session as the current one of its family.
+
+        Args:
+            session (dict): Session data with ``jti``, ``family`` and ``username`` keys.
+            ttl (int): Time-to-live in seconds, matching the refresh token lifetime.
+            previous_jti (Optional[str]): ID of the rotated token, if any. The
+                session is only stored while the family still points at it.
+
+        Returns:
+            bool: False if the family was revoked in the meantime.
+        """
+        stored = await self._save(
+            keys=[
+                SESSION_KEY.format(jti=session["jti"]),
+                FAMILY_KEY.format(family=session["family"]),
+                USER_KEY.format(username=session["username"]),
+            ],
+            args=[
+                json.dumps(session),
+                session["jti"],
+                session["family"],
+                ttl,
+                previous_jti or "",
+            ],
+        )
+        return bool(stored)
+
+    async def consume(self, jti: str, ttl: int) -> dict | int | None:
+        """
+        Atomically removes a session so it can be rotated.
+
+        Args:
+            jti (str): Refresh token ID.
+            ttl (int): How long to remember that the token was used, in seconds.
+
+        Returns:
+            dict | int | None: The session data, ``REUSED`` if the token was
+            already consumed, or None if it is unknown.
+        """
+        result = await self._consume(
+            keys=[SESSION_KEY.format(jti=jti), USED_KEY.format(jti=jti)], args=[ttl]
+        )
+        if result == REUSED or result is None:
+            return result
+        return json.loads(result)
+
+    async def list_sessions(self, username: str) -> List[dict]:
+        """
+        Returns the active sessions of a user, pruning expired families.
+
+        Args:
+            username (str): The session owner.
+
+        Returns:
+            List[dict]: Session data of every active family.
+        """
+        user_key = USER_KEY.format(username=username)
+        families = [f.decode() for f in await self.redis.smembers(user_key)]
+        if not families:
+            return []
+        jtis = await self.redis.mget([FAMILY_KEY.format(family=f) for f in families])
+        session_keys = [SESSION_KEY.format(jti=j.decode()) for j in jtis if j]
+        data = await self.redis.mget(session_keys) if session_keys else []
+        sessions = [json.loads(d) for d in data if d]
+
+        active = {s["family"] for s in sessions}
+        stale = [f for f in families if f not in active]
+        if stale:
+            await self.redis.srem(user_key, *stale)
+        return sessions
+
+    async def revoke_family(self, username: str, family: str) -> bool:
+        """
+        Revokes a session family, invalidating its current refresh token.
+
+        Args:
+            username (str): The session owner.
+            family (str): Session family ID.
+
+        Returns:
+            bool: True if the family belonged to the user.
+        """
+        user_key = USER_KEY.format(username=username)
+        if not await self.redis.srem(user_key, family):
+            return False
+        family_key = FAMILY_KEY.format(family=family)
+        jti = await self.redis.getdel(family_key)
+        if jti:
+            await self.redis.delete(SESSION_KEY.format(jti=jti.decode()))
+        return True
+
+    async def revoke_all(self, username: str) -> None:
+        """
+        Revokes every session family of a user.
+
+        Args:
+            username (str): The session owner.
+        """
+        families = await self.redis.smembers(USER_KEY.format(username=username))
+        for family in families:
+            await self.revoke_family(username, family.decode())
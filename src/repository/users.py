@@ -1,6 +1,6 @@
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.database.models import User
+from src.database.models import User, UserRole
 from src.schemas import UserCreate
 
 
@@ -79,7 +79,7 @@ class UserRepository:
         await self.db.refresh(user)
         return user
 
-    async def confirmed_email(self, email: str) -> None:
+    async def confirmed_email(self, email: str) -> User:
         """
         Marks a user's email as confirmed.
 
@@ -87,15 +87,16 @@ class UserRepository:
             email (str): The email address of the user to confirm.
 
         Returns:
-            None
+            User: The updated user instance.
         """
         user = await self.get_user_by_email(email)
         user.confirmed = True
         await self.db.commit()
+        return user
 
     async def update_avatar_url(self, email: str, url: str) -> User:
         """
-        Updates the avatar URL of a user.
+        Updates the avatar URL of a user and bumps its profile version.
 
         Args:
             email (str): The email of the user.
@@ -106,6 +107,25 @@ class UserRepository:
         """
         user = await self.get_user_by_email(email)
         user.avatar = url
+        user.profile_version = (user.profile_version or 1) + 1
+        await self.db.commit()
+        await self.db.refresh(user)
+        return user
+
+    async def update_role(self, email: str, role: UserRole) -> User:
+        """
+        Updates the role of a user and bumps its profile version.
+
+        Args:
+            email (str): The email of the user.
+            role (UserRole): The new role.
+
+        Returns:
+            User: The updated user instance.
+        """
+        user = await self.get_user_by_email(email)
+        user.role = role
+        user.profile_version = (user.profile_version or 1) + 1
         await self.db.commit()
         await self.db.refresh(user)
         return user
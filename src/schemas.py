@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr, ConfigDict
-from datetime import date
-from typing import Optional
+from datetime import date, datetime
+from typing import Any, List, Optional
 from src.database.models import UserRole
 
 class ContactModel(BaseModel):
@@ -17,6 +17,16 @@ class ContactResponse(ContactModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+class ContactChange(ContactResponse):
+    updated_at: datetime
+    version: int
+
+class ContactChanges(BaseModel):
+    changed: List[ContactChange]
+    deleted: List[int]
+    cursor: str
+    has_more: bool
+
 class User(BaseModel):
     id: int
     username: str
@@ -26,6 +36,16 @@ class User(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+class Principal(BaseModel):
+    id: int
+    username: str
+    email: str
+    avatar: Optional[str] = None
+    role: UserRole
+    profile_version: int
+
+    model_config = ConfigDict(from_attributes=True)
+
 class UserCreate(BaseModel):
     username: str
     email: str
@@ -40,9 +60,40 @@ class Token(BaseModel):
 class TokenRefreshRequest(BaseModel):
     refresh_token: str
 
+class RefreshSession(BaseModel):
+    id: str
+    device: Optional[str] = None
+    created_at: datetime
+    expires_at: datetime
+
 class RequestEmail(BaseModel):
     email: EmailStr
 
+class UserRoleUpdate(BaseModel):
+    email: EmailStr
+    role: UserRole
+
 class ResetPasswordRequest(BaseModel):
     token: str
     new_password: str
+
+class SlowQueryPlan(BaseModel):
+    fingerprint: str
+    statement: str
+    duration_ms: float
+    captured_at: datetime
+    analyzed: bool
+    shape: List[str]
+    shape_hash: str
+    plan_changed: bool
+    plan: List[Any]
+
+class RequestProfile(BaseModel):
+    id: str
+    method: str
+    path: str
+    route: str
+    status: int
+    duration_ms: float
+    captured_at: datetime
+    requested: bool
@@ -1,24 +1,31 @@
+import asyncio
 from datetime import datetime, timedelta, UTC
+from uuid import uuid4
 from typing import Optional, Literal
 from fastapi import Depends, HTTPException, status
 from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from sqlalchemy import select
 from jose import JWTError, jwt
-from src.database.db import get_db
+from src.database.db import get_db, sessionmanager
 from src.conf.config import settings
-from src.services.users import UserService
+from src.services.users import UserService, user_cache_key
 from src.database.models import User
 from src.cache.cache_decorator import redis_cache
-from pydantic import EmailStr
+from src.cache.token_cache import token_cache
+from src.cache.revocation import revocation_list
+from pydantic import EmailStr, ValidationError
 from src.database.models import UserRole
+from src.metrics import PASSWORD_HASH
+from src.schemas import Principal
 
 
 class Hash:
     """Utility class for hashing and verifying passwords using bcrypt."""
 
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    pwd_context = CryptContext(
+        schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS
+    )
 
     def verify_password(self, plain_password, hashed_password):
         """
@@ -31,7 +38,8 @@ class Hash:
         Returns:
             bool: True if the password matches, False otherwise.
         """
-        return self.pwd_context.verify(plain_password, hashed_password)
+        with PASSWORD_HASH.labels("verify").time():
+            return self.pwd_context.verify(plain_password, hashed_password)
 
     def get_password_hash(self, password: str):
         """
@@ -43,7 +51,36 @@ class Hash:
         Returns:
             str: The hashed password.
         """
-        return self.pwd_context.hash(password)
+        with PASSWORD_HASH.labels("hash").time():
+            return self.pwd_context.hash(password)
+
+    def needs_update(self, hashed_password: str) -> bool:
+        """
+        Checks whether a stored hash was produced with an outdated policy.
+
+        Args:
+            hashed_password (str): The hashed password.
+
+        Returns:
+            bool: True if the hash should be regenerated with the current cost.
+        """
+        return self.pwd_context.needs_update(hashed_password)
+
+
+async def rehash_password(email: str, password: str):
+    """
+    Re-hashes a password with the current bcrypt policy and stores it.
+
+    Hashing runs in a worker thread and uses its own database session, so it
+    can be scheduled as a background task after the login response is sent.
+
+    Args:
+        email (str): Email of the user whose hash is outdated.
+        password (str): The verified plaintext password.
+    """
+    new_hash = await asyncio.to_thread(Hash().get_password_hash, password)
+    async with sessionmanager.session() as db:
+        await UserService(db).reset_password(email, new_hash)
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
@@ -66,6 +103,7 @@ def create_token(
     to_encode = data.copy()
     now = datetime.now(UTC)
     expire = now + expires_delta
+    to_encode.setdefault("jti", uuid4().hex)
     to_encode.update({"exp": expire, "iat": now, "token_type": token_type})
     encoded_jwt = jwt.encode(
         to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM
@@ -113,70 +151,243 @@ async def create_refresh_token(data: dict, expires_delta: Optional[float] = None
     return refresh_token
 
 
-def user_cache_key(token: str, *args, **kwargs):
+def access_token_claims(
+    user: User, epoch: int = 0, session_id: Optional[str] = None
+) -> dict:
+    """
+    Builds the claims for a user's access token.
+
+    The refresh session the token was issued with is kept in ``sid``, so
+    logging out can end that session too. With ``TOKEN_EMBED_CLAIMS`` enabled the token also carries the user's id,
+    profile fields, role and profile version, so authorization checks can be
+    answered from the token alone. Only changes made through ``UserService``
+    bump the profile version; a role changed directly in the database stays
+    invisible to such tokens until they expire.
+
+    Args:
+        user (User): The user the token is issued for.
+        epoch (int, optional): The user's current token epoch. Defaults to 0.
+        session_id (Optional[str], optional): The refresh session family.
+            Defaults to None.
+
+    Returns:
+        dict: Claims to pass to ``create_access_token``.
+    """
+    claims = {"sub": user.username}
+    if epoch:
+        claims["epoch"] = epoch
+    if session_id:
+        claims["sid"] = session_id
+    if settings.TOKEN_EMBED_CLAIMS:
+        claims.update(
+            {
+                "uid": user.id,
+                "email": user.email,
+                "avatar": user.avatar,
+                "role": UserRole(user.role).value,
+                "ver": user.profile_version or 1,
+            }
+        )
+    return claims
+
+
+def principal_from_claims(payload: dict) -> Principal | None:
+    """
+    Builds a principal from embedded access token claims.
+
+    Args:
+        payload (dict): Verified token claims.
+
+    Returns:
+        Principal | None: The principal, or None if the token carries no identity claims.
+    """
+    if "uid" not in payload or "ver" not in payload:
+        return None
+    try:
+        return Principal(
+            id=payload["uid"],
+            username=payload["sub"],
+            email=payload["email"],
+            avatar=payload.get("avatar"),
+            role=payload["role"],
+            profile_version=payload["ver"],
+        )
+    except (KeyError, ValidationError):
+        return None
+
+
+def decode_access_token(token: str) -> dict:
     """
-    Builds a cache key based on the JWT token.
+    Verifies a JWT and returns its claims, memoizing them in process memory.
+
+    Repeated requests with the same bearer token skip signature verification
+    until the token expires.
 
     Args:
         token (str): The JWT token.
 
+    Raises:
+        JWTError: If the token is invalid or expired.
+
     Returns:
-        str: The cache key.
+        dict: The verified token claims.
     """
-    return f"user({token})"
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = jwt.decode(
+            token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM]
+        )
+        token_cache.set(token, payload)
+    return payload
 
 
-@redis_cache(key_builder=user_cache_key, expire=600)
-async def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
-):
+async def authenticate_token(token: str) -> dict:
     """
-    Retrieves the current user from the token, using caching.
+    Verifies an access token and checks it against the revocation list.
+
+    Refresh and other token types are rejected, so they cannot be used as
+    bearer tokens.
 
     Args:
         token (str): JWT token from OAuth2.
-        db (Session): SQLAlchemy database session.
 
     Raises:
-        HTTPException: If the token is invalid or user not found.
+        HTTPException: If the token is invalid, expired or revoked.
 
     Returns:
-        User: Authenticated user.
+        dict: The verified token claims.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-
     try:
-        payload = jwt.decode(
-            token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM]
-        )
-        username = payload["sub"]
-        if username is None:
-            raise credentials_exception
-    except JWTError as e:
+        payload = decode_access_token(token)
+    except JWTError:
         raise credentials_exception
-    user_service = UserService(db)
-    user = await user_service.get_user_by_username(username)
-    if user is None:
+    if payload.get("sub") is None or payload.get("token_type") != "access":
         raise credentials_exception
+    await revocation_list.sync()
+    if revocation_list.is_revoked(payload):
+        raise credentials_exception
+    return payload
+
+
+@redis_cache(key_builder=user_cache_key, expire=600)
+async def load_user(username: str, db: Session):
+    """
+    Loads a user by username, using caching.
+
+    Args:
+        username (str): The username to look up.
+        db (Session): SQLAlchemy database session.
+
+    Returns:
+        User | None: The user if found, otherwise None.
+    """
+    return await UserService(db).get_user_by_username(username)
+
+
+async def resolve_principal(payload: dict, db: Session) -> Principal | None:
+    """
+    Builds the principal of verified token claims, preferably without lookups.
+
+    Embedded identity claims are trusted unless a newer profile version has
+    been observed for the user, in which case the user is reloaded from the
+    database. Tokens without embedded claims load the user through the cache.
+
+    Args:
+        payload (dict): Verified access token claims.
+        db (Session): SQLAlchemy database session.
+
+    Returns:
+        Principal | None: The principal, or None if the user no longer exists.
+    """
+    principal = principal_from_claims(payload)
+    if principal is None:
+        user = await load_user(payload["sub"], db)
+    elif revocation_list.is_stale(principal.id, principal.profile_version):
+        user = await UserService(db).get_user_by_id(principal.id)
+    else:
+        return principal
+    if user is None:
+        return None
+    revocation_list.observe_profile_version(user.id, user.profile_version)
+    return Principal.model_validate(user)
+
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
+):
+    """
+    Retrieves the current user from the token.
+
+    The token is verified and checked for revocation before any cache lookup,
+    so expired or revoked tokens are never served from the user cache.
+
+    Args:
+        token (str): JWT token from OAuth2.
+        db (Session): SQLAlchemy database session.
+
+    Raises:
+        HTTPException: If the token is invalid or user not found.
+
+    Returns:
+        User: Authenticated user.
+    """
+    payload = await authenticate_token(token)
+    user = await load_user(payload["sub"], db)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
 
 
-def get_current_admin_user(current_user: User = Depends(get_current_user)):
+async def get_current_principal(
+    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
+) -> Principal:
+    """
+    Retrieves the current principal, preferably from the token claims alone.
+
+    See ``resolve_principal`` for when the user is loaded.
+
+    Args:
+        token (str): JWT token from OAuth2.
+        db (Session): SQLAlchemy database session.
+
+    Raises:
+        HTTPException: If the token is invalid or user not found.
+
+    Returns:
+        Principal: Authenticated principal.
+    """
+    payload = await authenticate_token(token)
+    principal = await resolve_principal(payload, db)
+    if principal is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return principal
+
+
+def get_current_admin_user(current_user: Principal = Depends(get_current_principal)):
     """
     Ensures the current user is an admin.
 
     Args:
-        current_user (User): The currently authenticated user.
+        current_user (Principal): The currently authenticated principal.
 
     Raises:
         HTTPException: If user is not an admin.
 
     Returns:
-        User: The admin user.
+        Principal: The admin principal.
     """
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
@@ -228,34 +439,25 @@ async def get_email_from_token(token: str):
         )
 
 
-async def verify_refresh_token(refresh_token: str, db: Session):
+async def verify_refresh_token(refresh_token: str) -> Optional[dict]:
     """
-    Verifies and returns a user from a refresh token.
+    Verifies a refresh token and returns its claims.
 
     Args:
         refresh_token (str): The refresh token to verify.
-        db (Session): SQLAlchemy session.
 
     Returns:
-        Optional[User]: The user if valid, otherwise None.
+        Optional[dict]: The token claims if valid, otherwise None.
     """
     try:
         payload = jwt.decode(
             refresh_token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM]
         )
-        username: str = payload.get("sub")
-        token_type: str = payload.get("token_type")
-        if username is None or token_type != "refresh":
-            return None
-        result = await db.execute(
-            select(User).where(
-                User.username == username, User.refresh_token == refresh_token
-            )
-        )
-        user = result.scalar_one_or_none()
-        return user
     except JWTError:
         return None
+    if payload.get("sub") is None or payload.get("token_type") != "refresh":
+        return None
+    return payload
 
 
 async def generate_reset_token(email: EmailStr):
@@ -0,0 +1,362 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from fastapi import HTTPException, status
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.cache.client import redis_client
+from src.conf.config import settings
+
+logger = logging.getLogger(__name__)
+
+CREATED = "created"
+UPDATED = "updated"
+DELETED = "deleted"
+# Tells the client that events were lost and it should resync from
+# GET /contacts/changes.
+RESET = "reset"
+
+# How long the hub blocks on XREAD before it picks up newly connected users.
+READ_BLOCK_MS = 1000
+READ_COUNT = 100
+# Reconnection delay suggested to clients, in milliseconds.
+RETRY_MS = 3000
+
+
+def events_key(user_id: int) -> str:
+    return f"contacts:events:{user_id}"
+
+
+def connections_key(user_id: int) -> str:
+    return f"contacts:events:connections:{user_id}"
+
+
+def _decode(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _parse_id(entry_id: str) -> Tuple[int, int]:
+    ms, _, seq = entry_id.partition("-")
+    return int(ms), int(seq or 0)
+
+
+def format_event(entry_id: str, event: str, data: dict) -> str:
+    """
+    Format one server-sent event.
+
+    Args:
+        entry_id (str): Event ID, sent back by the client as Last-Event-ID.
+        event (str): Event type.
+        data (dict): JSON-serializable payload.
+
+    Returns:
+        str: The event in ``text/event-stream`` format.
+    """
+    return f"id: {entry_id}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class Subscription:
+    """One open event stream with its bounded buffer of undelivered events."""
+
+    def __init__(self, user_id: int, buffer_size: int):
+        """
+        Initialize the subscription.
+
+        Args:
+            user_id (int): Owner of the contacts.
+            buffer_size (int): Maximum number of buffered events.
+        """
+        self.user_id = user_id
+        self.connection_id = uuid.uuid4().hex
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+        self.last_id = "0-0"
+
+    def push(self, entry_id: str, fields: dict) -> None:
+        """
+        Buffer an event without waiting.
+
+        If the buffer is full it is replaced by a single ``None`` marker, and
+        the stream catches up from Redis instead.
+
+        Args:
+            entry_id (str): Stream entry ID.
+            fields (dict): Stream entry fields.
+        """
+        try:
+            self.queue.put_nowait((entry_id, fields))
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+
+class ContactEvents:
+    """
+    Publishes contact changes and fans them out to server-sent event streams.
+
+    Every user has a capped Redis stream of change events, so any API process
+    sees the events of every other and a reconnecting client can resume from
+    its Last-Event-ID. Each process runs one hub task that reads the streams of
+    all users connected to it with a single blocking XREAD and copies new
+    events into the buffer of each of their connections.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        maxlen: int,
+        ttl: int,
+        buffer_size: int,
+        max_streams: int,
+        heartbeat: float,
+    ):
+        """
+        Initialize the event hub.
+
+        Args:
+            redis (Redis): Asynchronous Redis client.
+            maxlen (int): Approximate number of events kept per user.
+            ttl (int): Seconds an idle user's stream is kept.
+            buffer_size (int): Maximum buffered events per connection.
+            max_streams (int): Maximum open streams per user across processes.
+            heartbeat (float): Seconds between keep-alive comments.
+        """
+        self.redis = redis
+        self.maxlen = maxlen
+        self.ttl = ttl
+        self.buffer_size = buffer_size
+        self.max_streams = max_streams
+        self.heartbeat = heartbeat
+        self._subscribers: Dict[int, Set[Subscription]] = {}
+        self._positions: Dict[int, str] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def publish(self, user_id: int, event: str, contact_id: int) -> None:
+        """
+        Publish a contact change to the user's event stream.
+
+        The change is already committed, so a Redis failure is only logged;
+        clients recover through GET /contacts/changes.
+
+        Args:
+            user_id (int): Owner of the contact.
+            event (str): ``CREATED``, ``UPDATED`` or ``DELETED``.
+            contact_id (int): The changed contact's ID.
+        """
+        key = events_key(user_id)
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.xadd(
+                    key,
+                    {"event": event, "id": contact_id},
+                    maxlen=self.maxlen,
+                    approximate=True,
+                )
+                pipe.expire(key, self.ttl)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning("Contact event not published: %s", e)
+
+    async def open(self, user_id: int) -> Subscription:
+        """
+        Reserve a stream slot for a user and subscribe to their events.
+
+        Slots of connections that stopped sending heartbeats expire after
+        three heartbeat intervals.
+
+        Args:
+            user_id (int): Owner of the contacts.
+
+        Returns:
+            Subscription: The new subscription.
+
+        Raises:
+            HTTPException: 429 if the user already has ``max_streams`` open
+                streams, 503 if Redis is unavailable.
+        """
+        subscription = Subscription(user_id, self.buffer_size)
+        key = connections_key(user_id)
+        now = time.time()
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.zremrangebyscore(key, "-inf", now - 3 * self.heartbeat)
+                pipe.zadd(key, {subscription.connection_id: now})
+                pipe.zcard(key)
+                pipe.expire(key, int(3 * self.heartbeat) + 1)
+                _, _, count, _ = await pipe.execute()
+            if count > self.max_streams:
+                await self.redis.zrem(key, subscription.connection_id)
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many open event streams",
+                )
+            tail = await self._tail(user_id)
+        except RedisError as e:
+            logger.warning("Contact events unavailable: %s", e)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Event stream unavailable",
+            )
+        subscription.last_id = tail
+        self._positions.setdefault(user_id, tail)
+        self._subscribers.setdefault(user_id, set()).add(subscription)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return subscription
+
+    async def close(self, subscription: Subscription) -> None:
+        """
+        Unsubscribe and release the stream slot.
+
+        Args:
+            subscription (Subscription): The subscription to close.
+        """
+        user_id = subscription.user_id
+        subscribers = self._subscribers.get(user_id, set())
+        subscribers.discard(subscription)
+        if not subscribers:
+            self._subscribers.pop(user_id, None)
+            self._positions.pop(user_id, None)
+        try:
+            await self.redis.zrem(connections_key(user_id), subscription.connection_id)
+        except RedisError as e:
+            logger.warning("Contact events unavailable: %s", e)
+
+    async def stream(
+        self, subscription: Subscription, last_event_id: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Yield the events of a subscription in ``text/event-stream`` format.
+
+        Events after ``last_event_id`` are replayed from Redis first. A
+        ``reset`` event is sent instead if some of them were already trimmed.
+        A comment is sent after every ``heartbeat`` seconds of silence. The
+        subscription is closed when the client disconnects.
+
+        Args:
+            subscription (Subscription): Subscription returned by ``open``.
+            last_event_id (Optional[str]): Last-Event-ID sent by a reconnecting
+                client.
+
+        Yields:
+            str: Server-sent events and keep-alive comments.
+        """
+        try:
+            yield f"retry: {RETRY_MS}\n\n"
+            if last_event_id:
+                try:
+                    _parse_id(last_event_id)
+                except ValueError:
+                    last_event_id = None
+            if last_event_id:
+                subscription.last_id = last_event_id
+                for chunk in await self._catch_up(subscription):
+                    yield chunk
+            loop = asyncio.get_running_loop()
+            touched = loop.time()
+            while True:
+                if loop.time() - touched >= self.heartbeat:
+                    await self._touch(subscription)
+                    touched = loop.time()
+                try:
+                    item = await asyncio.wait_for(
+                        subscription.queue.get(), self.heartbeat
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if item is None:
+                    for chunk in await self._catch_up(subscription):
+                        yield chunk
+                    continue
+                chunk = self._deliver(subscription, *item)
+                if chunk:
+                    yield chunk
+        finally:
+            await self.close(subscription)
+
+    def _deliver(self, subscription: Subscription, entry_id: str, fields: dict) -> str:
+        # Entries at or before the last delivered one were already replayed.
+        if _parse_id(entry_id) <= _parse_id(subscription.last_id):
+            return ""
+        subscription.last_id = entry_id
+        event = _decode(fields[b"event"])
+        return format_event(entry_id, event, {"id": int(fields[b"id"])})
+
+    async def _catch_up(self, subscription: Subscription) -> List[str]:
+        key = events_key(subscription.user_id)
+        try:
+            first = await self.redis.xrange(key, "-", "+", count=1)
+            entries = await self.redis.xrange(
+                key, f"({subscription.last_id}", "+", count=self.maxlen
+            )
+        except RedisError as e:
+            logger.warning("Contact events unavailable: %s", e)
+            entries, first = [], None
+        since = _parse_id(subscription.last_id)
+        if since != (0, 0) and (
+            not first or _parse_id(_decode(first[0][0])) > since
+        ):
+            # Events after last_id may have been trimmed or expired.
+            subscription.last_id = await self._tail(subscription.user_id)
+            return [format_event(subscription.last_id, RESET, {})]
+        chunks = []
+        for entry_id, fields in entries:
+            chunk = self._deliver(subscription, _decode(entry_id), fields)
+            if chunk:
+                chunks.append(chunk)
+        return chunks
+
+    async def _touch(self, subscription: Subscription) -> None:
+        key = connections_key(subscription.user_id)
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.zadd(key, {subscription.connection_id: time.time()})
+                pipe.expire(key, int(3 * self.heartbeat) + 1)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning("Contact events unavailable: %s", e)
+
+    async def _tail(self, user_id: int) -> str:
+        last = await self.redis.xrevrange(events_key(user_id), "+", "-", count=1)
+        return _decode(last[0][0]) if last else "0-0"
+
+    async def _run(self) -> None:
+        while self._subscribers:
+            streams = {
+                events_key(user_id): self._positions[user_id]
+                for user_id in self._subscribers
+            }
+            try:
+                result = await self.redis.xread(
+                    streams, count=READ_COUNT, block=READ_BLOCK_MS
+                )
+            except RedisError as e:
+                logger.warning("Contact events unavailable: %s", e)
+                await asyncio.sleep(READ_BLOCK_MS / 1000)
+                continue
+            for key, entries in result:
+                user_id = int(_decode(key).rsplit(":", 1)[1])
+                subscribers = self._subscribers.get(user_id)
+                if not subscribers:
+                    continue
+                for entry_id, fields in entries:
+                    entry_id = _decode(entry_id)
+                    self._positions[user_id] = entry_id
+                    for subscription in subscribers:
+                        subscription.push(entry_id, fields)
+
+
+contact_events = ContactEvents(
+    redis_client,
+    maxlen=settings.CONTACT_EVENTS_MAXLEN,
+    ttl=settings.CONTACT_EVENTS_TTL,
+    buffer_size=settings.SSE_BUFFER_SIZE,
+    max_streams=settings.SSE_MAX_STREAMS_PER_USER,
+    heartbeat=settings.SSE_HEARTBEAT_INTERVAL,
+)
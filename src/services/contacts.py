@@ -1,9 +1,15 @@
-from typing import Optional
+import base64
+import json
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from pydantic import EmailStr
 
+from src.cache.contacts_version import contacts_version
+from src.conf.config import settings
+from src.services.contact_events import CREATED, DELETED, UPDATED, contact_events
 from src.repository.contacts import ContactRepository
 from src.schemas import ContactModel
 from src.database.models import User
@@ -25,9 +31,65 @@ def _handle_integrity_error(e: IntegrityError):
     )
 
 
+Position = Optional[Tuple[datetime, int]]
+
+
+def encode_cursor(contacts: Position, deleted: Position) -> str:
+    """
+    Encode the positions of both change streams into an opaque sync cursor.
+
+    Args:
+        contacts (Position): ``updated_at`` and ID of the last changed contact seen.
+        deleted (Position): ``deleted_at`` and ID of the last tombstone seen.
+
+    Returns:
+        str: URL-safe cursor.
+    """
+    data = {
+        key: None if position is None else [position[0].isoformat(), position[1]]
+        for key, position in (("c", contacts), ("d", deleted))
+    }
+    raw = json.dumps(data, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Tuple[Position, Position]:
+    """
+    Decode a sync cursor.
+
+    Args:
+        cursor (Optional[str]): Cursor from a previous page, or None for a full sync.
+
+    Returns:
+        Tuple[Position, Position]: Positions of the contacts and tombstone streams.
+
+    Raises:
+        HTTPException: If the cursor is malformed.
+    """
+    if not cursor:
+        return None, None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        return tuple(
+            None
+            if data[key] is None
+            else (datetime.fromisoformat(data[key][0]), int(data[key][1]))
+            for key in ("c", "d")
+        )
+    except (ValueError, TypeError, KeyError, IndexError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid sync cursor"
+        )
+
+
 class ContactService:
     """
     Service layer for managing contact operations.
+
+    Successful writes bump the owner's contacts version, which invalidates the
+    ETags of their contact reads, and publish a change event to their event
+    streams.
     """
 
     def __init__(self, db: AsyncSession):
@@ -39,6 +101,10 @@ class ContactService:
         """
         self.repository = ContactRepository(db)
 
+    async def _record_change(self, user: User, event: str, contact_id: int):
+        await contacts_version.bump(user.id)
+        await contact_events.publish(user.id, event, contact_id)
+
     async def create_contact(self, body: ContactModel, user: User):
         """
         Create a new contact for the given user.
@@ -54,10 +120,12 @@ class ContactService:
             HTTPException: If a database integrity error occurs.
         """
         try:
-            return await self.repository.create_contact(body, user)
+            contact = await self.repository.create_contact(body, user)
         except IntegrityError as e:
             await self.repository.db.rollback()
             _handle_integrity_error(e)
+        await self._record_change(user, CREATED, contact.id)
+        return contact
 
     async def get_contacts(self, skip: int, limit: int, user: User):
         """
@@ -102,10 +170,13 @@ class ContactService:
             HTTPException: If a database integrity error occurs.
         """
         try:
-            return await self.repository.update_contact(contact_id, body, user)
+            contact = await self.repository.update_contact(contact_id, body, user)
         except IntegrityError as e:
             await self.repository.db.rollback()
             _handle_integrity_error(e)
+        if contact is not None:
+            await self._record_change(user, UPDATED, contact.id)
+        return contact
 
     async def delete_contact(self, contact_id: int, user: User):
         """
@@ -118,7 +189,52 @@ class ContactService:
         Returns:
             Contact | None: The deleted contact if it existed, otherwise None.
         """
-        return await self.repository.delete_contact(contact_id, user)
+        contact = await self.repository.delete_contact(contact_id, user)
+        if contact is not None:
+            await self._record_change(user, DELETED, contact_id)
+        return contact
+
+    async def get_changes(self, user: User, since: Optional[str], limit: int) -> dict:
+        """
+        Retrieve the contacts changed and deleted since a sync cursor.
+
+        Each page holds up to ``limit`` changed contacts and ``limit`` deleted
+        IDs. Writes from the last ``SYNC_SETTLE_SECONDS`` are only returned on
+        a later call, so that changes committed out of order are not missed.
+
+        Args:
+            user (User): The owner of the contacts.
+            since (Optional[str]): Cursor from the previous page, or None for
+                a full sync.
+            limit (int): Maximum number of items per stream.
+
+        Returns:
+            dict: ``changed`` contacts, ``deleted`` contact IDs, the next
+            ``cursor`` and whether there are more changes (``has_more``).
+
+        Raises:
+            HTTPException: If the cursor is malformed.
+        """
+        after_contacts, after_deleted = decode_cursor(since)
+        settle = timedelta(seconds=settings.SYNC_SETTLE_SECONDS)
+        contacts = await self.repository.get_changed_contacts(
+            user, after_contacts, settle, limit + 1
+        )
+        tombstones = await self.repository.get_tombstones(
+            user, after_deleted, settle, limit + 1
+        )
+        has_more = len(contacts) > limit or len(tombstones) > limit
+        contacts, tombstones = contacts[:limit], tombstones[:limit]
+        if contacts:
+            after_contacts = (contacts[-1].updated_at, contacts[-1].id)
+        if tombstones:
+            after_deleted = (tombstones[-1].deleted_at, tombstones[-1].id)
+        return {
+            "changed": contacts,
+            "deleted": [tombstone.contact_id for tombstone in tombstones],
+            "cursor": encode_cursor(after_contacts, after_deleted),
+            "has_more": has_more,
+        }
 
     async def search_contacts(
         self,
@@ -1,10 +1,13 @@
-from pathlib import Path
+from email.message import EmailMessage, Message
+from email.utils import formataddr, formatdate, make_msgid
+from typing import List
 
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
-from fastapi_mail.errors import ConnectionErrors
+from fastapi_mail import ConnectionConfig
 from pydantic import EmailStr
 
 from src.services.auth import create_email_token
+from src.services.email_templates import TEMPLATE_FOLDER, email_templates
+from src.services.smtp import SMTPConnectionPool
 from src.conf.config import settings
 
 conf = ConnectionConfig(
@@ -18,9 +21,114 @@ conf = ConnectionConfig(
     MAIL_FROM_NAME=settings.MAIL_FROM_NAME,
     USE_CREDENTIALS=settings.USE_CREDENTIALS,
     VALIDATE_CERTS=settings.VALIDATE_CERTS,
-    TEMPLATE_FOLDER=Path(__file__).parent / "templates",
+    TEMPLATE_FOLDER=TEMPLATE_FOLDER,
 )
 
+smtp_pool = SMTPConnectionPool(
+    conf,
+    size=settings.SMTP_POOL_SIZE,
+    max_messages=settings.SMTP_MAX_MESSAGES_PER_CONNECTION,
+    idle_timeout=settings.SMTP_IDLE_TIMEOUT,
+)
+
+
+def render_message(
+    recipient: str, subject: str, template_name: str, context: dict
+) -> Message:
+    """
+    Render an HTML template into a MIME message ready to be sent.
+
+    Templates come precompiled from ``email_templates`` instead of being read
+    from disk for every message.
+
+    Args:
+        recipient (str): Recipient's email address.
+        subject (str): Subject line.
+        template_name (str): Template file name in the templates folder.
+        context (dict): Template variables.
+
+    Returns:
+        Message: The MIME message.
+    """
+    message = EmailMessage()
+    message["From"] = formataddr((conf.MAIL_FROM_NAME, conf.MAIL_FROM))
+    message["To"] = recipient
+    message["Subject"] = subject
+    message["Date"] = formatdate(localtime=True)
+    message["Message-ID"] = make_msgid()
+    message.set_content(
+        email_templates.render(template_name, context), subtype="html"
+    )
+    return message
+
+
+async def build_verification_email(
+    email: EmailStr, username: str, host: str
+) -> Message:
+    """
+    Build a verification email with a token for confirming user registration.
+
+    Args:
+        email (EmailStr): Recipient's email address.
+        username (str): Username to include in the template.
+        host (str): Host URL for verification link.
+
+    Returns:
+        Message: The MIME message.
+    """
+    token_verification = create_email_token({"sub": email})
+    return render_message(
+        email,
+        "Confirm your email",
+        "verify_email.html",
+        {"host": host, "username": username, "token": token_verification},
+    )
+
+
+async def build_password_reset_email(
+    email: EmailStr, token: str, host: str
+) -> Message:
+    """
+    Build a password reset email.
+
+    Args:
+        email (EmailStr): Recipient's email address.
+        token (str): Password reset token.
+        host (str): Host URL for reset link.
+
+    Returns:
+        Message: The MIME message.
+    """
+    return render_message(
+        email,
+        "Confirm your email",
+        "password_reset_email.html",
+        {"host": host, "token": token},
+    )
+
+
+async def build_birthday_digest_email(
+    email: EmailStr, username: str, contacts: List[dict]
+) -> Message:
+    """
+    Build a digest of a user's contacts with upcoming birthdays.
+
+    Args:
+        email (EmailStr): Recipient's email address.
+        username (str): Username to include in the template.
+        contacts (List[dict]): Contacts with ``name`` and ``birthday`` keys,
+            in birthday order.
+
+    Returns:
+        Message: The MIME message.
+    """
+    return render_message(
+        email,
+        "Upcoming birthdays",
+        "birthday_digest.html",
+        {"username": username, "contacts": contacts},
+    )
+
 
 async def send_email(email: EmailStr, username: str, host: str):
     """
@@ -35,25 +143,11 @@ async def send_email(email: EmailStr, username: str, host: str):
         None
 
     Raises:
-        Prints error if connection to email server fails.
+        ConnectionErrors: If connection to email server fails, so the email
+            worker can retry the delivery.
     """
-    try:
-        token_verification = create_email_token({"sub": email})
-        message = MessageSchema(
-            subject="Confirm your email",
-            recipients=[email],
-            template_body={
-                "host": host,
-                "username": username,
-                "token": token_verification,
-            },
-            subtype=MessageType.html,
-        )
-
-        fm = FastMail(conf)
-        await fm.send_message(message, template_name="verify_email.html")
-    except ConnectionErrors as err:
-        print(err)
+    await smtp_pool.send(await build_verification_email(email, username, host))
+
 
 async def send_password_reset_email(email: EmailStr, token: str, host: str):
     """
@@ -68,20 +162,7 @@ async def send_password_reset_email(email: EmailStr, token: str, host: str):
         None
 
     Raises:
-        Prints error if connection to email server fails.
+        ConnectionErrors: If connection to email server fails, so the email
+            worker can retry the delivery.
     """
-    try:
-        message = MessageSchema(
-            subject="Confirm your email",
-            recipients=[email],
-            template_body={
-                "host": host,
-                "token": token,
-            },
-            subtype=MessageType.html,
-        )
-
-        fm = FastMail(conf)
-        await fm.send_message(message, template_name="password_reset_email.html")
-    except ConnectionErrors as err:
-        print(err)
+    await smtp_pool.send(await build_password_reset_email(email, token, host))
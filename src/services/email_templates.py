@@ -0,0 +1,85 @@
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from jinja2 import Environment, FileSystemLoader, Template, nodes
+
+TEMPLATE_FOLDER = Path(__file__).parent / "templates"
+
+
+class EmailTemplates:
+    """
+    Email templates compiled once into a shared Jinja environment.
+
+    Templates that consist only of text and ``{{ variable }}`` substitutions are
+    also split into their static parts, so rendering them joins strings without
+    running the compiled template. Other templates render through Jinja.
+    """
+
+    def __init__(self, folder: Path):
+        """
+        Load and compile every template in a folder.
+
+        Args:
+            folder (Path): Folder with the ``.html`` templates.
+        """
+        self.env = Environment(loader=FileSystemLoader(folder), auto_reload=False)
+        self._templates: Dict[str, Template] = {}
+        self._static: Dict[str, Tuple[List[str], List[str]]] = {}
+        for name in self.env.list_templates(extensions=["html"]):
+            self._templates[name] = self.env.get_template(name)
+            source, _, _ = self.env.loader.get_source(self.env, name)
+            parts = self._split(source)
+            if parts is not None:
+                self._static[name] = parts
+
+    def _split(self, source: str) -> Optional[Tuple[List[str], List[str]]]:
+        texts, names = [""], []
+        for output in self.env.parse(source).body:
+            if not isinstance(output, nodes.Output):
+                return None
+            for node in output.nodes:
+                if isinstance(node, nodes.TemplateData):
+                    texts[-1] += node.data
+                elif isinstance(node, nodes.Name):
+                    names.append(node.name)
+                    texts.append("")
+                else:
+                    return None
+        return texts, names
+
+    def is_static(self, name: str) -> bool:
+        """
+        Check whether a template renders through the static-part fast path.
+
+        Args:
+            name (str): Template file name.
+
+        Returns:
+            bool: True if the template has precomputed static parts.
+        """
+        return name in self._static
+
+    def render(self, name: str, context: dict) -> str:
+        """
+        Render a template.
+
+        Args:
+            name (str): Template file name.
+            context (dict): Template variables.
+
+        Returns:
+            str: The rendered template, identical to a Jinja render.
+        """
+        parts = self._static.get(name)
+        if parts is None:
+            return self._templates[name].render(**context)
+        texts, names = parts
+        out = [texts[0]]
+        for variable, text in zip(names, texts[1:]):
+            if variable in context:
+                out.append(str(context[variable]))
+            out.append(text)
+        return "".join(out)
+
+
+email_templates = EmailTemplates(TEMPLATE_FOLDER)
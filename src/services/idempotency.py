@@ -0,0 +1,217 @@
+import asyncio
+import hashlib
+import json
+import logging
+import uuid
+from typing import Awaitable, Callable, Optional
+
+from fastapi import HTTPException, Response, status
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.cache.client import redis_client
+from src.conf.config import settings
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 255
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+# Deletes the in-flight marker only if it still belongs to this request.
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def fingerprint(payload: str) -> str:
+    """
+    Hash a request payload, to detect a key reused for a different request.
+
+    Args:
+        payload (str): Canonical form of the request, e.g. its JSON body.
+
+    Returns:
+        str: Hex digest of the payload.
+    """
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class IdempotencyStore:
+    """
+    Runs mutations at most once per ``Idempotency-Key`` and replays the result.
+
+    The first request with a key stores an in-flight marker, runs, and stores
+    its response for ``ttl`` seconds. Retries with the same key get the stored
+    response without running again; retries that arrive while the first
+    request is still running wait for its result.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        ttl: int,
+        lock_timeout: int,
+        wait_timeout: float,
+        poll_interval: float = 0.05,
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            redis (Redis): Asynchronous Redis client.
+            ttl (int): Seconds a stored response is replayed.
+            lock_timeout (int): Seconds after which an in-flight marker of a
+                crashed request expires.
+            wait_timeout (float): Seconds a duplicate waits for the first request.
+            poll_interval (float, optional): Initial delay between checks while
+                waiting, doubled up to 0.5 seconds. Defaults to 0.05.
+        """
+        self.redis = redis
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._release = redis.register_script(RELEASE_SCRIPT)
+
+    async def run(
+        self,
+        scope: str,
+        key: Optional[str],
+        request_hash: str,
+        handler: Callable[[], Awaitable[Response]],
+    ) -> Response:
+        """
+        Run a handler once per idempotency key.
+
+        Responses and HTTP errors below 500 are stored. Server errors remove
+        the in-flight marker, so the client can retry. Without a key, or if
+        Redis is unavailable, the handler simply runs.
+
+        Args:
+            scope (str): Operation and owner the key belongs to.
+            key (Optional[str]): The client's Idempotency-Key header.
+            request_hash (str): Fingerprint of the request payload.
+            handler (Callable[[], Awaitable[Response]]): Performs the mutation.
+
+        Returns:
+            Response: The handler's response, or the stored one for a retry.
+
+        Raises:
+            HTTPException: 400 for an oversized key, 422 if the key was used
+                for a different request, 409 if the first request is still
+                running after ``wait_timeout``; errors raised by the handler.
+        """
+        if key is None:
+            return await handler()
+        if len(key) > MAX_KEY_LENGTH:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Idempotency-Key is too long",
+            )
+        redis_key = f"idempotency:{scope}:{key}"
+        token = json.dumps(
+            {"state": "pending", "hash": request_hash, "id": uuid.uuid4().hex}
+        )
+        try:
+            stored = await self._claim(redis_key, token)
+        except RedisError as e:
+            logger.warning("Idempotency store unavailable: %s", e)
+            return await handler()
+        if stored is not None:
+            if stored["hash"] != request_hash:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail="Idempotency-Key was used for a different request",
+                )
+            return Response(
+                content=stored["body"].encode(),
+                status_code=stored["status"],
+                media_type=stored["media_type"],
+                headers={REPLAYED_HEADER: "true"},
+            )
+
+        try:
+            response = await handler()
+        except HTTPException as e:
+            if e.status_code >= 500:
+                await self._abandon(redis_key, token)
+                raise
+            body = json.dumps({"detail": e.detail})
+            await self._store(redis_key, request_hash, e.status_code, body)
+            raise
+        except BaseException:
+            await self._abandon(redis_key, token)
+            raise
+        if response.status_code >= 500:
+            await self._abandon(redis_key, token)
+        else:
+            await self._store(
+                redis_key,
+                request_hash,
+                response.status_code,
+                response.body.decode(),
+                response.media_type,
+            )
+        return response
+
+    async def _claim(self, redis_key: str, token: str) -> Optional[dict]:
+        # Returns None once this request owns the key, or the stored response.
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.wait_timeout
+        delay = self.poll_interval
+        while True:
+            if await self.redis.set(redis_key, token, nx=True, ex=self.lock_timeout):
+                return None
+            raw = await self.redis.get(redis_key)
+            if raw is not None:
+                record = json.loads(raw)
+                if record["state"] == "done":
+                    return record
+                if record["hash"] != json.loads(token)["hash"]:
+                    # Fail fast rather than wait for an unrelated result.
+                    return record
+            if loop.time() + delay > deadline:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="A request with this Idempotency-Key is in progress",
+                    headers={"Retry-After": "1"},
+                )
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.5)
+
+    async def _store(
+        self,
+        redis_key: str,
+        request_hash: str,
+        status_code: int,
+        body: str,
+        media_type: Optional[str] = "application/json",
+    ) -> None:
+        record = {
+            "state": "done",
+            "hash": request_hash,
+            "status": status_code,
+            "media_type": media_type,
+            "body": body,
+        }
+        try:
+            await self.redis.set(redis_key, json.dumps(record), ex=self.ttl)
+        except RedisError as e:
+            logger.warning("Idempotency store unavailable: %s", e)
+
+    async def _abandon(self, redis_key: str, token: str) -> None:
+        try:
+            await self._release(keys=[redis_key], args=[token])
+        except RedisError as e:
+            logger.warning("Idempotency store unavailable: %s", e)
+
+
+idempotency = IdempotencyStore(
+    redis_client,
+    ttl=settings.IDEMPOTENCY_TTL,
+    lock_timeout=settings.IDEMPOTENCY_LOCK_TIMEOUT,
+    wait_timeout=settings.IDEMPOTENCY_WAIT_TIMEOUT,
+)
@@ -0,0 +1,77 @@
+from io import BytesIO
+
+from fastapi import HTTPException, UploadFile, status
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from src.conf.config import settings
+
+AVATAR_SIZE = 250
+ALLOWED_FORMATS = {"JPEG", "PNG", "WEBP", "GIF"}
+CHUNK_SIZE = 64 * 1024
+
+
+async def read_limited(file: UploadFile, max_bytes: int) -> bytes:
+    """
+    Read an uploaded file in chunks, stopping as soon as it exceeds a size cap.
+
+    Args:
+        file (UploadFile): The uploaded file.
+        max_bytes (int): Maximum accepted size in bytes.
+
+    Returns:
+        bytes: The file content.
+
+    Raises:
+        HTTPException: If the file is larger than ``max_bytes``.
+    """
+    buffer = BytesIO()
+    while chunk := await file.read(CHUNK_SIZE):
+        if buffer.tell() + len(chunk) > max_bytes:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File is larger than {max_bytes} bytes",
+            )
+        buffer.write(chunk)
+    return buffer.getvalue()
+
+
+def prepare_avatar(data: bytes, size: int = AVATAR_SIZE) -> bytes:
+    """
+    Validate an image and turn it into a square WebP avatar.
+
+    Only the image header is parsed before the pixel count is checked, so
+    decompression bombs are rejected without being decoded. JPEGs are decoded
+    at a reduced scale when they are much larger than the target.
+
+    Args:
+        data (bytes): The uploaded image.
+        size (int, optional): Side of the avatar in pixels. Defaults to 250.
+
+    Returns:
+        bytes: The avatar encoded as WebP.
+
+    Raises:
+        HTTPException: If the data is not a supported image or has too many pixels.
+    """
+    try:
+        with Image.open(BytesIO(data)) as image:
+            if image.format not in ALLOWED_FORMATS:
+                raise UnidentifiedImageError(image.format)
+            if image.width * image.height > settings.AVATAR_MAX_PIXELS:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail="Image dimensions are too large",
+                )
+            image.draft("RGB", (size, size))
+            image = ImageOps.exif_transpose(image)
+            mode = "RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB"
+            avatar = ImageOps.fit(
+                image.convert(mode), (size, size), Image.Resampling.LANCZOS
+            )
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid image file"
+        )
+    output = BytesIO()
+    avatar.save(output, format="WEBP", quality=settings.AVATAR_QUALITY, method=4)
+    return output.getvalue()
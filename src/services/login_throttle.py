@@ -0,0 +1,133 @@
+import logging
+from collections import Counter
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.cache.client import redis_client
+from src.conf.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Counts a failed login against every (failures, block) key pair and blocks a
+# key once its failures reach the threshold, doubling the block each time.
+REGISTER_FAILURE_SCRIPT = """
+local window = tonumber(ARGV[1])
+local base = tonumber(ARGV[2])
+local max_delay = tonumber(ARGV[3])
+local longest = 0
+for i = 1, #KEYS, 2 do
+    local threshold = tonumber(ARGV[3 + (i + 1) / 2])
+    local count = redis.call('INCR', KEYS[i])
+    redis.call('EXPIRE', KEYS[i], window)
+    if count >= threshold then
+        local delay = math.min(max_delay, base * 2 ^ (count - threshold))
+        delay = math.ceil(delay)
+        redis.call('SET', KEYS[i + 1], '1', 'EX', delay)
+        longest = math.max(longest, delay)
+    end
+end
+return longest
+"""
+
+
+class LoginThrottle:
+    """
+    Brute-force protection for the login endpoint.
+
+    Failed logins are counted per username and per client IP in Redis, so the
+    counters are shared by all workers. Once a counter reaches its threshold,
+    further attempts are rejected before the password hash is checked, for a
+    delay that grows exponentially with every additional failure.
+    """
+
+    def __init__(self, redis: Redis):
+        """
+        Initialize the throttle.
+
+        Args:
+            redis (Redis): Asynchronous Redis client.
+        """
+        self.redis = redis
+        self._register_failure = redis.register_script(REGISTER_FAILURE_SCRIPT)
+        self.stats = Counter()
+
+    @staticmethod
+    def _keys(username: str, ip: str) -> list[str]:
+        return [
+            f"login_failures:user:{username}",
+            f"login_blocked:user:{username}",
+            f"login_failures:ip:{ip}",
+            f"login_blocked:ip:{ip}",
+        ]
+
+    async def retry_after(self, username: str, ip: str) -> int:
+        """
+        Return how long a login attempt must wait.
+
+        Args:
+            username (str): The submitted username.
+            ip (str): Client IP address.
+
+        Returns:
+            int: Seconds until the next attempt is allowed, 0 if it is allowed now.
+        """
+        _, user_block, _, ip_block = self._keys(username, ip)
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.ttl(user_block)
+                pipe.ttl(ip_block)
+                ttls = await pipe.execute()
+        except RedisError as e:
+            logger.warning("Login throttle unavailable: %s", e)
+            return 0
+        wait = max(0, *ttls)
+        if wait:
+            self.stats["rejected"] += 1
+        return wait
+
+    async def register_failure(self, username: str, ip: str) -> int:
+        """
+        Count a failed login for the username and the client IP.
+
+        Args:
+            username (str): The submitted username.
+            ip (str): Client IP address.
+
+        Returns:
+            int: Seconds the username or IP is now blocked for, 0 if not blocked.
+        """
+        self.stats["failed"] += 1
+        try:
+            delay = await self._register_failure(
+                keys=self._keys(username, ip),
+                args=[
+                    settings.LOGIN_THROTTLE_WINDOW,
+                    settings.LOGIN_THROTTLE_BASE_DELAY,
+                    settings.LOGIN_THROTTLE_MAX_DELAY,
+                    settings.LOGIN_THROTTLE_USER_THRESHOLD,
+                    settings.LOGIN_THROTTLE_IP_THRESHOLD,
+                ],
+            )
+        except RedisError as e:
+            logger.warning("Login throttle unavailable: %s", e)
+            return 0
+        if delay:
+            self.stats["blocked"] += 1
+        return int(delay)
+
+    async def reset(self, username: str) -> None:
+        """
+        Clear the failure counter of a username after a successful login.
+
+        Args:
+            username (str): The authenticated username.
+        """
+        failures, block, _, _ = self._keys(username, "")
+        try:
+            await self.redis.delete(failures, block)
+        except RedisError as e:
+            logger.warning("Login throttle unavailable: %s", e)
+
+
+login_throttle = LoginThrottle(redis_client)
@@ -0,0 +1,174 @@
+import json
+import logging
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.cache.client import redis_client
+from src.conf.config import settings
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_STREAM = "email:outbox"
+RETRY_QUEUE = "email:retry"
+DEAD_LETTER_STREAM = "email:dead"
+CONSUMER_GROUP = "email-workers"
+
+VERIFY_EMAIL = "verify_email"
+PASSWORD_RESET = "password_reset"
+BIRTHDAY_DIGEST = "birthday_digest"
+
+
+class EmailOutbox:
+    """
+    Durable queue of outgoing emails backed by a Redis stream.
+
+    The API only appends small message records here; SMTP delivery happens in
+    the separate email worker process.
+    """
+
+    def __init__(self, redis: Redis):
+        """
+        Initialize the outbox with a Redis client.
+
+        Args:
+            redis (Redis): Asynchronous Redis client.
+        """
+        self.redis = redis
+
+    @staticmethod
+    def entry(kind: str, payload: dict, attempts: int = 0) -> dict:
+        """
+        Build the stream fields of an outbox message.
+
+        Args:
+            kind (str): Email type, selects the worker's send function.
+            payload (dict): JSON-serializable arguments of the send function.
+            attempts (int, optional): Number of failed deliveries so far. Defaults to 0.
+
+        Returns:
+            dict: Fields to XADD to the outbox stream.
+        """
+        return {"kind": kind, "payload": json.dumps(payload), "attempts": attempts}
+
+    async def enqueue(self, kind: str, payload: dict, attempts: int = 0) -> str:
+        """
+        Append an email to the outbox.
+
+        Args:
+            kind (str): Email type, selects the worker's send function.
+            payload (dict): JSON-serializable arguments of the send function.
+            attempts (int, optional): Number of failed deliveries so far. Defaults to 0.
+
+        Returns:
+            str: The stream entry ID.
+        """
+        entry_id = await self.redis.xadd(
+            OUTBOX_STREAM, self.entry(kind, payload, attempts)
+        )
+        return entry_id.decode() if isinstance(entry_id, bytes) else entry_id
+
+    async def reserve(self, kind: str, address: str) -> bool:
+        """
+        Start the dedup window of an email type for an address.
+
+        Repeated requests inside ``EMAIL_DEDUP_WINDOW`` are coalesced into the
+        email already queued, whose token is still valid, so callers should
+        neither sign a new token nor enqueue when this returns False. If Redis
+        is unavailable the email is not deduplicated.
+
+        Args:
+            kind (str): Email type.
+            address (str): Recipient's email address.
+
+        Returns:
+            bool: True if the caller should send the email.
+        """
+        try:
+            return bool(
+                await self.redis.set(
+                    self._dedup_key(kind, address),
+                    1,
+                    nx=True,
+                    ex=settings.EMAIL_DEDUP_WINDOW,
+                )
+            )
+        except RedisError as e:
+            logger.warning("Email dedup unavailable: %s", e)
+            return True
+
+    async def release(self, kind: str, address: str) -> None:
+        """
+        End the dedup window early, after the reserved email could not be queued.
+
+        Args:
+            kind (str): Email type.
+            address (str): Recipient's email address.
+        """
+        try:
+            await self.redis.delete(self._dedup_key(kind, address))
+        except RedisError as e:
+            logger.warning("Email dedup unavailable: %s", e)
+
+    @staticmethod
+    def _dedup_key(kind: str, address: str) -> str:
+        return f"email_dedup:{kind}:{address.lower()}"
+
+    async def send_verification(self, email: str, username: str, host: str) -> str:
+        """
+        Queue an email verification message.
+
+        Args:
+            email (str): Recipient's email address.
+            username (str): Username to include in the template.
+            host (str): Host URL for the verification link.
+
+        Returns:
+            str: The stream entry ID.
+        """
+        return await self.enqueue(
+            VERIFY_EMAIL, {"email": email, "username": username, "host": host}
+        )
+
+    async def send_password_reset(self, email: str, token: str, host: str) -> str:
+        """
+        Queue a password reset message.
+
+        Args:
+            email (str): Recipient's email address.
+            token (str): Password reset token.
+            host (str): Host URL for the reset link.
+
+        Returns:
+            str: The stream entry ID.
+        """
+        return await self.enqueue(
+            PASSWORD_RESET, {"email": email, "token": token, "host": host}
+        )
+
+    async def depth(self) -> int:
+        """
+        Return the number of entries waiting in the outbox stream.
+
+        Returns:
+            int: Stream length.
+        """
+        return await self.redis.xlen(OUTBOX_STREAM)
+
+    async def queue_lengths(self) -> dict:
+        """
+        Return the number of emails waiting in each stage.
+
+        Returns:
+            dict: Lengths of the "outbox" stream, the "retry" queue and the
+            "dead" letter stream.
+        """
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.xlen(OUTBOX_STREAM)
+            pipe.zcard(RETRY_QUEUE)
+            pipe.xlen(DEAD_LETTER_STREAM)
+            outbox, retry, dead = await pipe.execute()
+        return {"outbox": outbox, "retry": retry, "dead": dead}
+
+
+email_outbox = EmailOutbox(redis_client)
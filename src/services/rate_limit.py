@@ -0,0 +1,155 @@
+import logging
+import math
+from typing import List
+
+from fastapi import HTTPException, Request, status
+from jose import JWTError
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.cache.client import redis_client
+from src.conf.config import settings
+from src.services.auth import decode_access_token
+
+logger = logging.getLogger(__name__)
+
+# Token bucket over one or more keys, evaluated atomically on the Redis server.
+# The request is admitted only if every bucket holds at least ``cost`` tokens;
+# otherwise nothing is deducted and the wait in milliseconds is returned.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local ttl = math.ceil(capacity / rate * 1000)
+
+local levels = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local bucket = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or capacity
+    local ts = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) / 1000 * rate)
+    levels[i] = tokens
+    if tokens < cost then
+        wait = math.max(wait, math.ceil((cost - tokens) / rate * 1000))
+    end
+end
+
+for i, key in ipairs(KEYS) do
+    local tokens = levels[i]
+    if wait == 0 then
+        tokens = tokens - cost
+    end
+    redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', now)
+    redis.call('PEXPIRE', key, ttl)
+end
+return wait
+"""
+
+DEFAULT_COST = 1
+SEARCH_COST = 3
+EMAIL_COST = 5
+PROFILE_COST = 6
+LOGIN_COST = 10
+UPLOAD_COST = 10
+
+
+class RateLimiter:
+    """
+    Distributed token-bucket rate limiter backed by Redis.
+
+    Buckets are shared by all workers, refill at ``rate`` tokens per second up
+    to ``capacity``, and each request takes a route-specific number of tokens.
+    """
+
+    def __init__(self, redis: Redis, rate: float, capacity: int):
+        """
+        Initialize the limiter.
+
+        Args:
+            redis (Redis): Asynchronous Redis client.
+            rate (float): Refill rate in tokens per second.
+            capacity (int): Maximum number of tokens per bucket.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._script = redis.register_script(TOKEN_BUCKET_SCRIPT)
+
+    async def acquire(self, keys: List[str], cost: int) -> float:
+        """
+        Take tokens from every bucket, or from none of them.
+
+        Args:
+            keys (List[str]): Bucket keys, e.g. one per user and one per IP.
+            cost (int): Number of tokens the request costs.
+
+        Returns:
+            float: 0 if the request is allowed, otherwise seconds to wait.
+        """
+        wait_ms = await self._script(
+            keys=keys, args=[self.rate, self.capacity, cost]
+        )
+        return int(wait_ms) / 1000
+
+
+limiter = RateLimiter(
+    redis_client, settings.RATE_LIMIT_RATE, settings.RATE_LIMIT_CAPACITY
+)
+
+
+def rate_limit_keys(request: Request) -> List[str]:
+    """
+    Build the bucket keys for a request.
+
+    Every request is limited per client IP. Requests with a valid bearer token
+    are also limited per user, so a user cannot escape the limit by switching
+    networks.
+
+    Args:
+        request (Request): The incoming HTTP request.
+
+    Returns:
+        List[str]: Redis keys of the buckets to charge.
+    """
+    client_ip = request.client.host if request.client else "unknown"
+    keys = [f"rate_limit:ip:{client_ip}"]
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            keys.append(f"rate_limit:user:{decode_access_token(token)['sub']}")
+        except (JWTError, KeyError):
+            pass
+    return keys
+
+
+def rate_limit(cost: int = DEFAULT_COST):
+    """
+    Create a dependency that charges a request against the shared rate limit.
+
+    If Redis is unavailable the request is let through.
+
+    Args:
+        cost (int, optional): Number of tokens the route costs. Defaults to 1.
+
+    Returns:
+        Callable: A FastAPI dependency.
+    """
+
+    async def dependency(request: Request):
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        try:
+            wait = await limiter.acquire(rate_limit_keys(request), cost)
+        except RedisError as e:
+            logger.warning("Rate limiter unavailable: %s", e)
+            return
+        if wait > 0:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+
+    return dependency
@@ -0,0 +1,155 @@
+from datetime import datetime, timedelta, UTC
+from typing import List, Optional
+from uuid import uuid4
+
+from redis.asyncio import Redis
+
+from src.conf.config import settings
+from src.database.models import User
+from src.repository.refresh_sessions import RefreshSessionRepository, REUSED
+from src.services.auth import create_refresh_token, verify_refresh_token
+
+
+class RefreshSessionService:
+    """
+    Service layer for refresh-token sessions.
+
+    Every login starts a session family that survives token rotation, so a
+    user can stay signed in on several devices and revoke each one separately.
+    """
+
+    def __init__(self, redis: Redis):
+        """
+        Initialize the service with a Redis client.
+
+        Args:
+            redis (Redis): Asynchronous Redis client.
+        """
+        self.repository = RefreshSessionRepository(redis)
+        self.ttl = settings.REFRESH_TOKEN_EXPIRE_MINUTES * 60
+
+    async def create_session(
+        self, user: User, epoch: int, device: Optional[str] = None
+    ) -> tuple[str, str]:
+        """
+        Start a new session family for a user.
+
+        Only the user's identity and token epoch are stored. Access token
+        claims are rebuilt from the current user row on every refresh.
+
+        Args:
+            user (User): The authenticated user.
+            epoch (int): The user's token epoch at login.
+            device (Optional[str]): Client description, e.g. the User-Agent header.
+
+        Returns:
+            tuple[str, str]: The session family ID and its first refresh token.
+        """
+        family = uuid4().hex
+        refresh_token = await self._issue(
+            username=user.username,
+            family=family,
+            epoch=epoch,
+            device=device,
+            created_at=datetime.now(UTC).isoformat(),
+        )
+        return family, refresh_token
+
+    async def rotate(self, refresh_token: str) -> Optional[tuple[dict, str]]:
+        """
+        Exchange a refresh token for a new one of the same family.
+
+        Presenting a token that has already been rotated revokes the whole
+        family, since it means the token was copied. A family revoked while
+        the token is being rotated stays revoked.
+
+        Args:
+            refresh_token (str): The refresh token to exchange.
+
+        Returns:
+            Optional[tuple[dict, str]]: The session data and the new refresh
+            token, or None if the token is invalid, expired, reused or revoked.
+        """
+        payload = await verify_refresh_token(refresh_token)
+        if payload is None or "jti" not in payload or "fam" not in payload:
+            return None
+        session = await self.repository.consume(payload["jti"], self.ttl)
+        if session == REUSED:
+            await self.repository.revoke_family(payload["sub"], payload["fam"])
+            return None
+        if session is None:
+            return None
+        new_token = await self._issue(
+            username=session["username"],
+            family=session["family"],
+            epoch=session["epoch"],
+            device=session["device"],
+            created_at=session["created_at"],
+            previous_jti=session["jti"],
+        )
+        if new_token is None:
+            return None
+        return session, new_token
+
+    async def list_sessions(self, username: str) -> List[dict]:
+        """
+        List the active sessions of a user.
+
+        Args:
+            username (str): The session owner.
+
+        Returns:
+            List[dict]: Session data of every active family.
+        """
+        return await self.repository.list_sessions(username)
+
+    async def revoke_session(self, username: str, session_id: str) -> bool:
+        """
+        Revoke one session family of a user.
+
+        Args:
+            username (str): The session owner.
+            session_id (str): Session family ID.
+
+        Returns:
+            bool: True if the session existed.
+        """
+        return await self.repository.revoke_family(username, session_id)
+
+    async def revoke_all(self, username: str) -> None:
+        """
+        Revoke every session of a user.
+
+        Args:
+            username (str): The session owner.
+        """
+        await self.repository.revoke_all(username)
+
+    async def _issue(
+        self,
+        username: str,
+        family: str,
+        epoch: int,
+        device: Optional[str],
+        created_at: str,
+        previous_jti: Optional[str] = None,
+    ) -> Optional[str]:
+        jti = uuid4().hex
+        refresh_token = await create_refresh_token(
+            data={"sub": username, "jti": jti, "fam": family}
+        )
+        expires_at = datetime.now(UTC) + timedelta(seconds=self.ttl)
+        stored = await self.repository.save(
+            {
+                "jti": jti,
+                "family": family,
+                "username": username,
+                "epoch": epoch,
+                "device": device,
+                "created_at": created_at,
+                "expires_at": expires_at.isoformat(),
+            },
+            self.ttl,
+            previous_jti,
+        )
+        return refresh_token if stored else None
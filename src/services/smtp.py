@@ -0,0 +1,181 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from email.message import Message
+from typing import List, Optional
+
+import aiosmtplib
+from fastapi_mail import ConnectionConfig
+from fastapi_mail.errors import ConnectionErrors
+
+from src.metrics import EMAIL_SEND
+
+logger = logging.getLogger(__name__)
+
+# Errors after which the connection can no longer be used.
+CONNECTION_ERRORS = (
+    aiosmtplib.SMTPServerDisconnected,
+    aiosmtplib.SMTPConnectError,
+    aiosmtplib.SMTPTimeoutError,
+    ConnectionErrors,
+    OSError,
+)
+
+
+@dataclass
+class _Connection:
+    client: aiosmtplib.SMTP
+    last_used: float
+    sent: int = 0
+
+
+class SMTPConnectionPool:
+    """
+    Pool of persistent, authenticated SMTP connections.
+
+    Every connection pays the TCP, TLS and AUTH handshakes once and then sends
+    many messages. Connections that were idle for too long or have sent
+    ``max_messages`` messages are replaced, and a connection the server dropped
+    is reopened and the message resent once.
+    """
+
+    def __init__(
+        self,
+        config: ConnectionConfig,
+        size: int = 5,
+        max_messages: int = 100,
+        idle_timeout: float = 60,
+    ):
+        """
+        Initialize the pool. Connections are opened lazily.
+
+        Args:
+            config (ConnectionConfig): SMTP server settings.
+            size (int): Maximum number of open connections.
+            max_messages (int): Messages sent before a connection is replaced.
+            idle_timeout (float): Seconds after which an idle connection is replaced.
+        """
+        self.config = config
+        self.size = size
+        self.max_messages = max_messages
+        self.idle_timeout = idle_timeout
+        self._idle: List[_Connection] = []
+        self._semaphore = asyncio.Semaphore(size)
+
+    async def send(self, message: Message) -> None:
+        """
+        Send one message.
+
+        Args:
+            message (Message): The email to send.
+
+        Raises:
+            ConnectionErrors: If the SMTP server cannot be reached.
+            SMTPException: If the server rejects the message.
+        """
+        error = (await self.send_many([message]))[0]
+        if error is not None:
+            raise error
+
+    async def send_many(self, messages: List[Message]) -> List[Optional[Exception]]:
+        """
+        Send several messages over one connection.
+
+        A rejected message does not stop the rest of the batch.
+
+        Args:
+            messages (List[Message]): The emails to send.
+
+        Returns:
+            List[Optional[Exception]]: For every message, None if it was sent,
+            otherwise the error.
+        """
+        results: List[Optional[Exception]] = []
+        async with self._semaphore:
+            connection = None
+            for message in messages:
+                start = time.perf_counter()
+                for retry in (False, True):
+                    try:
+                        if connection is None:
+                            connection = await self._checkout()
+                        if not self.config.SUPPRESS_SEND:
+                            await connection.client.send_message(message)
+                        connection.sent += 1
+                        results.append(None)
+                        break
+                    except CONNECTION_ERRORS as e:
+                        if connection is not None:
+                            await self._close(connection)
+                            connection = None
+                        if retry or isinstance(e, ConnectionErrors):
+                            results.append(e)
+                            break
+                        logger.info("SMTP connection lost, reconnecting: %s", e)
+                    except aiosmtplib.SMTPException as e:
+                        results.append(e)
+                        break
+                EMAIL_SEND.labels("sent" if results[-1] is None else "failed").observe(
+                    time.perf_counter() - start
+                )
+            if connection is not None:
+                await self._checkin(connection)
+        return results
+
+    async def close(self) -> None:
+        """Close every idle connection."""
+        idle, self._idle = self._idle, []
+        await asyncio.gather(*(self._close(connection) for connection in idle))
+
+    async def _checkout(self) -> _Connection:
+        now = time.monotonic()
+        while self._idle:
+            connection = self._idle.pop()
+            if (
+                connection.client.is_connected
+                and now - connection.last_used < self.idle_timeout
+            ):
+                return connection
+            await self._close(connection)
+        return _Connection(client=await self._connect(), last_used=now)
+
+    async def _checkin(self, connection: _Connection) -> None:
+        if connection.sent >= self.max_messages:
+            await self._close(connection)
+            return
+        connection.last_used = time.monotonic()
+        self._idle.append(connection)
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        client = aiosmtplib.SMTP(
+            hostname=self.config.MAIL_SERVER,
+            port=self.config.MAIL_PORT,
+            timeout=self.config.TIMEOUT,
+            use_tls=self.config.MAIL_SSL_TLS,
+            start_tls=self.config.MAIL_STARTTLS,
+            validate_certs=self.config.VALIDATE_CERTS,
+            local_hostname=self.config.LOCAL_HOSTNAME,
+        )
+        if self.config.SUPPRESS_SEND:
+            return client
+        try:
+            await client.connect()
+            if self.config.USE_CREDENTIALS:
+                await client.login(
+                    self.config.MAIL_USERNAME,
+                    self.config.MAIL_PASSWORD.get_secret_value(),
+                )
+        except Exception as e:
+            client.close()
+            raise ConnectionErrors(
+                f"Exception raised {e}, check your credentials or email service configuration"
+            )
+        return client
+
+    @staticmethod
+    async def _close(connection: _Connection) -> None:
+        try:
+            await connection.client.quit()
+        except Exception:
+            connection.client.close()
@@ -0,0 +1,194 @@
+import hashlib
+import logging
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from pathlib import Path
+
+import cloudinary
+import cloudinary.uploader
+import urllib3
+from fastapi.staticfiles import StaticFiles
+
+from src.conf.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def content_key(data: bytes, extension: str = "webp") -> str:
+    """
+    Build a content-addressed storage key.
+
+    Args:
+        data (bytes): The stored bytes.
+        extension (str, optional): File extension. Defaults to "webp".
+
+    Returns:
+        str: Key derived from the SHA-256 of the content.
+    """
+    return f"avatars/{hashlib.sha256(data).hexdigest()}.{extension}"
+
+
+class AvatarStorage(ABC):
+    """
+    Interface of avatar storage backends.
+
+    Keys are derived from the content, so an object never changes once stored
+    and storing the same bytes again only returns the existing URL. Methods
+    are blocking and are called from the upload thread pool.
+    """
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """
+        Check whether an object is already stored.
+
+        Args:
+            key (str): Storage key.
+
+        Returns:
+            bool: True if the object exists.
+        """
+
+    @abstractmethod
+    def save(self, key: str, data: bytes) -> None:
+        """
+        Store an object.
+
+        Args:
+            key (str): Storage key.
+            data (bytes): Object content.
+        """
+
+    @abstractmethod
+    def url(self, key: str) -> str:
+        """
+        Return the public URL of an object.
+
+        Args:
+            key (str): Storage key.
+
+        Returns:
+            str: URL of the object.
+        """
+
+    def store(self, data: bytes) -> str:
+        """
+        Store content under its content key unless it is already stored.
+
+        Args:
+            data (bytes): Object content.
+
+        Returns:
+            str: URL of the object.
+        """
+        key = content_key(data)
+        if self.exists(key):
+            logger.debug("Skipping upload of existing %s", key)
+        else:
+            self.save(key, data)
+        return self.url(key)
+
+
+class LocalStorage(AvatarStorage):
+    """Avatar storage in a local folder served by the ``/media`` static mount."""
+
+    def __init__(self, root: str, base_url: str):
+        """
+        Initialize the storage.
+
+        Args:
+            root (str): Folder that holds the objects.
+            base_url (str): URL prefix the folder is served under.
+        """
+        self.root = Path(root)
+        self.base_url = base_url.rstrip("/")
+
+    def exists(self, key: str) -> bool:
+        return (self.root / key).is_file()
+
+    def save(self, key: str, data: bytes) -> None:
+        path = self.root / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so readers never see partial content.
+        fd, tmp = tempfile.mkstemp(dir=path.parent)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+
+class CloudinaryStorage(AvatarStorage):
+    """Avatar storage on Cloudinary."""
+
+    def __init__(self, cloud_name: str, api_key, api_secret: str, timeout: float):
+        """
+        Configure the Cloudinary client once for the process.
+
+        Args:
+            cloud_name (str): Cloudinary cloud name.
+            api_key: Cloudinary API key.
+            api_secret (str): Cloudinary API secret.
+            timeout (float): Timeout of upload and existence requests in seconds.
+        """
+        cloudinary.config(
+            cloud_name=cloud_name, api_key=api_key, api_secret=api_secret, secure=True
+        )
+        self.timeout = timeout
+        self._http = urllib3.PoolManager(timeout=timeout, retries=False)
+
+    @staticmethod
+    def _public_id(key: str) -> str:
+        return f"RestApp/{key.rsplit('.', 1)[0]}"
+
+    def exists(self, key: str) -> bool:
+        # A HEAD request to the CDN avoids the rate-limited Admin API.
+        try:
+            response = self._http.request("HEAD", self.url(key))
+        except urllib3.exceptions.HTTPError:
+            return False
+        return response.status == 200
+
+    def save(self, key: str, data: bytes) -> None:
+        cloudinary.uploader.upload(
+            data,
+            public_id=self._public_id(key),
+            overwrite=False,
+            timeout=self.timeout,
+        )
+
+    def url(self, key: str) -> str:
+        return cloudinary.CloudinaryImage(self._public_id(key)).build_url(
+            format=key.rsplit(".", 1)[1]
+        )
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """Static files whose content never changes under the same URL."""
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+
+@lru_cache
+def get_avatar_storage() -> AvatarStorage:
+    """
+    Return the configured avatar storage backend.
+
+    Returns:
+        AvatarStorage: ``LocalStorage`` if ``AVATAR_STORAGE`` is "local",
+        otherwise ``CloudinaryStorage``.
+    """
+    if settings.AVATAR_STORAGE == "local":
+        return LocalStorage(settings.MEDIA_ROOT, settings.MEDIA_URL)
+    return CloudinaryStorage(
+        settings.CLD_NAME,
+        settings.CLD_API_KEY,
+        settings.CLD_API_SECRET,
+        settings.UPLOAD_TIMEOUT,
+    )
@@ -1,46 +1,71 @@
-import cloudinary
-import cloudinary.uploader
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException, status
+
+from src.conf.config import settings
+from src.services.images import prepare_avatar, read_limited
+from src.services.storage import AvatarStorage
+
+# Uploads run on their own bounded pool, so they neither block the event loop
+# nor take the default executor threads used by password hashing.
+_executor = ThreadPoolExecutor(
+    max_workers=settings.UPLOAD_MAX_CONCURRENCY, thread_name_prefix="upload"
+)
+_upload_slots = asyncio.Semaphore(settings.UPLOAD_MAX_CONCURRENCY)
 
 
 class UploadFileService:
     """
-    Service for uploading files to Cloudinary and generating image URLs.
+    Service for processing avatar images and storing them in a storage backend.
     """
 
-    def __init__(self, cloud_name, api_key, api_secret):
+    def __init__(self, storage: AvatarStorage):
         """
-        Initialize the Cloudinary configuration.
+        Initialize the service with a storage backend.
 
         Args:
-            cloud_name (str): Cloudinary cloud name.
-            api_key (str): Cloudinary API key.
-            api_secret (str): Cloudinary API secret.
+            storage (AvatarStorage): Where processed avatars are stored.
         """
-        self.cloud_name = cloud_name
-        self.api_key = api_key
-        self.api_secret = api_secret
-        cloudinary.config(
-            cloud_name=self.cloud_name,
-            api_key=self.api_key,
-            api_secret=self.api_secret,
-            secure=True,
-        )
-
-    @staticmethod
-    def upload_file(file, username) -> str:
+        self.storage = storage
+
+    async def upload_file(self, file) -> str:
         """
-        Upload a file to Cloudinary and return a resized image URL.
+        Resize an image to a WebP avatar locally and store it.
+
+        The file is read with a size cap of ``AVATAR_MAX_BYTES``, and the image
+        is validated, resized to 250x250 and re-encoded before it is stored.
+        The result is stored under the hash of its bytes, so uploading an image
+        that is already stored costs no transfer. Image processing and storage
+        run on a bounded thread pool. At most ``UPLOAD_MAX_CONCURRENCY``
+        uploads run at once; further requests wait up to
+        ``UPLOAD_QUEUE_TIMEOUT`` seconds for a slot.
 
         Args:
-            file: File object with a `.file` attribute (e.g., FastAPI's UploadFile).
-            username (str): Username used to create a unique public ID.
+            file (UploadFile): The uploaded image.
 
         Returns:
-            str: URL of the uploaded image, resized to 250x250 pixels.
+            str: URL of the stored 250x250 image.
+
+        Raises:
+            HTTPException: If the file is too large or not a valid image, or if
+                no upload slot frees up in time.
         """
-        public_id = f"RestApp/{username}"
-        r = cloudinary.uploader.upload(file.file, public_id=public_id, overwrite=True)
-        src_url = cloudinary.CloudinaryImage(public_id).build_url(
-            width=250, height=250, crop="fill", version=r.get("version")
-        )
-        return src_url
+        try:
+            async with asyncio.timeout(settings.UPLOAD_QUEUE_TIMEOUT):
+                await _upload_slots.acquire()
+        except TimeoutError:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many uploads in progress, try again later",
+                headers={"Retry-After": "1"},
+            )
+        try:
+            data = await read_limited(file, settings.AVATAR_MAX_BYTES)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(_executor, self._store, data)
+        finally:
+            _upload_slots.release()
+
+    def _store(self, data: bytes) -> str:
+        return self.storage.store(prepare_avatar(data))
@@ -1,9 +1,30 @@
+import logging
+
 from sqlalchemy.ext.asyncio import AsyncSession
 from libgravatar import Gravatar
+from redis.exceptions import RedisError
 
+from src.cache.client import redis_client
+from src.cache.revocation import revocation_list
+from src.database.models import UserRole
 from src.repository.users import UserRepository
 from src.schemas import UserCreate
 
+logger = logging.getLogger(__name__)
+
+
+def user_cache_key(username: str, *args, **kwargs):
+    """
+    Builds a cache key based on the username.
+
+    Args:
+        username (str): The username from the token subject.
+
+    Returns:
+        str: The cache key.
+    """
+    return f"user({username})"
+
 
 class UserService:
     """
@@ -34,7 +55,7 @@ class UserService:
             g = Gravatar(body.email)
             avatar = g.get_image()
         except Exception as e:
-            print(e)
+            logger.warning("Gravatar lookup failed: %s", e)
 
         return await self.repository.create_user(body, avatar)
 
@@ -82,14 +103,19 @@ class UserService:
             email (str): The user's email to confirm.
 
         Returns:
-            User: The updated user instance with confirmed email.
+            User | None: The updated user instance with confirmed email.
         """
-        return await self.repository.confirmed_email(email)
+        user = await self.repository.confirmed_email(email)
+        await self._forget_cached_user(user)
+        return user
 
     async def update_avatar_url(self, email: str, url: str):
         """
         Update the avatar URL for a user.
 
+        The new profile version is published so that access tokens carrying
+        the old avatar in their claims are treated as stale by every process.
+
         Args:
             email (str): The user's email.
             url (str): The new avatar URL.
@@ -97,7 +123,27 @@ class UserService:
         Returns:
             User: The updated user instance.
         """
-        return await self.repository.update_avatar_url(email, url)
+        user = await self.repository.update_avatar_url(email, url)
+        await self._profile_changed(user)
+        return user
+
+    async def update_role(self, email: str, role: UserRole):
+        """
+        Change a user's role.
+
+        The profile version is bumped and published like for an avatar change,
+        so tokens embedding the previous role stop being trusted.
+
+        Args:
+            email (str): The user's email.
+            role (UserRole): The new role.
+
+        Returns:
+            User: The updated user instance.
+        """
+        user = await self.repository.update_role(email, role)
+        await self._profile_changed(user)
+        return user
     
     async def reset_password(self, email: str, new_password: str):
         """
@@ -110,4 +156,25 @@ class UserService:
         Returns:
             User: The updated user instance with new password.
         """
-        return await self.repository.reset_password(email, new_password)
+        user = await self.repository.reset_password(email, new_password)
+        await self._forget_cached_user(user)
+        return user
+
+    async def _profile_changed(self, user) -> None:
+        # Tokens embedding an older profile version are reloaded from the database.
+        try:
+            await revocation_list.publish_profile_version(
+                user.id, user.profile_version
+            )
+        except RedisError as e:
+            logger.warning("Could not publish profile version of %s: %s", user.id, e)
+        await self._forget_cached_user(user)
+
+    async def _forget_cached_user(self, user) -> None:
+        # Drops the copy load_user keeps, so the next request sees the write.
+        if user is None:
+            return
+        try:
+            await redis_client.delete(user_cache_key(user.username))
+        except RedisError as e:
+            logger.warning("Could not invalidate cached user %s: %s", user.username, e)
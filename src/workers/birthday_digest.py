@@ -0,0 +1,169 @@
+"""
+Birthday digest: queue one email per user listing upcoming contact birthdays.
+
+Run it once a day, e.g. from cron:
+
+    python -m src.workers.birthday_digest --days 7
+"""
+
+import argparse
+import asyncio
+import logging
+from datetime import date
+from typing import AsyncIterator, List, Tuple
+
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.cache.client import redis_client
+from src.database.db import sessionmanager
+from src.repository.contacts import ContactRepository
+from src.services.outbox import BIRTHDAY_DIGEST, OUTBOX_STREAM, EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_TTL = 2 * 24 * 60 * 60
+
+
+def next_birthday(birthday: date, today: date) -> date:
+    """
+    Return the next anniversary of a birthday, today included.
+
+    Args:
+        birthday (date): Date of birth.
+        today (date): Reference day.
+
+    Returns:
+        date: The next birthday. February 29 falls on March 1 in common years.
+    """
+    for year in (today.year, today.year + 1):
+        try:
+            candidate = birthday.replace(year=year)
+        except ValueError:
+            candidate = date(year, 3, 1)
+        if candidate >= today:
+            return candidate
+
+
+class BirthdayDigestJob:
+    """
+    Daily job that emails every user their contacts' upcoming birthdays.
+
+    All users are covered by one query ordered by user, whose rows are grouped
+    while they stream in, so only one user's contacts are held in memory. The
+    last user handled is checkpointed in Redis together with their email, so
+    a rerun on the same day resumes where an interrupted run stopped.
+    """
+
+    def __init__(self, session: AsyncSession, redis: Redis, days: int = 7):
+        """
+        Initialize the job.
+
+        Args:
+            session (AsyncSession): SQLAlchemy async session.
+            redis (Redis): Asynchronous Redis client.
+            days (int, optional): Length of the birthday window. Defaults to 7.
+        """
+        self.repository = ContactRepository(session)
+        self.redis = redis
+        self.days = days
+
+    @staticmethod
+    def checkpoint_key(today: date) -> str:
+        """Return the Redis key of a day's checkpoint."""
+        return f"birthday_digest:checkpoint:{today.isoformat()}"
+
+    async def run(self, today: date) -> int:
+        """
+        Queue the digests of one day.
+
+        Args:
+            today (date): First day of the birthday window.
+
+        Returns:
+            int: Number of digests queued by this run.
+        """
+        key = self.checkpoint_key(today)
+        after_user_id = int(await self.redis.get(key) or 0)
+        if after_user_id:
+            logger.info("Resuming after user %d", after_user_id)
+        queued = 0
+        async for user, contacts in self.digests(today, after_user_id):
+            await self._enqueue(key, user, contacts)
+            queued += 1
+        return queued
+
+    async def digests(
+        self, today: date, after_user_id: int = 0
+    ) -> AsyncIterator[Tuple[dict, List[dict]]]:
+        """
+        Group the streamed birthday rows by user.
+
+        Args:
+            today (date): First day of the birthday window.
+            after_user_id (int, optional): Skip users up to this ID. Defaults to 0.
+
+        Yields:
+            Tuple[dict, List[dict]]: The user and their contacts in birthday order.
+        """
+        user, contacts = None, []
+        async for row in self.repository.stream_upcoming_birthdays(
+            today, self.days, after_user_id
+        ):
+            if user is not None and row.user_id != user["id"]:
+                yield user, self._sorted(contacts)
+                contacts = []
+            user = {"id": row.user_id, "email": row.email, "username": row.username}
+            contacts.append(
+                {
+                    "name": f"{row.first_name} {row.last_name}",
+                    "birthday": next_birthday(row.birthday, today),
+                }
+            )
+        if user is not None:
+            yield user, self._sorted(contacts)
+
+    @staticmethod
+    def _sorted(contacts: List[dict]) -> List[dict]:
+        contacts.sort(key=lambda contact: contact["birthday"])
+        for contact in contacts:
+            contact["birthday"] = contact["birthday"].strftime("%d %B")
+        return contacts
+
+    async def _enqueue(self, key: str, user: dict, contacts: List[dict]) -> None:
+        payload = {
+            "email": user["email"],
+            "username": user["username"],
+            "contacts": contacts,
+        }
+        # The digest and the checkpoint are written atomically, so a resumed
+        # run neither skips nor repeats a user.
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.xadd(OUTBOX_STREAM, EmailOutbox.entry(BIRTHDAY_DIGEST, payload))
+            pipe.set(key, user["id"], ex=CHECKPOINT_TTL)
+            await pipe.execute()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--date",
+        type=date.fromisoformat,
+        default=date.today(),
+        help="first day of the window, YYYY-MM-DD (default: today)",
+    )
+    parser.add_argument("--days", type=int, default=7)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    async def run():
+        async with sessionmanager.session() as session:
+            job = BirthdayDigestJob(session, redis_client, args.days)
+            queued = await job.run(args.date)
+        logger.info("Queued %d birthday digests for %s", queued, args.date)
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""
+Email worker: drains the outbox stream and delivers messages over SMTP.
+
+    python -m src.workers.email_worker --concurrency 10
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import signal
+import socket
+import time
+from email.message import Message
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from prometheus_client import start_http_server
+from redis.asyncio import Redis
+from redis.exceptions import RedisError, ResponseError
+
+from src.cache.client import redis_client
+from src.conf.config import settings
+from src.services.email import (
+    build_birthday_digest_email,
+    build_password_reset_email,
+    build_verification_email,
+    conf,
+    smtp_pool,
+)
+from src.services.outbox import (
+    BIRTHDAY_DIGEST,
+    CONSUMER_GROUP,
+    DEAD_LETTER_STREAM,
+    OUTBOX_STREAM,
+    PASSWORD_RESET,
+    RETRY_QUEUE,
+    VERIFY_EMAIL,
+    EmailOutbox,
+)
+from src.services.smtp import SMTPConnectionPool
+
+logger = logging.getLogger(__name__)
+
+BUILDERS: Dict[str, Callable[..., Awaitable[Message]]] = {
+    VERIFY_EMAIL: build_verification_email,
+    PASSWORD_RESET: build_password_reset_email,
+    BIRTHDAY_DIGEST: build_birthday_digest_email,
+}
+
+
+class EmailWorker:
+    """
+    Consumer of the email outbox.
+
+    Messages are read through a Redis consumer group, so several workers can
+    share the load and messages of a crashed worker are reclaimed. Every batch
+    is split across up to ``concurrency`` pooled SMTP connections, each sending
+    its share in one session. Failed deliveries are retried with exponential
+    backoff and moved to a dead-letter stream after ``max_attempts``.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        consumer: str,
+        concurrency: int = settings.EMAIL_WORKER_CONCURRENCY,
+        batch_size: int = settings.EMAIL_WORKER_BATCH_SIZE,
+        max_attempts: int = settings.EMAIL_MAX_ATTEMPTS,
+        retry_base_delay: float = settings.EMAIL_RETRY_BASE_DELAY,
+        claim_idle_ms: int = settings.EMAIL_CLAIM_IDLE_MS,
+        pool: Optional[SMTPConnectionPool] = None,
+        error_backoff: float = 1.0,
+        max_error_backoff: float = 60.0,
+    ):
+        """
+        Initialize the worker.
+
+        Args:
+            redis (Redis): Asynchronous Redis client.
+            consumer (str): Unique consumer name within the group.
+            concurrency (int): Maximum number of SMTP sessions used per batch.
+            batch_size (int): Maximum number of messages read per batch.
+            max_attempts (int): Deliveries before a message is dead-lettered.
+            retry_base_delay (float): Delay before the first retry, in seconds.
+            claim_idle_ms (int): Idle time after which another consumer's message is reclaimed.
+            pool (Optional[SMTPConnectionPool]): SMTP connections, defaults to
+                the email service pool.
+            error_backoff (float): Pause after a failed iteration, doubled on
+                every consecutive failure.
+            max_error_backoff (float): Longest pause after failed iterations.
+        """
+        self.redis = redis
+        self.outbox = EmailOutbox(redis)
+        self.consumer = consumer
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.claim_idle_ms = claim_idle_ms
+        self.concurrency = concurrency
+        self.pool = pool or smtp_pool
+        self.error_backoff = error_backoff
+        self.max_error_backoff = max_error_backoff
+
+    async def setup(self) -> None:
+        """Create the consumer group if it does not exist yet."""
+        try:
+            await self.redis.xgroup_create(
+                OUTBOX_STREAM, CONSUMER_GROUP, id="0", mkstream=True
+            )
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def run(self, stop: asyncio.Event, block_ms: int = 5000) -> None:
+        """
+        Process messages until ``stop`` is set.
+
+        Redis and connection errors are logged and the loop pauses with
+        exponential backoff instead of exiting, so an outage does not turn
+        into a crash-restart loop.
+
+        Args:
+            stop (asyncio.Event): Event that ends the loop.
+            block_ms (int): How long to wait for new messages per read.
+        """
+        ready = False
+        delay = self.error_backoff
+        try:
+            while not stop.is_set():
+                try:
+                    if not ready:
+                        await self.setup()
+                        ready = True
+                    await self.requeue_due()
+                    await self.claim_stale()
+                    await self.process_batch(block_ms)
+                except (RedisError, OSError) as e:
+                    logger.warning(
+                        "Email worker failed, retrying in %.0fs: %s", delay, e
+                    )
+                    with contextlib.suppress(asyncio.TimeoutError):
+                        await asyncio.wait_for(stop.wait(), delay)
+                    delay = min(delay * 2, self.max_error_backoff)
+                else:
+                    delay = self.error_backoff
+        finally:
+            await self.pool.close()
+
+    async def process_batch(self, block_ms: int | None = None) -> int:
+        """
+        Read and deliver one batch of new messages.
+
+        Args:
+            block_ms (int | None): How long to wait for messages, None to not block.
+
+        Returns:
+            int: Number of messages processed.
+        """
+        response = await self.redis.xreadgroup(
+            CONSUMER_GROUP,
+            self.consumer,
+            {OUTBOX_STREAM: ">"},
+            count=self.batch_size,
+            block=block_ms,
+        )
+        messages = [message for _, entries in response or [] for message in entries]
+        await self._deliver(messages)
+        return len(messages)
+
+    async def claim_stale(self) -> int:
+        """
+        Take over messages that another consumer read but never acknowledged.
+
+        Returns:
+            int: Number of reclaimed messages processed.
+        """
+        _, messages, _ = await self.redis.xautoclaim(
+            OUTBOX_STREAM,
+            CONSUMER_GROUP,
+            self.consumer,
+            min_idle_time=self.claim_idle_ms,
+            count=self.batch_size,
+        )
+        await self._deliver(messages)
+        return len(messages)
+
+    async def requeue_due(self) -> int:
+        """
+        Move retries whose backoff has elapsed back to the outbox stream.
+
+        Returns:
+            int: Number of requeued messages.
+        """
+        due = await self.redis.zrangebyscore(
+            RETRY_QUEUE, "-inf", time.time(), start=0, num=self.batch_size
+        )
+        requeued = 0
+        for member in due:
+            # Only the worker that removes the entry requeues it.
+            if await self.redis.zrem(RETRY_QUEUE, member):
+                message = json.loads(member)
+                await self.outbox.enqueue(
+                    message["kind"], message["payload"], message["attempts"]
+                )
+                requeued += 1
+        return requeued
+
+    async def _deliver(self, entries: List[tuple]) -> None:
+        built = []
+        for entry_id, fields in entries:
+            kind = fields[b"kind"].decode()
+            payload = json.loads(fields[b"payload"])
+            attempts = int(fields[b"attempts"])
+            try:
+                message = await BUILDERS[kind](**payload)
+            except Exception as e:
+                await self._fail(kind, payload, attempts + 1, e)
+                continue
+            built.append((kind, payload, attempts, message))
+
+        chunks = [built[i :: self.concurrency] for i in range(self.concurrency)]
+        chunks = [chunk for chunk in chunks if chunk]
+        results = await asyncio.gather(
+            *(self.pool.send_many([item[3] for item in chunk]) for chunk in chunks)
+        )
+        for chunk, errors in zip(chunks, results):
+            for (kind, payload, attempts, _), error in zip(chunk, errors):
+                if error is not None:
+                    await self._fail(kind, payload, attempts + 1, error)
+
+        if entries:
+            ids = [entry_id for entry_id, _ in entries]
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.xack(OUTBOX_STREAM, CONSUMER_GROUP, *ids)
+                pipe.xdel(OUTBOX_STREAM, *ids)
+                await pipe.execute()
+
+    async def _fail(self, kind: str, payload: dict, attempts: int, error: Exception):
+        if attempts >= self.max_attempts or kind not in BUILDERS:
+            logger.error(
+                "Dead-lettering %s email after %d attempts: %s", kind, attempts, error
+            )
+            await self.redis.xadd(
+                DEAD_LETTER_STREAM,
+                {
+                    "kind": kind,
+                    "payload": json.dumps(payload),
+                    "attempts": attempts,
+                    "error": repr(error),
+                },
+            )
+            return
+        delay = self.retry_base_delay * 2 ** (attempts - 1)
+        logger.warning("Retrying %s email in %.0fs: %s", kind, delay, error)
+        member = json.dumps({"kind": kind, "payload": payload, "attempts": attempts})
+        await self.redis.zadd(RETRY_QUEUE, {member: time.time() + delay})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--concurrency", type=int, default=settings.EMAIL_WORKER_CONCURRENCY
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=settings.EMAIL_WORKER_BATCH_SIZE
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=settings.EMAIL_WORKER_METRICS_PORT,
+        help="port of the Prometheus metrics endpoint, 0 to disable",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    if args.metrics_port:
+        start_http_server(args.metrics_port)
+
+    worker = EmailWorker(
+        redis_client,
+        consumer=f"{socket.gethostname()}-{os.getpid()}",
+        concurrency=args.concurrency,
+        batch_size=args.batch_size,
+        pool=SMTPConnectionPool(
+            conf,
+            size=args.concurrency,
+            max_messages=settings.SMTP_MAX_MESSAGES_PER_CONNECTION,
+            idle_timeout=settings.SMTP_IDLE_TIMEOUT,
+        ),
+    )
+
+    async def run():
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        await worker.run(stop)
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
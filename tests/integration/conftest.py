@@ -34,6 +34,11 @@ def initialize_test_db():
     asyncio.run(setup())
 
 
+@pytest.fixture(autouse=True)
+def disable_rate_limit(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+
+
 @pytest.fixture(scope="session")
 def client():
     async def override_get_db():
@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import Mock
+from unittest.mock import AsyncMock
 from sqlalchemy import select
 from src.database.models import User
 from tests.integration.conftest import TestingSessionLocal, client
@@ -12,8 +12,10 @@ user_data = {
 
 
 def test_register_user(client, monkeypatch):
-    mock_send_email = Mock()
-    monkeypatch.setattr("src.api.auth.send_email", mock_send_email)
+    mock_send_verification = AsyncMock()
+    monkeypatch.setattr(
+        "src.api.auth.email_outbox.send_verification", mock_send_verification
+    )
 
     response = client.post("/api/auth/register", json=user_data)
     assert response.status_code == 201, response.text
@@ -26,8 +28,10 @@ def test_register_user(client, monkeypatch):
 
 
 def test_register_duplicate_email(client, monkeypatch):
-    mock_send_email = Mock()
-    monkeypatch.setattr("src.api.auth.send_email", mock_send_email)
+    mock_send_verification = AsyncMock()
+    monkeypatch.setattr(
+        "src.api.auth.email_outbox.send_verification", mock_send_verification
+    )
 
     response = client.post("/api/auth/register", json=user_data)
     assert response.status_code == 409
@@ -1,8 +1,10 @@
 import pytest
+from sqlalchemy import select
 from unittest.mock import patch, AsyncMock
 from io import BytesIO
 from src.database.models import UserRole
 from src.database.models import User
+from src.services.auth import create_refresh_token
 from tests.integration.conftest import TestingSessionLocal, get_token, client
 
 
@@ -21,6 +23,13 @@ async def test_get_me(mock_get, mock_set, client, get_token):
     assert "hashed_password" not in data
 
 
+@pytest.mark.asyncio
+async def test_get_me_with_refresh_token(client):
+    token = await create_refresh_token(data={"sub": "agent007"})
+    response = client.get("/api/users/me", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 401
+
+
 @pytest.mark.asyncio
 @patch("src.cache.cache_decorator.redis_client.set", new_callable=AsyncMock)
 @patch("src.cache.cache_decorator.redis_client.get", new_callable=AsyncMock)
@@ -34,7 +43,9 @@ async def test_update_avatar_user(mock_get, mock_set, client, get_token):
     dummy_avatar_url = "https://example.com/avatar.jpg"
 
     with patch(
-        "src.api.users.UploadFileService.upload_file", return_value=dummy_avatar_url
+        "src.api.users.UploadFileService.upload_file",
+        new_callable=AsyncMock,
+        return_value=dummy_avatar_url,
     ):
         file_content = BytesIO(b"dummy image content")
         response = client.patch(
@@ -47,3 +58,34 @@ async def test_update_avatar_user(mock_get, mock_set, client, get_token):
     data = response.json()
     assert data["avatar"] == dummy_avatar_url
     assert data["role"] == "admin"
+
+
+@pytest.mark.asyncio
+@patch("src.cache.cache_decorator.redis_client.set", new_callable=AsyncMock)
+@patch("src.cache.cache_decorator.redis_client.get", new_callable=AsyncMock)
+async def test_admin_changes_role(mock_get, mock_set, client, get_token):
+    mock_get.return_value = None
+    async with TestingSessionLocal() as session:
+        session.add(
+            User(
+                username="demoted",
+                email="demoted@example.com",
+                hashed_password="hash",
+                avatar="https://example.com/avatar.jpg",
+                role=UserRole.ADMIN,
+            )
+        )
+        await session.commit()
+
+    response = client.put(
+        "/api/admin/users/role",
+        headers={"Authorization": f"Bearer {get_token}"},
+        json={"email": "demoted@example.com", "role": "user"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["role"] == "user"
+    async with TestingSessionLocal() as session:
+        user = await session.scalar(select(User).where(User.username == "demoted"))
+    assert user.role == UserRole.USER
+    assert user.profile_version == 2
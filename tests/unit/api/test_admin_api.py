@@ -0,0 +1,90 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi import HTTPException
+from src.api.admin import profile, profiles, slow_queries, update_user_role
+from src.database.models import UserRole
+from src.schemas import UserRoleUpdate
+from tests.unit.conftest import user, mock_session
+
+
+@pytest.mark.asyncio
+async def test_slow_queries_returns_snapshot(user):
+    capture = MagicMock()
+    capture.snapshot.return_value = [{"fingerprint": "a"}]
+
+    with patch("src.api.admin.sessionmanager") as manager:
+        manager.plan_capture = capture
+        result = await slow_queries(user)
+
+    assert result == [{"fingerprint": "a"}]
+
+
+@pytest.mark.asyncio
+async def test_slow_queries_when_disabled(user):
+    with patch("src.api.admin.sessionmanager") as manager:
+        manager.plan_capture = None
+        result = await slow_queries(user)
+
+    assert result == []
+
+
+@pytest.mark.asyncio
+async def test_profiles_lists_store(user):
+    with patch("src.api.admin.profile_store") as store:
+        store.list.return_value = [{"id": "abc"}]
+        result = await profiles(user)
+
+    assert result == [{"id": "abc"}]
+
+
+@pytest.mark.asyncio
+async def test_profile_download(user):
+    with patch("src.api.admin.profile_store") as store:
+        store.render.return_value = '{"shared": {}}'
+        response = await profile("abc", user)
+
+    assert response.body == b'{"shared": {}}'
+    assert response.media_type == "application/json"
+    assert "abc.speedscope.json" in response.headers["content-disposition"]
+
+
+@pytest.mark.asyncio
+async def test_unknown_profile(user):
+    with patch("src.api.admin.profile_store") as store:
+        store.render.return_value = None
+        with pytest.raises(HTTPException) as exc:
+            await profile("abc", user)
+
+    assert exc.value.status_code == 404
+
+
+@pytest.mark.asyncio
+@patch("src.api.admin.UserService")
+async def test_update_user_role(mock_user_service_class, user, mock_session):
+    mock_user_service = AsyncMock()
+    mock_user_service.get_user_by_email.return_value = user
+    mock_user_service.update_role.return_value = user
+    mock_user_service_class.return_value = mock_user_service
+    body = UserRoleUpdate(email="test@example.com", role=UserRole.ADMIN)
+
+    result = await update_user_role(body, user, mock_session)
+
+    assert result is user
+    mock_user_service.update_role.assert_awaited_once_with(
+        "test@example.com", UserRole.ADMIN
+    )
+
+
+@pytest.mark.asyncio
+@patch("src.api.admin.UserService")
+async def test_update_role_of_unknown_user(mock_user_service_class, user, mock_session):
+    mock_user_service = AsyncMock()
+    mock_user_service.get_user_by_email.return_value = None
+    mock_user_service_class.return_value = mock_user_service
+    body = UserRoleUpdate(email="nobody@example.com", role=UserRole.ADMIN)
+
+    with pytest.raises(HTTPException) as exc:
+        await update_user_role(body, user, mock_session)
+
+    assert exc.value.status_code == 404
+    mock_user_service.update_role.assert_not_awaited()
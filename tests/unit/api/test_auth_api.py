@@ -1,8 +1,13 @@
 import pytest
 from unittest.mock import AsyncMock, patch
-from fastapi import BackgroundTasks
+from fastapi import BackgroundTasks, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
+from jose import jwt
+from redis.exceptions import ConnectionError
 from src.api import auth
+from src.conf.config import settings
+from src.database.models import UserRole
+from src.services.auth import create_access_token
 from src.schemas import (
     UserCreate,
     RequestEmail,
@@ -12,9 +17,30 @@ from src.schemas import (
 from tests.unit.conftest import fake_request, user, mock_session
 
 
+@pytest.fixture(autouse=True)
+def mock_login_throttle():
+    with patch("src.api.auth.login_throttle") as throttle:
+        throttle.retry_after = AsyncMock(return_value=0)
+        throttle.register_failure = AsyncMock(return_value=0)
+        throttle.reset = AsyncMock()
+        yield throttle
+
+
+@pytest.fixture(autouse=True)
+def mock_email_outbox():
+    with patch("src.api.auth.email_outbox") as outbox:
+        outbox.reserve = AsyncMock(return_value=True)
+        outbox.send_verification = AsyncMock()
+        outbox.send_password_reset = AsyncMock()
+        outbox.release = AsyncMock()
+        yield outbox
+
+
 @pytest.mark.asyncio
 @patch("src.api.auth.UserService")
-async def test_register_user(mock_user_service_class, fake_request, user, mock_session):
+async def test_register_user(
+    mock_user_service_class, mock_email_outbox, fake_request, user, mock_session
+):
     mock_user_service = AsyncMock()
     mock_user_service.get_user_by_email.return_value = None
     mock_user_service.get_user_by_username.return_value = None
@@ -24,18 +50,51 @@ async def test_register_user(mock_user_service_class, fake_request, user, mock_s
     user_data = UserCreate(
         username="testuser", email="test@example.com", password="pass"
     )
-    background_tasks = BackgroundTasks()
-    result = await auth.register_user(
-        user_data, background_tasks, fake_request, mock_session
-    )
+    result = await auth.register_user(user_data, fake_request, mock_session)
 
     assert result.username == "testuser"
-    assert len(background_tasks.tasks) == 1
+    mock_email_outbox.send_verification.assert_awaited_once_with(
+        user.email, user.username, "http://testserver"
+    )
 
 
 @pytest.mark.asyncio
 @patch("src.api.auth.UserService")
-async def test_login_user_success(mock_user_service_class, user, mock_session):
+async def test_register_user_when_outbox_is_down(
+    mock_user_service_class, mock_email_outbox, fake_request, user, mock_session
+):
+    mock_user_service = AsyncMock()
+    mock_user_service.get_user_by_email.return_value = None
+    mock_user_service.get_user_by_username.return_value = None
+    mock_user_service.create_user.return_value = user
+    mock_user_service_class.return_value = mock_user_service
+    mock_email_outbox.send_verification.side_effect = ConnectionError("down")
+
+    user_data = UserCreate(
+        username="testuser", email="test@example.com", password="pass"
+    )
+    result = await auth.register_user(user_data, fake_request, mock_session)
+
+    assert result is user
+    mock_email_outbox.release.assert_awaited_once_with(auth.VERIFY_EMAIL, user.email)
+
+
+@pytest.mark.asyncio
+@patch("src.api.auth.revocation_list.current_epoch", new_callable=AsyncMock)
+@patch("src.api.auth.RefreshSessionService")
+@patch("src.api.auth.UserService")
+async def test_login_user_success(
+    mock_user_service_class,
+    mock_session_service_class,
+    mock_current_epoch,
+    fake_request,
+    user,
+    mock_session,
+):
+    mock_current_epoch.return_value = 2
+    mock_session_service = AsyncMock()
+    mock_session_service.create_session.return_value = ("family", "refresh_token")
+    mock_session_service_class.return_value = mock_session_service
     mock_user_service = AsyncMock()
     mock_user_service.get_user_by_username.return_value = user
     mock_user_service_class.return_value = mock_user_service
@@ -48,10 +107,50 @@ async def test_login_user_success(mock_user_service_class, user, mock_session):
         client_id=None,
         client_secret=None,
     )
-    result = await auth.login_user(form_data, mock_session)
+    result = await auth.login_user(
+        fake_request, BackgroundTasks(), form_data, mock_session
+    )
 
     assert "access_token" in result
-    assert "refresh_token" in result
+    assert result["refresh_token"] == "refresh_token"
+    _, epoch, _ = mock_session_service.create_session.await_args.args
+    claims = jwt.decode(
+        result["access_token"], settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM]
+    )
+    assert epoch == 2
+    assert claims["epoch"] == 2
+    assert claims["sid"] == "family"
+
+
+@pytest.mark.asyncio
+@patch("src.api.auth.revocation_list.current_epoch", new_callable=AsyncMock)
+@patch("src.api.auth.RefreshSessionService")
+@patch("src.api.auth.Hash.needs_update", return_value=True)
+@patch("src.api.auth.UserService")
+async def test_login_user_schedules_rehash(
+    mock_user_service_class,
+    mock_needs_update,
+    mock_session_service_class,
+    mock_current_epoch,
+    fake_request,
+    user,
+    mock_session,
+):
+    mock_current_epoch.return_value = 0
+    mock_session_service = AsyncMock()
+    mock_session_service.create_session.return_value = ("family", "refresh_token")
+    mock_session_service_class.return_value = mock_session_service
+    mock_user_service = AsyncMock()
+    mock_user_service.get_user_by_username.return_value = user
+    mock_user_service_class.return_value = mock_user_service
+
+    form_data = OAuth2PasswordRequestForm(username="testuser", password="password")
+    background_tasks = BackgroundTasks()
+    await auth.login_user(fake_request, background_tasks, form_data, mock_session)
+
+    assert len(background_tasks.tasks) == 1
+    assert background_tasks.tasks[0].func is auth.rehash_password
+    assert background_tasks.tasks[0].args == (user.email, "password")
 
 
 @pytest.mark.asyncio
@@ -71,51 +170,186 @@ async def test_confirmed_email_success(mock_user_service_class, user, mock_sessi
 
 @pytest.mark.asyncio
 @patch("src.api.auth.UserService")
-async def test_request_email(mock_user_service_class, fake_request, user, mock_session):
+async def test_request_email(
+    mock_user_service_class, mock_email_outbox, fake_request, user, mock_session
+):
     user.confirmed = False
 
     mock_user_service = AsyncMock()
     mock_user_service.get_user_by_email.return_value = user
     mock_user_service_class.return_value = mock_user_service
 
-    background_tasks = BackgroundTasks()
     body = RequestEmail(email="test@example.com")
 
-    result = await auth.request_email(
-        body, background_tasks, fake_request, mock_session
-    )
+    result = await auth.request_email(body, fake_request, mock_session)
     assert result == {"message": "Check your email for verification"}
+    mock_email_outbox.send_verification.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@patch("src.api.auth.UserService")
+async def test_request_email_when_outbox_is_down(
+    mock_user_service_class, mock_email_outbox, fake_request, user, mock_session
+):
+    user.confirmed = False
+    mock_user_service = AsyncMock()
+    mock_user_service.get_user_by_email.return_value = user
+    mock_user_service_class.return_value = mock_user_service
+    mock_email_outbox.send_verification.side_effect = ConnectionError("down")
+
+    body = RequestEmail(email="test@example.com")
+
+    with pytest.raises(HTTPException) as exc:
+        await auth.request_email(body, fake_request, mock_session)
+    assert exc.value.status_code == 503
+    mock_email_outbox.release.assert_awaited_once_with(auth.VERIFY_EMAIL, user.email)
 
 
 @pytest.mark.asyncio
-@patch("src.api.auth.verify_refresh_token")
-async def test_new_token(mock_verify_refresh, user, mock_session):
-    mock_verify_refresh.return_value = user
+@patch("src.api.auth.UserService")
+@patch("src.api.auth.RefreshSessionService")
+async def test_new_token(
+    mock_session_service_class, mock_user_service_class, user, mock_session
+):
+    mock_session_service = AsyncMock()
+    mock_session_service.rotate.return_value = (
+        {"username": "testuser", "family": "family", "epoch": 1},
+        "rotated_token",
+    )
+    mock_session_service_class.return_value = mock_session_service
+    user.role = UserRole.USER
+    user.profile_version = 5
+    mock_user_service = AsyncMock()
+    mock_user_service.get_user_by_username.return_value = user
+    mock_user_service_class.return_value = mock_user_service
 
     request_data = TokenRefreshRequest(refresh_token="dummy_token")
 
-    response = await auth.new_token(request_data, mock_session)
-    assert "access_token" in response
-    assert response["refresh_token"] == "dummy_token"
+    with patch.object(settings, "TOKEN_EMBED_CLAIMS", True):
+        response = await auth.new_token(request_data, mock_session)
+    claims = jwt.decode(
+        response["access_token"],
+        settings.JWT_SECRET,
+        algorithms=[settings.JWT_ALGORITHM],
+    )
+    assert response["refresh_token"] == "rotated_token"
+    assert claims["epoch"] == 1
+    assert claims["role"] == "user"
+    assert claims["ver"] == 5
+    assert claims["sid"] == "family"
+    mock_session_service.rotate.assert_awaited_once_with("dummy_token")
+    mock_user_service.get_user_by_username.assert_awaited_once_with("testuser")
+
+
+@pytest.mark.asyncio
+@patch("src.api.auth.RefreshSessionService")
+async def test_new_token_rejected(mock_session_service_class, mock_session):
+    mock_session_service = AsyncMock()
+    mock_session_service.rotate.return_value = None
+    mock_session_service_class.return_value = mock_session_service
+
+    with pytest.raises(HTTPException) as exc:
+        await auth.new_token(
+            TokenRefreshRequest(refresh_token="dummy_token"), mock_session
+        )
+    assert exc.value.status_code == 401
+
+
+@pytest.mark.asyncio
+@patch("src.api.auth.UserService")
+@patch("src.api.auth.RefreshSessionService")
+async def test_new_token_for_deleted_user(
+    mock_session_service_class, mock_user_service_class, mock_session
+):
+    mock_session_service = AsyncMock()
+    mock_session_service.rotate.return_value = (
+        {"username": "gone", "family": "family", "epoch": 0},
+        "rotated_token",
+    )
+    mock_session_service_class.return_value = mock_session_service
+    mock_user_service = AsyncMock()
+    mock_user_service.get_user_by_username.return_value = None
+    mock_user_service_class.return_value = mock_user_service
+
+    with pytest.raises(HTTPException) as exc:
+        await auth.new_token(
+            TokenRefreshRequest(refresh_token="dummy_token"), mock_session
+        )
+
+    assert exc.value.status_code == 401
+    mock_session_service.revoke_session.assert_awaited_once_with("gone", "family")
+
+
+@pytest.mark.asyncio
+@patch("src.api.auth.RefreshSessionService")
+async def test_revoke_unknown_session(mock_session_service_class, user):
+    mock_session_service = AsyncMock()
+    mock_session_service.revoke_session.return_value = False
+    mock_session_service_class.return_value = mock_session_service
+
+    with pytest.raises(HTTPException) as exc:
+        await auth.revoke_session("unknown", user)
+    assert exc.value.status_code == 404
 
 
 @pytest.mark.asyncio
 @patch("src.api.auth.UserService")
 async def test_reset_password_request(
-    mock_user_service_class, fake_request, user, mock_session
+    mock_user_service_class, mock_email_outbox, fake_request, user, mock_session
 ):
     mock_user_service = AsyncMock()
     mock_user_service.get_user_by_email.return_value = user
     mock_user_service_class.return_value = mock_user_service
 
-    background_tasks = BackgroundTasks()
     body = RequestEmail(email="test@example.com")
 
-    response = await auth.reset_password_request(
-        body, background_tasks, fake_request, mock_session
+    response = await auth.reset_password_request(body, fake_request, mock_session)
+    assert response == {"message": "Reset link sent"}
+    mock_email_outbox.send_password_reset.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@patch("src.api.auth.UserService")
+async def test_reset_password_request_when_outbox_is_down(
+    mock_user_service_class, mock_email_outbox, fake_request, user, mock_session
+):
+    mock_user_service = AsyncMock()
+    mock_user_service.get_user_by_email.return_value = user
+    mock_user_service_class.return_value = mock_user_service
+    mock_email_outbox.send_password_reset.side_effect = ConnectionError("down")
+
+    body = RequestEmail(email="test@example.com")
+
+    with pytest.raises(HTTPException) as exc:
+        await auth.reset_password_request(body, fake_request, mock_session)
+    assert exc.value.status_code == 503
+    mock_email_outbox.release.assert_awaited_once_with(
+        auth.PASSWORD_RESET, user.email
     )
+
+
+@pytest.mark.asyncio
+@patch("src.api.auth.generate_reset_token", new_callable=AsyncMock)
+@patch("src.api.auth.UserService")
+async def test_reset_password_request_deduplicated(
+    mock_user_service_class,
+    mock_generate_reset_token,
+    mock_email_outbox,
+    fake_request,
+    user,
+    mock_session,
+):
+    mock_user_service = AsyncMock()
+    mock_user_service.get_user_by_email.return_value = user
+    mock_user_service_class.return_value = mock_user_service
+    mock_email_outbox.reserve.return_value = False
+
+    body = RequestEmail(email="test@example.com")
+
+    response = await auth.reset_password_request(body, fake_request, mock_session)
     assert response == {"message": "Reset link sent"}
-    assert len(background_tasks.tasks) == 1
+    mock_generate_reset_token.assert_not_awaited()
+    mock_email_outbox.send_password_reset.assert_not_awaited()
 
 
 @pytest.mark.asyncio
@@ -138,3 +372,49 @@ async def test_reset_password_success(
 
     result = await auth.reset_password(body, mock_session)
     assert result == {"message": "Password was reset"}
+
+
+@pytest.mark.asyncio
+@patch("src.api.auth.revocation_list")
+async def test_logout_revokes_token(mock_revocation_list):
+    mock_revocation_list.sync = AsyncMock()
+    mock_revocation_list.is_revoked.return_value = False
+    mock_revocation_list.revoke = AsyncMock()
+    token = await create_access_token({"sub": "testuser"})
+
+    await auth.logout(token)
+
+    payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+    mock_revocation_list.revoke.assert_awaited_once_with(payload["jti"], payload["exp"])
+
+
+@pytest.mark.asyncio
+@patch("src.api.auth.RefreshSessionService")
+@patch("src.api.auth.revocation_list")
+async def test_logout_revokes_refresh_session(
+    mock_revocation_list, mock_session_service_class
+):
+    mock_revocation_list.revoke = AsyncMock()
+    mock_session_service = AsyncMock()
+    mock_session_service_class.return_value = mock_session_service
+    token = await create_access_token({"sub": "testuser", "sid": "family"})
+
+    await auth.logout(token)
+
+    mock_session_service.revoke_session.assert_awaited_once_with(
+        "testuser", "family"
+    )
+
+
+@pytest.mark.asyncio
+@patch("src.api.auth.RefreshSessionService")
+@patch("src.api.auth.revocation_list")
+async def test_logout_all(mock_revocation_list, mock_session_service_class, user):
+    mock_revocation_list.bump_epoch = AsyncMock()
+    mock_session_service = AsyncMock()
+    mock_session_service_class.return_value = mock_session_service
+
+    await auth.logout_all(user)
+
+    mock_revocation_list.bump_epoch.assert_awaited_once_with("testuser")
+    mock_session_service.revoke_all.assert_awaited_once_with("testuser")
@@ -1,6 +1,11 @@
+import json
 import pytest
 from unittest.mock import AsyncMock, patch
+from starlette.requests import Request
+from datetime import datetime, timezone
 from src.api.contants import (
+    stream_contact_events,
+    read_contact_changes,
     read_contacts,
     read_contact,
     create_contact,
@@ -9,9 +14,35 @@ from src.api.contants import (
     search_contacts,
     upcoming_birthdays,
 )
+from src.schemas import ContactResponse
 from tests.unit.conftest import user, mock_session, contact, contact_data
 
 
+def contact_json(contact):
+    return ContactResponse.model_validate(contact).model_dump(mode="json")
+
+
+def make_request(path="/api/contacts/", query="", headers=None):
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": path,
+            "query_string": query.encode(),
+            "headers": [
+                (k.lower().encode(), v.encode()) for k, v in (headers or {}).items()
+            ],
+        }
+    )
+
+
+@pytest.fixture(autouse=True)
+def mock_contacts_version():
+    with patch("src.api.responses.contacts_version") as mock:
+        mock.get = AsyncMock(return_value=7)
+        yield mock
+
+
 @pytest.mark.asyncio
 @patch("src.api.contants.ContactService")
 async def test_read_contacts(mock_service_class, user, mock_session, contact):
@@ -19,9 +50,9 @@ async def test_read_contacts(mock_service_class, user, mock_session, contact):
     mock_service.get_contacts.return_value = [contact]
     mock_service_class.return_value = mock_service
 
-    result = await read_contacts(0, 10, mock_session, user)
+    result = await read_contacts(make_request(), 0, 10, mock_session, user)
 
-    assert result == [contact]
+    assert json.loads(result.body) == [contact_json(contact)]
 
 
 @pytest.mark.asyncio
@@ -31,8 +62,8 @@ async def test_read_contact_found(mock_service_class, user, mock_session, contac
     mock_service.get_contact.return_value = contact
     mock_service_class.return_value = mock_service
 
-    result = await read_contact(1, mock_session, user)
-    assert result == contact
+    result = await read_contact(make_request("/api/contacts/1"), 1, mock_session, user)
+    assert json.loads(result.body) == contact_json(contact)
 
 
 @pytest.mark.asyncio
@@ -43,7 +74,7 @@ async def test_read_contact_not_found(mock_service_class, user, mock_session):
     mock_service_class.return_value = mock_service
 
     with pytest.raises(Exception) as exc:
-        await read_contact(999, mock_session, user)
+        await read_contact(make_request("/api/contacts/999"), 999, mock_session, user)
     assert exc.value.status_code == 404
 
 
@@ -57,7 +88,8 @@ async def test_create_contact(
     mock_service_class.return_value = mock_service
 
     result = await create_contact(contact_data, mock_session, user)
-    assert result == contact
+    assert result.status_code == 201
+    assert json.loads(result.body) == contact_json(contact)
 
 
 @pytest.mark.asyncio
@@ -71,7 +103,7 @@ async def test_update_contact_found(
 
     body = contact_data
     result = await update_contact(1, body, mock_session, user)
-    assert result == contact
+    assert json.loads(result.body) == contact_json(contact)
 
 
 @pytest.mark.asyncio
@@ -97,7 +129,7 @@ async def test_delete_contact_found(mock_service_class, user, mock_session, cont
     mock_service_class.return_value = mock_service
 
     result = await delete_contact(1, mock_session, user)
-    assert result == contact
+    assert json.loads(result.body) == contact_json(contact)
 
 
 @pytest.mark.asyncio
@@ -120,9 +152,10 @@ async def test_search_contacts(mock_service_class, user, mock_session, contact):
     mock_service_class.return_value = mock_service
 
     result = await search_contacts(
+        make_request("/api/contacts/search/", "first_name=John"),
         first_name="John", last_name=None, email=None, db=mock_session, user=user
     )
-    assert result == [contact]
+    assert json.loads(result.body) == [contact_json(contact)]
 
 
 @pytest.mark.asyncio
@@ -132,5 +165,139 @@ async def test_upcoming_birthdays(mock_service_class, user, mock_session, contac
     mock_service.get_upcoming_birthdays.return_value = [contact]
     mock_service_class.return_value = mock_service
 
-    result = await upcoming_birthdays(mock_session, user)
-    assert result == [contact]
+    result = await upcoming_birthdays(
+        make_request("/api/contacts/upcoming_birthdays/"), mock_session, user
+    )
+    assert json.loads(result.body) == [contact_json(contact)]
+
+
+@pytest.mark.asyncio
+@patch("src.api.contants.ContactService")
+async def test_read_contacts_sets_etag(mock_service_class, user, mock_session):
+    mock_service_class.return_value.get_contacts = AsyncMock(return_value=[])
+
+    result = await read_contacts(make_request(), 0, 10, mock_session, user)
+
+    assert result.headers["ETag"].startswith('W/"7-')
+    assert result.headers["Cache-Control"] == "private, no-cache"
+
+
+@pytest.mark.asyncio
+@patch("src.api.contants.ContactService")
+async def test_read_contacts_not_modified_skips_query(
+    mock_service_class, user, mock_session
+):
+    mock_service_class.return_value.get_contacts = AsyncMock(return_value=[])
+    first = await read_contacts(make_request(), 0, 10, mock_session, user)
+    etag = first.headers["ETag"]
+    mock_service_class.reset_mock()
+
+    result = await read_contacts(
+        make_request(headers={"If-None-Match": f'"other", {etag}'}),
+        0,
+        10,
+        mock_session,
+        user,
+    )
+
+    assert result.status_code == 304
+    assert result.headers["ETag"] == etag
+    mock_service_class.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("src.api.contants.ContactService")
+async def test_read_contacts_etag_changes_with_version_and_query(
+    mock_service_class, user, mock_session, mock_contacts_version
+):
+    mock_service_class.return_value.get_contacts = AsyncMock(return_value=[])
+
+    first = await read_contacts(make_request(), 0, 10, mock_session, user)
+    other_page = await read_contacts(
+        make_request(query="skip=10"), 10, 10, mock_session, user
+    )
+    mock_contacts_version.get.return_value = 8
+    bumped = await read_contacts(make_request(), 0, 10, mock_session, user)
+
+    etags = {first.headers["ETag"], other_page.headers["ETag"], bumped.headers["ETag"]}
+    assert len(etags) == 3
+
+
+@pytest.mark.asyncio
+@patch("src.api.contants.ContactService")
+async def test_read_contacts_without_version_has_no_etag(
+    mock_service_class, user, mock_session, contact, mock_contacts_version
+):
+    mock_contacts_version.get.return_value = None
+    mock_service_class.return_value.get_contacts = AsyncMock(return_value=[contact])
+
+    result = await read_contacts(
+        make_request(headers={"If-None-Match": "*"}), 0, 10, mock_session, user
+    )
+
+    assert result.status_code == 200
+    assert "ETag" not in result.headers
+
+
+@pytest.mark.asyncio
+@patch("src.api.contants.ContactService")
+async def test_read_contact_changes(mock_service_class, user, mock_session, contact):
+    contact.updated_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    contact.version = 2
+    mock_service_class.return_value.get_changes = AsyncMock(
+        return_value={
+            "changed": [contact],
+            "deleted": [5],
+            "cursor": "abc",
+            "has_more": False,
+        }
+    )
+
+    result = await read_contact_changes("prev", 50, mock_session, user)
+
+    body = json.loads(result.body)
+    assert body["changed"][0]["id"] == contact.id
+    assert body["changed"][0]["version"] == 2
+    assert body["changed"][0]["updated_at"].startswith("2026-01-01T00:00:00")
+    assert body["deleted"] == [5]
+    assert body["cursor"] == "abc"
+    assert body["has_more"] is False
+    mock_service_class.return_value.get_changes.assert_awaited_once_with(
+        user, "prev", 50
+    )
+
+
+@pytest.mark.asyncio
+@patch("src.api.contants.contact_events")
+async def test_stream_contact_events(mock_events, user):
+    subscription = object()
+    mock_events.open = AsyncMock(return_value=subscription)
+
+    result = await stream_contact_events(
+        make_request("/api/contacts/events", headers={"Last-Event-ID": "5-0"}), user
+    )
+
+    assert result.media_type == "text/event-stream"
+    assert result.headers["Cache-Control"] == "no-cache"
+    mock_events.open.assert_awaited_once_with(user.id)
+    mock_events.stream.assert_called_once_with(subscription, "5-0")
+
+
+@pytest.mark.asyncio
+@patch("src.api.contants.idempotency")
+@patch("src.api.contants.ContactService")
+async def test_create_contact_with_idempotency_key(
+    mock_service_class, mock_idempotency, user, mock_session, contact, contact_data
+):
+    mock_service_class.return_value.create_contact = AsyncMock(return_value=contact)
+
+    async def run(scope, key, request_hash, handler):
+        return await handler()
+
+    mock_idempotency.run = AsyncMock(side_effect=run)
+
+    result = await create_contact(contact_data, mock_session, user, "key-1")
+
+    assert result.status_code == 201
+    scope, key, _, _ = mock_idempotency.run.call_args.args
+    assert (scope, key) == (f"{user.id}:create_contact", "key-1")
@@ -0,0 +1,43 @@
+import json
+from datetime import date
+
+from src.api.responses import contact_list_response, contact_response
+from src.database.models import Contact
+
+
+def make_contact(i):
+    return Contact(
+        id=i,
+        first_name="John",
+        last_name="Doe",
+        email=f"john{i}@example.com",
+        phone_number="12345678900",
+        birthday=date(1990, 1, 2),
+        additional_info=None,
+        user_id=7,
+    )
+
+
+def test_contact_list_response_encodes_response_fields_only():
+    response = contact_list_response([make_contact(1), make_contact(2)])
+
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == [
+        {
+            "id": i,
+            "first_name": "John",
+            "last_name": "Doe",
+            "email": f"john{i}@example.com",
+            "phone_number": "12345678900",
+            "birthday": "1990-01-02",
+            "additional_info": None,
+        }
+        for i in (1, 2)
+    ]
+
+
+def test_contact_response_sets_status_and_length():
+    response = contact_response(make_contact(1), status_code=201)
+
+    assert response.status_code == 201
+    assert response.headers["content-length"] == str(len(response.body))
@@ -0,0 +1,52 @@
+import pytest
+import fakeredis
+from unittest.mock import AsyncMock, MagicMock
+from redis.exceptions import RedisError
+from src.cache.contacts_version import ContactsVersion
+
+
+@pytest.fixture
+def redis():
+    return fakeredis.FakeAsyncRedis()
+
+
+@pytest.mark.asyncio
+async def test_get_is_stable_until_bump(redis):
+    versions = ContactsVersion(redis)
+
+    first = await versions.get(1)
+    assert await versions.get(1) == first
+
+    await versions.bump(1)
+
+    assert await versions.get(1) == first + 1
+
+
+@pytest.mark.asyncio
+async def test_versions_are_per_user(redis):
+    versions = ContactsVersion(redis)
+    other = await versions.get(2)
+
+    await versions.bump(1)
+
+    assert await versions.get(2) == other
+
+
+@pytest.mark.asyncio
+async def test_lost_counter_does_not_reuse_versions(redis):
+    versions = ContactsVersion(redis)
+    before = await versions.get(1)
+
+    await redis.flushall()
+
+    assert await versions.get(1) > before
+
+
+@pytest.mark.asyncio
+async def test_redis_errors_fail_open():
+    redis = MagicMock()
+    redis.pipeline.return_value.__aenter__ = AsyncMock(side_effect=RedisError("down"))
+    versions = ContactsVersion(redis)
+
+    assert await versions.get(1) is None
+    await versions.bump(1)
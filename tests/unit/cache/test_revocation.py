@@ -0,0 +1,88 @@
+import time
+import pytest
+import fakeredis
+from src.cache.revocation import RevocationList
+
+
+@pytest.fixture
+def redis():
+    return fakeredis.FakeAsyncRedis()
+
+
+@pytest.mark.asyncio
+async def test_revoked_token_is_seen_by_other_process(redis):
+    writer = RevocationList(redis, sync_interval=60)
+    reader = RevocationList(redis, sync_interval=60)
+    await reader.sync()
+
+    await writer.revoke("jti1", time.time() + 60)
+    claims = {"sub": "testuser", "jti": "jti1"}
+
+    assert writer.is_revoked(claims) is True
+    assert reader.is_revoked(claims) is False
+    await reader.sync(force=True)
+    assert reader.is_revoked(claims) is True
+
+
+@pytest.mark.asyncio
+async def test_sync_skips_redis_within_interval(redis):
+    revocation_list = RevocationList(redis, sync_interval=60)
+    await revocation_list.sync()
+    await RevocationList(redis, sync_interval=60).revoke("jti1", time.time() + 60)
+
+    await revocation_list.sync()
+
+    assert revocation_list.is_revoked({"sub": "testuser", "jti": "jti1"}) is False
+
+
+@pytest.mark.asyncio
+async def test_expired_revocations_are_pruned(redis):
+    writer = RevocationList(redis, sync_interval=60)
+    await writer.revoke("old", time.time() - 1)
+    reader = RevocationList(redis, sync_interval=60)
+
+    await reader.sync()
+
+    assert reader.is_revoked({"sub": "testuser", "jti": "old"}) is False
+
+
+@pytest.mark.asyncio
+async def test_bump_epoch_invalidates_older_tokens(redis):
+    revocation_list = RevocationList(redis, sync_interval=60)
+
+    epoch = await revocation_list.bump_epoch("testuser")
+
+    assert epoch == 1
+    assert await revocation_list.current_epoch("testuser") == 1
+    assert revocation_list.is_revoked({"sub": "testuser"}) is True
+    assert revocation_list.is_revoked({"sub": "testuser", "epoch": 1}) is False
+    assert revocation_list.is_revoked({"sub": "other"}) is False
+
+
+@pytest.mark.asyncio
+async def test_profile_version_is_seen_by_other_process(redis):
+    writer = RevocationList(redis, sync_interval=60)
+    reader = RevocationList(redis, sync_interval=60)
+    await reader.sync()
+
+    await writer.publish_profile_version(1, 3)
+    await writer.publish_profile_version(1, 2)
+
+    assert writer.is_stale(1, 2) is True
+    assert reader.is_stale(1, 2) is False
+    await reader.sync(force=True)
+    assert reader.is_stale(1, 2) is True
+    assert reader.is_stale(1, 3) is False
+    assert reader.is_stale(2, 1) is False
+
+
+@pytest.mark.asyncio
+async def test_observed_profile_version_never_decreases(redis):
+    revocation_list = RevocationList(redis, sync_interval=60)
+
+    revocation_list.observe_profile_version(1, 3)
+    revocation_list.observe_profile_version(1, 2)
+    revocation_list.observe_profile_version(1, None)
+
+    assert revocation_list.is_stale(1, 2) is True
+    assert revocation_list.is_stale(1, 3) is False
@@ -0,0 +1,35 @@
+import time
+from src.cache.token_cache import TokenClaimsCache
+
+
+def test_get_returns_stored_claims():
+    cache = TokenClaimsCache(maxsize=10)
+    claims = {"sub": "testuser", "exp": time.time() + 60}
+    cache.set("token", claims)
+    assert cache.get("token") == claims
+    assert cache.get("other") is None
+
+
+def test_expired_claims_are_dropped():
+    cache = TokenClaimsCache(maxsize=10)
+    cache.set("token", {"sub": "testuser", "exp": time.time() - 1})
+    assert cache.get("token") is None
+    assert len(cache) == 0
+
+
+def test_claims_without_exp_are_not_cached():
+    cache = TokenClaimsCache(maxsize=10)
+    cache.set("token", {"sub": "testuser"})
+    assert cache.get("token") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TokenClaimsCache(maxsize=2)
+    exp = time.time() + 60
+    cache.set("a", {"sub": "a", "exp": exp})
+    cache.set("b", {"sub": "b", "exp": exp})
+    cache.get("a")
+    cache.set("c", {"sub": "c", "exp": exp})
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
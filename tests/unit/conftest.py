@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.database.models import User, Contact
 from src.schemas import ContactModel
@@ -8,6 +8,12 @@ from src.api.auth import Hash
 from datetime import date
 
 
+@pytest.fixture(autouse=True)
+def no_revocation_sync():
+    with patch("src.cache.revocation.revocation_list.sync", new_callable=AsyncMock):
+        yield
+
+
 @pytest.fixture
 def mock_session():
     return AsyncMock(spec=AsyncSession)
@@ -0,0 +1,268 @@
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy.exc import OperationalError
+from src.database.db import QueryStats, current_query_stats
+from src.database.explain import (
+    PlanCapture,
+    is_read_statement,
+    normalize_statement,
+    plan_shape,
+    redact_plan,
+)
+
+PLAN = {
+    "Node Type": "Limit",
+    "Plans": [
+        {
+            "Node Type": "Index Scan",
+            "Index Name": "ix_contacts_user_id_updated_at",
+            "Relation Name": "contacts",
+            "Total Cost": 8.3,
+        }
+    ],
+}
+
+
+def fake_engine(plan=PLAN):
+    conn = MagicMock()
+    result = MagicMock()
+    result.scalar_one.return_value = json.dumps([{"Plan": plan}])
+    conn.exec_driver_sql = AsyncMock(return_value=result)
+    engine = MagicMock()
+    engine.connect.return_value.__aenter__ = AsyncMock(return_value=conn)
+    engine.connect.return_value.__aexit__ = AsyncMock(return_value=False)
+    return engine, conn
+
+
+def make_capture(engine, **kwargs):
+    options = dict(threshold_ms=100, buffer_size=2, cooldown=60)
+    options.update(kwargs)
+    return PlanCapture(engine, **options)
+
+
+def test_normalize_statement_ignores_literals_and_parameters():
+    first, first_hash = normalize_statement(
+        "SELECT * FROM contacts WHERE user_id = $1 AND id IN (1, 2, 3)"
+    )
+    second, second_hash = normalize_statement(
+        "SELECT *  FROM contacts\nWHERE user_id = 7 AND id IN ($2, $3)"
+    )
+
+    assert first == "SELECT * FROM contacts WHERE user_id = ? AND id IN (...)"
+    assert first == second
+    assert first_hash == second_hash
+    assert len(first_hash) == 16
+
+
+def test_is_read_statement():
+    assert is_read_statement("  select id from contacts")
+    assert not is_read_statement("SELECT id FROM contacts FOR UPDATE")
+    assert not is_read_statement("UPDATE contacts SET name = $1")
+    assert not is_read_statement("")
+
+
+def test_plan_shape_ignores_costs():
+    assert plan_shape(PLAN) == [
+        "Limit",
+        "  Index Scan using ix_contacts_user_id_updated_at on contacts",
+    ]
+
+
+def test_redact_plan_removes_literals():
+    plan = {
+        "Node Type": "Nested Loop",
+        "Join Filter": "(c.user_id = 42)",
+        "Plans": [
+            {
+                "Node Type": "Index Scan",
+                "Index Name": "ix_users_email",
+                "Index Cond": "((email)::text = 'alice@example.com'::text)",
+            },
+            {"Node Type": "Seq Scan", "Filter": "(first_name = 'O''Brien'::text)"},
+        ],
+    }
+
+    redacted = redact_plan(plan)
+
+    assert redacted["Join Filter"] == "(c.user_id = ?)"
+    assert redacted["Plans"][0]["Index Cond"] == "((email)::text = ?::text)"
+    assert redacted["Plans"][1]["Filter"] == "(first_name = ?::text)"
+    assert redacted["Plans"][0]["Index Name"] == "ix_users_email"
+    assert plan["Join Filter"] == "(c.user_id = 42)"
+
+
+@pytest.mark.asyncio
+async def test_stored_plan_is_redacted():
+    engine, _ = fake_engine(
+        {"Node Type": "Seq Scan", "Filter": "(username = 'alice'::text)"}
+    )
+    capture = make_capture(engine)
+
+    capture.observe("SELECT * FROM users WHERE username = $1", ("alice",), 0.25, False)
+    await capture.drain()
+
+    [entry] = capture.snapshot()
+    assert entry["plan"][0]["Plan"]["Filter"] == "(username = ?::text)"
+
+
+@pytest.mark.asyncio
+async def test_slow_read_is_explained():
+    engine, conn = fake_engine()
+    capture = make_capture(engine)
+
+    capture.observe("SELECT * FROM contacts WHERE id = $1", [5], 0.25, False)
+    await capture.drain()
+
+    conn.exec_driver_sql.assert_awaited_once_with(
+        "EXPLAIN (FORMAT JSON) SELECT * FROM contacts WHERE id = $1", (5,)
+    )
+    [entry] = capture.snapshot()
+    assert entry["statement"] == "SELECT * FROM contacts WHERE id = ?"
+    assert entry["duration_ms"] == 250.0
+    assert entry["analyzed"] is False
+    assert entry["plan_changed"] is False
+    assert entry["plan"] == [{"Plan": PLAN}]
+
+
+@pytest.mark.asyncio
+async def test_explain_is_not_counted_as_request_query():
+    engine, conn = fake_engine()
+    seen = []
+
+    async def execute(*args):
+        seen.append(current_query_stats.get())
+        return MagicMock(scalar_one=MagicMock(return_value=json.dumps([{"Plan": PLAN}])))
+
+    conn.exec_driver_sql.side_effect = execute
+    capture = make_capture(engine)
+    stats = QueryStats()
+    token = current_query_stats.set(stats)
+    try:
+        capture.observe("SELECT 1", (), 0.25, False)
+    finally:
+        current_query_stats.reset(token)
+    await capture.drain()
+
+    assert seen == [None]
+    assert stats.count == 0
+
+
+@pytest.mark.asyncio
+async def test_analyze_sample_sets_timeout():
+    engine, conn = fake_engine()
+    capture = make_capture(engine, analyze_rate=1.0, analyze_timeout_ms=500)
+
+    capture.observe("SELECT 1", (), 0.25, False)
+    await capture.drain()
+
+    statements = [call.args[0] for call in conn.exec_driver_sql.await_args_list]
+    assert statements == [
+        "SET LOCAL statement_timeout = 500",
+        "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) SELECT 1",
+    ]
+    assert capture.snapshot()[0]["analyzed"] is True
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "statement, duration, many",
+    [
+        ("SELECT 1", 0.05, False),
+        ("DELETE FROM contacts WHERE id = $1", 0.25, False),
+        ("SELECT 1", 0.25, True),
+    ],
+)
+async def test_statements_not_explained(statement, duration, many):
+    engine, conn = fake_engine()
+    capture = make_capture(engine)
+
+    capture.observe(statement, (), duration, many)
+    await capture.drain()
+
+    conn.exec_driver_sql.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_same_fingerprint_waits_for_cooldown():
+    engine, conn = fake_engine()
+    capture = make_capture(engine)
+
+    capture.observe("SELECT * FROM contacts WHERE id = $1", (1,), 0.25, False)
+    await capture.drain()
+    capture.observe("SELECT * FROM contacts WHERE id = $1", (2,), 0.25, False)
+    await capture.drain()
+
+    assert conn.exec_driver_sql.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_fingerprints_are_forgotten(monkeypatch):
+    engine, conn = fake_engine()
+    capture = make_capture(engine)
+    clock = MagicMock()
+    monkeypatch.setattr("src.database.explain.time", clock)
+
+    for now, table in [
+        (1000.0, "contacts"),
+        (1040.0, "users"),
+        (1080.0, "contacts"),
+        (1200.0, "groups"),
+    ]:
+        clock.monotonic.return_value = now
+        capture.observe(f"SELECT * FROM {table}", (), 0.25, False)
+        await capture.drain()
+
+    assert conn.exec_driver_sql.await_count == 4
+    assert list(capture._last_seen) == [normalize_statement("SELECT * FROM groups")[1]]
+
+
+@pytest.mark.asyncio
+async def test_busy_capture_skips_statements():
+    engine, conn = fake_engine()
+    capture = make_capture(engine)
+
+    capture.observe("SELECT 1", (), 0.25, False)
+    capture.observe("SELECT * FROM users", (), 0.25, False)
+    await capture.drain()
+
+    assert conn.exec_driver_sql.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_buffer_keeps_newest_plans_and_flags_changes():
+    engine, conn = fake_engine()
+    capture = make_capture(engine, buffer_size=2)
+    seq_scan = {"Node Type": "Seq Scan", "Relation Name": "contacts"}
+
+    await capture.capture("SELECT 1", (), 0.2, "SELECT ?", "a")
+    await capture.capture("SELECT 2", (), 0.2, "SELECT ?", "b")
+    result = conn.exec_driver_sql.return_value
+    result.scalar_one.return_value = json.dumps([{"Plan": seq_scan}])
+    await capture.capture("SELECT 3", (), 0.2, "SELECT ?", "b")
+
+    entries = capture.snapshot()
+    assert [e["fingerprint"] for e in entries] == ["b", "b"]
+    assert entries[0]["shape"] == ["Seq Scan on contacts"]
+    assert entries[0]["plan_changed"] is True
+
+
+@pytest.mark.asyncio
+async def test_failed_explain_is_logged(caplog):
+    engine, conn = fake_engine()
+    conn.exec_driver_sql.side_effect = OperationalError("EXPLAIN", (), Exception())
+    capture = make_capture(engine)
+
+    await capture.capture("SELECT 1", (), 0.2, "SELECT ?", "a")
+
+    assert capture.snapshot() == []
+    assert "EXPLAIN of slow query a failed" in caplog.text
+
+
+def test_without_event_loop_nothing_is_scheduled():
+    engine, _ = fake_engine()
+    capture = make_capture(engine)
+
+    capture.observe("SELECT 1", (), 0.25, False)
+
+    assert capture._tasks == set()
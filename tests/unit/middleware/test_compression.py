@@ -0,0 +1,125 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from src.middleware import compression
+from src.middleware.compression import CompressionMiddleware, negotiate
+
+BODY = "contact," * 1000
+
+
+def make_client(minimum_size=500):
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=minimum_size)
+
+    @app.get("/large")
+    def large():
+        return PlainTextResponse(BODY)
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("ok")
+
+    @app.get("/image")
+    def image():
+        return Response(b"\x89PNG" * 1000, media_type="image/png")
+
+    @app.get("/encoded")
+    def encoded():
+        return Response(
+            gzip.compress(BODY.encode()),
+            media_type="text/plain",
+            headers={"Content-Encoding": "gzip"},
+        )
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(
+            (f"chunk{i}," for i in range(100)), media_type="text/plain"
+        )
+
+    return TestClient(app)
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("gzip, deflate", "gzip"),
+        ("gzip, br, zstd", "zstd"),
+        ("br;q=1.0, zstd;q=0.5, gzip;q=0.8", "br"),
+        ("gzip;q=0", None),
+        ("identity", None),
+        ("*", "zstd"),
+        ("", None),
+    ],
+)
+def test_negotiate(header, expected):
+    assert negotiate(header, ["zstd", "br", "gzip"]) == expected
+
+
+def test_large_response_is_gzipped():
+    response = make_client().get("/large", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.text == BODY
+    assert int(response.headers["content-length"]) < len(BODY)
+
+
+def test_brotli_and_zstd_when_available():
+    pytest.importorskip("brotli")
+    pytest.importorskip("zstandard")
+    client = make_client()
+
+    br = client.get("/large", headers={"Accept-Encoding": "br"})
+    zstd = client.get("/large", headers={"Accept-Encoding": "zstd"})
+
+    assert br.headers["content-encoding"] == "br"
+    assert zstd.headers["content-encoding"] == "zstd"
+    # The test client decodes both when the packages are installed.
+    assert br.text == BODY
+    assert zstd.text == BODY
+
+
+def test_gzip_only_without_optional_packages(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    monkeypatch.setattr(compression, "zstandard", None)
+
+    response = make_client().get(
+        "/large", headers={"Accept-Encoding": "zstd, br, gzip"}
+    )
+
+    assert response.headers["content-encoding"] == "gzip"
+
+
+def test_small_response_is_not_compressed():
+    response = make_client().get("/small", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.text == "ok"
+
+
+@pytest.mark.parametrize("path", ["/image", "/encoded"])
+def test_compressed_content_passes_through(path):
+    response = make_client().get(path, headers={"Accept-Encoding": "br, zstd"})
+
+    assert response.headers.get("content-encoding") in (None, "gzip")
+    assert len(response.content) > 0
+
+
+def test_streaming_response_is_compressed_in_chunks():
+    response = make_client().get("/stream", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.text == "".join(f"chunk{i}," for i in range(100))
+
+
+def test_no_accept_encoding_passes_through():
+    response = make_client().get("/large", headers={"Accept-Encoding": "identity"})
+
+    assert "content-encoding" not in response.headers
+    assert response.text == BODY
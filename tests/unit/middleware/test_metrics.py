@@ -0,0 +1,140 @@
+import pytest
+import fakeredis
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from src.cache.cache_decorator import redis_cache
+from src.conf.config import settings
+from src.metrics import (
+    PoolCollector,
+    _pools,
+    cache_prefix,
+    client_allowed,
+    metrics_endpoint,
+)
+from src.middleware.metrics import MetricsMiddleware
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def read_item(item_id: int):
+        if item_id == 0:
+            raise HTTPException(status_code=404)
+        return {"id": item_id}
+
+    app.add_route("/metrics", metrics_endpoint)
+    return TestClient(app)
+
+
+def test_requests_are_labelled_with_route_template(client):
+    route = "/items/{item_id}"
+    before_ok = sample("http_requests_total", method="GET", route=route, status="200")
+    before_404 = sample("http_requests_total", method="GET", route=route, status="404")
+
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/items/0")
+
+    assert sample("http_requests_total", method="GET", route=route, status="200") == (
+        before_ok + 2
+    )
+    assert sample("http_requests_total", method="GET", route=route, status="404") == (
+        before_404 + 1
+    )
+    assert sample(
+        "http_request_duration_seconds_count", method="GET", route=route
+    ) >= 3
+
+
+def test_unknown_paths_share_one_label(client):
+    before = sample("http_requests_total", method="GET", route="unmatched", status="404")
+
+    client.get("/random/1")
+    client.get("/random/2")
+
+    after = sample("http_requests_total", method="GET", route="unmatched", status="404")
+    assert after == before + 2
+
+
+@patch("src.metrics.email_outbox")
+def test_metrics_endpoint(mock_outbox, client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_ALLOW_IPS", "*")
+    mock_outbox.queue_lengths = AsyncMock(
+        return_value={"outbox": 3, "retry": 1, "dead": 0}
+    )
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'email_queue_length{queue="outbox"} 3.0' in response.text
+    assert "login_throttle_events_total" in response.text
+
+
+def test_metrics_endpoint_rejects_other_clients(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_ALLOW_IPS", "10.0.0.0/8")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 403
+
+
+def test_client_allowed():
+    assert client_allowed("10.1.2.3", "127.0.0.1, 10.0.0.0/8")
+    assert not client_allowed("192.168.1.1", "127.0.0.1,10.0.0.0/8")
+    assert not client_allowed("testclient", "127.0.0.1")
+    assert not client_allowed(None, "127.0.0.1")
+    assert client_allowed("testclient", "*")
+
+
+def test_pool_collector_sums_pools():
+    pool = MagicMock()
+    pool.checkedout.return_value = 4
+    pool.checkedin.return_value = 1
+    pool.overflow.return_value = -2
+    pool.size.return_value = 5
+    _pools.add(pool)
+    try:
+        values = {
+            family.name: family.samples[0].value
+            for family in PoolCollector().collect()
+        }
+    finally:
+        _pools.discard(pool)
+
+    assert values["db_pool_checked_out"] >= 4
+    assert values["db_pool_overflow"] >= 0
+
+
+def test_cache_prefix():
+    assert cache_prefix("user(alice)") == "user"
+    assert cache_prefix("contacts:1") == "contacts"
+
+
+@pytest.mark.asyncio
+async def test_redis_cache_counts_hits_and_misses():
+    load = AsyncMock(return_value={"name": "alice"})
+    cached = redis_cache(key_builder=lambda name: f"metrictest({name})")(load)
+    before_hit = sample("cache_requests_total", prefix="metrictest", result="hit")
+    before_miss = sample("cache_requests_total", prefix="metrictest", result="miss")
+
+    with patch("src.cache.cache_decorator.redis_client", fakeredis.FakeAsyncRedis()):
+        await cached("alice")
+        await cached("alice")
+
+    assert load.await_count == 1
+    assert sample("cache_requests_total", prefix="metrictest", result="miss") == (
+        before_miss + 1
+    )
+    assert sample("cache_requests_total", prefix="metrictest", result="hit") == (
+        before_hit + 1
+    )
@@ -0,0 +1,188 @@
+import asyncio
+import json
+import pytest
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from redis.exceptions import RedisError
+from sqlalchemy.exc import OperationalError
+from starlette.datastructures import Headers
+from src.middleware import profiling
+from src.middleware.profiling import (
+    ProfileStore,
+    ProfilingMiddleware,
+    is_admin_request,
+)
+from src.cache.revocation import revocation_list
+from src.database.models import UserRole
+from src.services.auth import create_token
+from tests.unit.conftest import user
+
+
+def bearer(**claims):
+    token = create_token(
+        {"sub": "alice", "uid": 1, "email": "a@example.com", "ver": 1, **claims},
+        timedelta(minutes=5),
+        "access",
+    )
+    return {"Authorization": f"Bearer {token}"}
+
+
+def make_client(store, sample_rate=0.0):
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, store=store, sample_rate=sample_rate)
+
+    @app.get("/items/{item_id}")
+    async def read_item(item_id: int):
+        return {"id": item_id, "total": sum(range(10000))}
+
+    return TestClient(app)
+
+
+@pytest.mark.asyncio
+async def test_admin_token_is_recognized():
+    assert await is_admin_request(Headers(bearer(role="admin")))
+    assert not await is_admin_request(Headers(bearer(role="user")))
+    assert not await is_admin_request(Headers({"Authorization": "Bearer nope"}))
+    assert not await is_admin_request(Headers({}))
+
+
+@pytest.mark.asyncio
+async def test_token_without_claims_loads_user(user):
+    token = create_token({"sub": "testuser"}, timedelta(minutes=5), "access")
+    user.role = UserRole.ADMIN
+    user.profile_version = 1
+
+    with patch(
+        "src.services.auth.load_user", AsyncMock(return_value=user)
+    ), patch("src.middleware.profiling.sessionmanager"):
+        result = await is_admin_request(Headers({"Authorization": f"Bearer {token}"}))
+
+    assert result
+
+
+@pytest.mark.asyncio
+async def test_demoted_admin_is_reloaded(user):
+    user.role = UserRole.USER
+    user.profile_version = 2
+    users = AsyncMock()
+    users.get_user_by_id.return_value = user
+
+    with patch("src.services.auth.UserService", return_value=users), patch(
+        "src.middleware.profiling.sessionmanager"
+    ), patch.dict(revocation_list._profile_versions, {1: 2}, clear=True):
+        result = await is_admin_request(Headers(bearer(role="admin")))
+
+    assert result is False
+    users.get_user_by_id.assert_awaited_once_with(1)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "error", [OperationalError("SELECT", {}, Exception()), RedisError("down")]
+)
+async def test_user_lookup_failure_is_not_admin(error):
+    token = create_token({"sub": "alice"}, timedelta(minutes=5), "access")
+
+    with patch(
+        "src.services.auth.load_user", AsyncMock(side_effect=error)
+    ), patch("src.middleware.profiling.sessionmanager"):
+        result = await is_admin_request(Headers({"Authorization": f"Bearer {token}"}))
+
+    assert result is False
+
+
+def test_requests_pass_through_without_pyinstrument(monkeypatch):
+    monkeypatch.setattr(profiling, "Profiler", None)
+    store = ProfileStore(5)
+
+    response = make_client(store, sample_rate=1.0).get("/items/1")
+
+    assert response.status_code == 200
+    assert store.list() == []
+
+
+def test_sampled_request_is_stored():
+    pytest.importorskip("pyinstrument")
+    store = ProfileStore(5)
+
+    response = make_client(store, sample_rate=1.0).get("/items/1")
+
+    assert "X-Profile-Id" not in response.headers
+    [entry] = store.list()
+    assert entry["route"] == "/items/{item_id}"
+    assert entry["status"] == 200
+    assert entry["requested"] is False
+    assert json.loads(store.render(entry["id"]))["$schema"].startswith(
+        "https://www.speedscope.app/"
+    )
+
+
+def test_admin_can_request_a_profile():
+    pytest.importorskip("pyinstrument")
+    store = ProfileStore(5)
+    client = make_client(store)
+
+    response = client.get(
+        "/items/1", headers={"X-Profile": "1", **bearer(role="admin")}
+    )
+    ignored = client.get("/items/1", headers={"X-Profile": "1", **bearer(role="user")})
+
+    assert [entry["id"] for entry in store.list()] == [response.headers["X-Profile-Id"]]
+    assert "X-Profile-Id" not in ignored.headers
+
+
+async def call(middleware, headers):
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/items/1",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+    }
+    await middleware(scope, AsyncMock(), AsyncMock())
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_profiled_one_at_a_time(monkeypatch):
+    profiler = MagicMock()
+    monkeypatch.setattr(profiling, "Profiler", profiler)
+    monkeypatch.setattr(profiling, "route_template", lambda scope: scope["path"])
+    store = ProfileStore(5)
+
+    async def is_admin_request(headers):
+        await asyncio.sleep(0)
+        return True
+
+    monkeypatch.setattr(profiling, "is_admin_request", is_admin_request)
+
+    async def app(scope, receive, send):
+        await asyncio.sleep(0.01)
+
+    middleware = ProfilingMiddleware(app, store=store)
+    headers = {"X-Profile": "1"}
+    await asyncio.gather(call(middleware, headers), call(middleware, headers))
+
+    assert profiler.call_count == 1
+    assert len(store.list()) == 1
+    assert not middleware._busy
+
+
+@pytest.mark.asyncio
+async def test_profiler_failure_releases_the_slot(monkeypatch):
+    monkeypatch.setattr(profiling, "Profiler", MagicMock(side_effect=RuntimeError))
+    middleware = ProfilingMiddleware(AsyncMock(), store=ProfileStore(5), sample_rate=1.0)
+
+    with pytest.raises(RuntimeError):
+        await call(middleware, {})
+
+    assert not middleware._busy
+
+
+def test_store_keeps_newest_profiles():
+    store = ProfileStore(2)
+    for profile_id in ("a", "b", "c"):
+        store.add(profile_id, object(), path="/")
+
+    assert store.list() == [{"id": "c", "path": "/"}, {"id": "b", "path": "/"}]
+    assert store.render("a") is None
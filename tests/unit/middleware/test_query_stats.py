@@ -0,0 +1,88 @@
+import logging
+import pytest
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from src.database.db import QueryStats, current_query_stats, instrument_engine
+from src.middleware.query_stats import QueryStatsMiddleware
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    return engine
+
+
+@pytest.fixture
+def client(engine):
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware)
+
+    @app.get("/items/{count}")
+    def read_items(count: int):
+        with engine.connect() as conn:
+            for i in range(count):
+                conn.execute(text("SELECT :i"), {"i": i})
+        return {"count": count}
+
+    return TestClient(app)
+
+
+def test_statements_are_attributed_to_current_stats(engine):
+    stats = QueryStats()
+    token = current_query_stats.set(stats)
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+    finally:
+        current_query_stats.reset(token)
+
+    assert stats.count == 2
+    assert stats.duration > 0
+    assert stats.statements["SELECT 1"] == 1
+
+
+def test_statements_outside_request_are_ignored(engine):
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    assert current_query_stats.get() is None
+
+
+def test_failed_statement_does_not_leak_timer(engine):
+    with engine.connect() as conn:
+        with pytest.raises(Exception):
+            conn.execute(text("SELECT * FROM missing"))
+        conn.execute(text("SELECT 1"))
+        assert conn.info["query_start"] == []
+
+
+def test_slow_queries_are_logged(engine, caplog):
+    with patch("src.database.db.settings.SQL_SLOW_QUERY_MS", 0):
+        with caplog.at_level(logging.WARNING, logger="src.database.db"):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 42"))
+
+    assert "Slow query" in caplog.text
+    assert "SELECT 42" in caplog.text
+
+
+def test_server_timing_header(client):
+    response = client.get("/items/3")
+
+    timing = response.headers["server-timing"]
+    assert timing.startswith("db;dur=")
+    assert 'desc="3 queries"' in timing
+
+
+def test_repeated_statements_warn_about_n_plus_one(client, caplog):
+    with caplog.at_level(logging.WARNING, logger="src.middleware.query_stats"):
+        client.get("/items/2")
+        assert "N+1" not in caplog.text
+
+        client.get("/items/6")
+
+    assert "Possible N+1 query: GET /items/{count} ran 6 times" in caplog.text
@@ -1,7 +1,9 @@
 import pytest
+from datetime import date, datetime, timedelta, timezone
 from unittest.mock import AsyncMock, MagicMock
-from src.database.models import Contact
-from src.repository.contacts import ContactRepository
+from sqlalchemy.dialects import postgresql
+from src.database.models import Contact, ContactTombstone
+from src.repository.contacts import ContactRepository, upcoming_birthdays_filter
 from tests.unit.conftest import mock_session, user, contact, contact_data
 
 
@@ -96,6 +98,9 @@ async def test_delete_contact_found(contact_repository, mock_session, user, cont
     assert deleted is not None
     mock_session.delete.assert_awaited_once_with(contact)
     mock_session.commit.assert_awaited_once()
+    tombstone = mock_session.add.call_args.args[0]
+    assert isinstance(tombstone, ContactTombstone)
+    assert (tombstone.contact_id, tombstone.user_id) == (1, user.id)
 
 
 @pytest.mark.asyncio
@@ -134,3 +139,51 @@ async def test_get_upcoming_birthdays(contact_repository, mock_session, user, co
 
     assert isinstance(results, list)
     assert results[0].first_name == "John"
+
+
+def test_upcoming_birthdays_filter_wraps_new_year():
+    within_year = str(upcoming_birthdays_filter(date(2026, 6, 1)))
+    across_year = str(upcoming_birthdays_filter(date(2026, 12, 29)))
+
+    assert "BETWEEN" in within_year
+    assert "OR" in across_year
+
+
+@pytest.mark.asyncio
+async def test_get_changed_contacts_resumes_after_position(
+    contact_repository, mock_session, user, contact
+):
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.all.return_value = [contact]
+    mock_session.execute = AsyncMock(return_value=mock_result)
+    after = (datetime(2026, 1, 1, tzinfo=timezone.utc), 7)
+
+    contacts = await contact_repository.get_changed_contacts(
+        user, after, timedelta(seconds=2), 11
+    )
+
+    assert contacts == [contact]
+    sql = str(
+        mock_session.execute.call_args.args[0].compile(dialect=postgresql.dialect())
+    )
+    assert "(contacts.updated_at, contacts.id) >" in sql
+    assert "contacts.updated_at <= now() -" in sql
+    assert "ORDER BY contacts.updated_at, contacts.id" in sql
+
+
+@pytest.mark.asyncio
+async def test_get_tombstones_from_beginning(contact_repository, mock_session, user):
+    tombstone = ContactTombstone(id=1, contact_id=5, user_id=user.id)
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.all.return_value = [tombstone]
+    mock_session.execute = AsyncMock(return_value=mock_result)
+
+    tombstones = await contact_repository.get_tombstones(
+        user, None, timedelta(seconds=2), 11
+    )
+
+    assert tombstones == [tombstone]
+    sql = str(
+        mock_session.execute.call_args.args[0].compile(dialect=postgresql.dialect())
+    )
+    assert "contact_tombstones.id) >" not in sql
@@ -0,0 +1,87 @@
+import fakeredis
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from src.repository.refresh_sessions import RefreshSessionRepository, REUSED
+
+
+@pytest.fixture
+def redis():
+    client = MagicMock()
+    client.register_script.return_value = AsyncMock()
+    return client
+
+
+@pytest.mark.asyncio
+async def test_consume_returns_session(redis):
+    repository = RefreshSessionRepository(redis)
+    repository._consume.return_value = json.dumps({"jti": "abc"}).encode()
+
+    session = await repository.consume("abc", 60)
+
+    assert session == {"jti": "abc"}
+    repository._consume.assert_awaited_once_with(
+        keys=["refresh_session:abc", "refresh_used:abc"], args=[60]
+    )
+
+
+@pytest.mark.asyncio
+async def test_consume_detects_reuse(redis):
+    repository = RefreshSessionRepository(redis)
+    repository._consume.return_value = REUSED
+
+    assert await repository.consume("abc", 60) == REUSED
+
+
+@pytest.mark.asyncio
+async def test_list_sessions_prunes_expired_families(redis):
+    redis.smembers = AsyncMock(return_value={b"active", b"expired"})
+    redis.mget = AsyncMock(
+        side_effect=lambda keys: (
+            [b"jti1" if "active" in key else None for key in keys]
+            if keys[0].startswith("refresh_family")
+            else [json.dumps({"family": "active"}).encode()]
+        )
+    )
+    redis.srem = AsyncMock()
+    repository = RefreshSessionRepository(redis)
+
+    sessions = await repository.list_sessions("testuser")
+
+    assert sessions == [{"family": "active"}]
+    redis.srem.assert_awaited_once_with("refresh_user:testuser", "expired")
+
+
+@pytest.mark.asyncio
+async def test_revoke_family_of_other_user(redis):
+    redis.srem = AsyncMock(return_value=0)
+    redis.getdel = AsyncMock()
+    repository = RefreshSessionRepository(redis)
+
+    assert await repository.revoke_family("testuser", "family") is False
+    redis.getdel.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_rotation_does_not_restore_revoked_family():
+    repository = RefreshSessionRepository(fakeredis.FakeAsyncRedis())
+    session = {"jti": "old", "family": "family", "username": "testuser"}
+    assert await repository.save(session, 60)
+    assert await repository.consume("old", 60) == session
+
+    assert await repository.revoke_family("testuser", "family")
+    rotated = {**session, "jti": "new"}
+
+    assert not await repository.save(rotated, 60, previous_jti="old")
+    assert await repository.list_sessions("testuser") == []
+
+
+@pytest.mark.asyncio
+async def test_rotation_of_live_family():
+    repository = RefreshSessionRepository(fakeredis.FakeAsyncRedis())
+    session = {"jti": "old", "family": "family", "username": "testuser"}
+    await repository.save(session, 60)
+    await repository.consume("old", 60)
+
+    assert await repository.save({**session, "jti": "new"}, 60, previous_jti="old")
+    assert await repository.list_sessions("testuser") == [{**session, "jti": "new"}]
@@ -1,7 +1,7 @@
 import pytest
 from unittest.mock import AsyncMock, MagicMock
 from src.repository.users import UserRepository
-from src.database.models import User
+from src.database.models import User, UserRole
 from src.schemas import UserCreate
 from tests.unit.conftest import mock_session, user
 
@@ -82,8 +82,9 @@ async def test_confirmed_email(user_repository, mock_session, user):
     user_repository.get_user_by_email = AsyncMock(return_value=user)
     mock_session.commit = AsyncMock()
 
-    await user_repository.confirmed_email(user.email)
+    result = await user_repository.confirmed_email(user.email)
 
+    assert result is user
     assert user.confirmed is True
     mock_session.commit.assert_awaited_once()
 
@@ -100,10 +101,24 @@ async def test_update_avatar_url(user_repository, mock_session, user):
     result = await user_repository.update_avatar_url(user.email, new_url)
 
     assert result.avatar == new_url
+    assert result.profile_version == 2
     mock_session.commit.assert_awaited_once()
     mock_session.refresh.assert_awaited_once_with(user)
 
 
+@pytest.mark.asyncio
+async def test_update_role(user_repository, mock_session, user):
+    user_repository.get_user_by_email = AsyncMock(return_value=user)
+    mock_session.commit = AsyncMock()
+    mock_session.refresh = AsyncMock()
+
+    result = await user_repository.update_role(user.email, UserRole.ADMIN)
+
+    assert result.role == UserRole.ADMIN
+    assert result.profile_version == 2
+    mock_session.commit.assert_awaited_once()
+
+
 @pytest.mark.asyncio
 async def test_reset_password(user_repository, mock_session, user):
     new_password = "new_hashed_pass"
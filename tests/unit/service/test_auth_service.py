@@ -2,6 +2,7 @@ import pytest
 from jose import jwt
 from fastapi import HTTPException, status
 from unittest.mock import AsyncMock, MagicMock, patch
+from passlib.context import CryptContext
 from src.services.auth import generate_reset_token
 from src.services.auth import (
     Hash,
@@ -13,7 +14,12 @@ from src.services.auth import (
     verify_refresh_token,
     get_current_user,
     get_current_admin_user,
+    rehash_password,
+    decode_access_token,
+    access_token_claims,
+    get_current_principal,
 )
+from src.cache.revocation import revocation_list
 from src.database.models import User, UserRole
 from src.conf.config import settings
 from datetime import timedelta
@@ -28,6 +34,32 @@ def test_hash_password_and_verify():
     assert hasher.verify_password("wrong", hashed) is False
 
 
+def test_hash_needs_update_for_other_cost():
+    hasher = Hash()
+    outdated = CryptContext(
+        schemes=["bcrypt"], bcrypt__rounds=settings.BCRYPT_ROUNDS - 1
+    ).hash("secret123")
+    assert hasher.needs_update(outdated) is True
+    assert hasher.needs_update(hasher.get_password_hash("secret123")) is False
+
+
+@pytest.mark.asyncio
+@patch("src.services.auth.UserService")
+@patch("src.services.auth.sessionmanager")
+async def test_rehash_password_stores_new_hash(
+    mock_sessionmanager, mock_user_service_class, mock_session
+):
+    mock_sessionmanager.session.return_value.__aenter__.return_value = mock_session
+    mock_user_service = AsyncMock()
+    mock_user_service_class.return_value = mock_user_service
+
+    await rehash_password("test@example.com", "secret123")
+
+    email, new_hash = mock_user_service.reset_password.await_args.args
+    assert email == "test@example.com"
+    assert Hash().verify_password("secret123", new_hash)
+
+
 def test_create_token_contains_expected_claims():
     data = {"sub": "testuser"}
     expires = 3600
@@ -93,37 +125,27 @@ async def test_get_email_from_token_invalid():
 
 
 @pytest.mark.asyncio
-async def test_verify_refresh_token_valid_user(mock_session):
-    refresh_token = jwt.encode(
-        {"sub": "testuser", "token_type": "refresh"},
-        settings.JWT_SECRET,
-        algorithm=settings.JWT_ALGORITHM,
-    )
-
-    mock_user = User(username="testuser", refresh_token=refresh_token)
-    mock_result = MagicMock()
-    mock_result.scalar_one_or_none.return_value = mock_user
-    mock_session.execute = AsyncMock(return_value=mock_result)
+async def test_verify_refresh_token_valid():
+    refresh_token = await create_refresh_token({"sub": "testuser", "jti": "abc"})
 
-    user = await verify_refresh_token(refresh_token, mock_session)
-    assert user.username == "testuser"
+    payload = await verify_refresh_token(refresh_token)
+    assert payload["sub"] == "testuser"
+    assert payload["jti"] == "abc"
 
 
 @pytest.mark.asyncio
-async def test_verify_refresh_token_invalid_token_type(mock_session):
+async def test_verify_refresh_token_invalid_token_type():
     token = jwt.encode(
         {"sub": "testuser", "token_type": "access"},
         settings.JWT_SECRET,
         algorithm=settings.JWT_ALGORITHM,
     )
-    user = await verify_refresh_token(token, mock_session)
-    assert user is None
+    assert await verify_refresh_token(token) is None
 
 
 @pytest.mark.asyncio
-async def test_verify_refresh_token_invalid_token(mock_session):
-    user = await verify_refresh_token("bad.token.string", mock_session)
-    assert user is None
+async def test_verify_refresh_token_invalid_token():
+    assert await verify_refresh_token("bad.token.string") is None
 
 
 @pytest.mark.asyncio
@@ -145,7 +167,7 @@ async def test_get_current_user_success(
     mock_jwt_decode, mock_user_service_class, mock_get, mock_set, mock_session, user
 ):
     mock_get.return_value = None
-    mock_jwt_decode.return_value = {"sub": "testuser"}
+    mock_jwt_decode.return_value = {"sub": "testuser", "token_type": "access"}
 
     mock_user_service = AsyncMock()
     mock_user_service.get_user_by_username.return_value = user
@@ -159,6 +181,105 @@ async def test_get_current_user_success(
     assert user.username == "testuser"
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize("dependency", [get_current_user, get_current_principal])
+async def test_refresh_token_is_not_a_bearer_token(dependency, mock_session):
+    token = await create_refresh_token({"sub": "testuser"})
+
+    with pytest.raises(HTTPException) as exc:
+        await dependency(token=token, db=mock_session)
+
+    assert exc.value.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.asyncio
+async def test_decode_access_token_uses_cache():
+    token = await create_access_token({"sub": "cacheduser"})
+    assert decode_access_token(token)["sub"] == "cacheduser"
+
+    with patch("src.services.auth.jwt.decode") as mock_jwt_decode:
+        payload = decode_access_token(token)
+
+    mock_jwt_decode.assert_not_called()
+    assert payload["sub"] == "cacheduser"
+
+
+@pytest.mark.asyncio
+@patch("src.cache.cache_decorator.redis_client.get", new_callable=AsyncMock)
+async def test_get_current_user_invalid_token(mock_get, mock_session):
+    with pytest.raises(HTTPException) as exc:
+        await get_current_user(token="invalid.token.here", db=mock_session)
+
+    assert exc.value.status_code == status.HTTP_401_UNAUTHORIZED
+    mock_get.assert_not_awaited()
+
+
+def test_access_token_claims_without_embedding(user):
+    with patch.object(settings, "TOKEN_EMBED_CLAIMS", False):
+        assert access_token_claims(user) == {"sub": "testuser"}
+
+
+@pytest.mark.asyncio
+@patch("src.services.auth.get_current_user", new_callable=AsyncMock)
+@patch("src.services.auth.UserService")
+async def test_get_current_principal_from_claims(
+    mock_user_service_class, mock_get_current_user, user, mock_session
+):
+    user.role = UserRole.ADMIN
+    user.profile_version = 3
+    with patch.object(settings, "TOKEN_EMBED_CLAIMS", True):
+        token = await create_access_token(access_token_claims(user))
+
+    with patch.dict(revocation_list._profile_versions, clear=True):
+        principal = await get_current_principal(token=token, db=mock_session)
+
+    assert principal.id == user.id
+    assert principal.role == UserRole.ADMIN
+    assert principal.profile_version == 3
+    mock_get_current_user.assert_not_awaited()
+    mock_user_service_class.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("src.services.auth.UserService")
+async def test_get_current_principal_reloads_stale_profile(
+    mock_user_service_class, user, mock_session
+):
+    user.role = UserRole.USER
+    user.profile_version = 1
+    with patch.object(settings, "TOKEN_EMBED_CLAIMS", True):
+        token = await create_access_token(access_token_claims(user))
+
+    user.avatar = "new_url"
+    user.profile_version = 2
+    mock_user_service = AsyncMock()
+    mock_user_service.get_user_by_id.return_value = user
+    mock_user_service_class.return_value = mock_user_service
+
+    with patch.dict(revocation_list._profile_versions, {user.id: 2}, clear=True):
+        principal = await get_current_principal(token=token, db=mock_session)
+
+    mock_user_service.get_user_by_id.assert_awaited_once_with(user.id)
+    assert principal.avatar == "new_url"
+    assert principal.profile_version == 2
+
+
+@pytest.mark.asyncio
+@patch("src.services.auth.load_user", new_callable=AsyncMock)
+async def test_get_current_principal_without_claims(
+    mock_load_user, user, mock_session
+):
+    user.role = UserRole.USER
+    user.profile_version = 1
+    mock_load_user.return_value = user
+    token = await create_access_token({"sub": user.username})
+
+    principal = await get_current_principal(token=token, db=mock_session)
+
+    mock_load_user.assert_awaited_once_with(user.username, mock_session)
+    assert principal.username == user.username
+
+
 def test_get_current_admin_user_success(user):
     user.role = UserRole.ADMIN
     result = get_current_admin_user(current_user=user)
@@ -0,0 +1,118 @@
+import asyncio
+import pytest
+import fakeredis
+from fastapi import HTTPException
+from src.services.contact_events import (
+    CREATED,
+    DELETED,
+    UPDATED,
+    ContactEvents,
+    events_key,
+)
+
+
+@pytest.fixture
+def redis():
+    return fakeredis.FakeAsyncRedis()
+
+
+@pytest.fixture
+def events(redis):
+    return ContactEvents(
+        redis, maxlen=100, ttl=60, buffer_size=2, max_streams=2, heartbeat=0.2
+    )
+
+
+async def next_event(stream):
+    while True:
+        chunk = await asyncio.wait_for(stream.__anext__(), 3)
+        if chunk.startswith("id:"):
+            return chunk
+
+
+def parse(chunk):
+    fields = dict(line.split(": ", 1) for line in chunk.strip().splitlines())
+    return fields["id"], fields["event"], fields["data"]
+
+
+@pytest.mark.asyncio
+async def test_published_events_reach_open_stream(events):
+    subscription = await events.open(1)
+    stream = events.stream(subscription)
+    assert (await stream.__anext__()).startswith("retry:")
+
+    await events.publish(1, CREATED, 10)
+    await events.publish(2, CREATED, 20)
+    await events.publish(1, DELETED, 10)
+
+    assert parse(await next_event(stream))[1:] == (CREATED, '{"id": 10}')
+    assert parse(await next_event(stream))[1:] == (DELETED, '{"id": 10}')
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_resume_from_last_event_id(events):
+    await events.publish(1, CREATED, 10)
+    first_id = (await events.redis.xrange(events_key(1)))[0][0].decode()
+    await events.publish(1, UPDATED, 10)
+
+    subscription = await events.open(1)
+    stream = events.stream(subscription, first_id)
+
+    assert parse(await next_event(stream))[1] == UPDATED
+    await events.publish(1, DELETED, 10)
+    assert parse(await next_event(stream))[1] == DELETED
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_resume_after_trimmed_events_sends_reset(events):
+    await events.publish(1, CREATED, 10)
+
+    subscription = await events.open(1)
+    stream = events.stream(subscription, "1-0")
+
+    entry_id, event, _ = parse(await next_event(stream))
+    assert event == "reset"
+    assert entry_id == subscription.last_id
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_full_buffer_catches_up_from_redis(events):
+    subscription = await events.open(1)
+    stream = events.stream(subscription)
+    await stream.__anext__()
+
+    for contact_id in range(5):
+        await events.publish(1, CREATED, contact_id)
+    await asyncio.sleep(0.1)
+
+    data = [parse(await next_event(stream))[2] for _ in range(5)]
+    assert data == [f'{{"id": {i}}}' for i in range(5)]
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stream_limit_per_user(events):
+    first = await events.open(1)
+    await events.open(1)
+
+    with pytest.raises(HTTPException) as exc:
+        await events.open(1)
+    assert exc.value.status_code == 429
+
+    await events.close(first)
+    await events.open(1)
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_keeps_connection_alive(events):
+    subscription = await events.open(1)
+    stream = events.stream(subscription)
+    await stream.__anext__()
+
+    assert await asyncio.wait_for(stream.__anext__(), 3) == ": keep-alive\n\n"
+    await stream.aclose()
+
+    assert await events.redis.zcard("contacts:events:connections:1") == 0
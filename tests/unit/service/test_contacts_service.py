@@ -1,8 +1,11 @@
 import pytest
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, patch
+from datetime import datetime, timezone
+from fastapi import HTTPException
 from sqlalchemy.exc import IntegrityError
-from src.services.contacts import ContactService
-from tests.unit.conftest import mock_session, user, contact_data
+from src.database.models import Contact, ContactTombstone
+from src.services.contacts import ContactService, decode_cursor, encode_cursor
+from tests.unit.conftest import mock_session, user, contact, contact_data
 
 
 @pytest.fixture
@@ -10,11 +13,25 @@ def contact_service(mock_session):
     return ContactService(mock_session)
 
 
+@pytest.fixture(autouse=True)
+def mock_contacts_version():
+    with patch("src.services.contacts.contacts_version") as mock:
+        mock.bump = AsyncMock()
+        yield mock
+
+
+@pytest.fixture(autouse=True)
+def mock_contact_events():
+    with patch("src.services.contacts.contact_events") as mock:
+        mock.publish = AsyncMock()
+        yield mock
+
+
 @pytest.mark.asyncio
-async def test_create_contact_success(contact_service, user, contact_data):
-    contact_service.repository.create_contact = AsyncMock(return_value=contact_data)
+async def test_create_contact_success(contact_service, user, contact, contact_data):
+    contact_service.repository.create_contact = AsyncMock(return_value=contact)
     result = await contact_service.create_contact(contact_data, user)
-    assert result == contact_data
+    assert result == contact
     contact_service.repository.create_contact.assert_awaited_once_with(
         contact_data, user
     )
@@ -49,10 +66,10 @@ async def test_get_contact(contact_service, contact_data, user):
 
 
 @pytest.mark.asyncio
-async def test_update_contact_success(contact_service, user, contact_data):
-    contact_service.repository.update_contact = AsyncMock(return_value=contact_data)
+async def test_update_contact_success(contact_service, user, contact, contact_data):
+    contact_service.repository.update_contact = AsyncMock(return_value=contact)
     result = await contact_service.update_contact(1, contact_data, user)
-    assert result == contact_data
+    assert result == contact
 
 
 @pytest.mark.asyncio
@@ -90,3 +107,93 @@ async def test_get_upcoming_birthdays(contact_service, contact_data, user):
     )
     result = await contact_service.get_upcoming_birthdays(user)
     assert result == [contact_data]
+
+
+@pytest.mark.asyncio
+async def test_writes_bump_contacts_version(
+    contact_service,
+    contact,
+    contact_data,
+    user,
+    mock_contacts_version,
+    mock_contact_events,
+):
+    contact_service.repository.create_contact = AsyncMock(return_value=contact)
+    contact_service.repository.update_contact = AsyncMock(return_value=contact)
+    contact_service.repository.delete_contact = AsyncMock(return_value=contact)
+
+    await contact_service.create_contact(contact_data, user)
+    await contact_service.update_contact(1, contact_data, user)
+    await contact_service.delete_contact(1, user)
+
+    assert mock_contacts_version.bump.await_count == 3
+    mock_contacts_version.bump.assert_awaited_with(user.id)
+    assert [c.args for c in mock_contact_events.publish.await_args_list] == [
+        (user.id, "created", contact.id),
+        (user.id, "updated", contact.id),
+        (user.id, "deleted", 1),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_missing_contact_does_not_bump_version(
+    contact_service, contact_data, user, mock_contacts_version, mock_contact_events
+):
+    contact_service.repository.update_contact = AsyncMock(return_value=None)
+    contact_service.repository.delete_contact = AsyncMock(return_value=None)
+
+    await contact_service.update_contact(1, contact_data, user)
+    await contact_service.delete_contact(1, user)
+
+    mock_contacts_version.bump.assert_not_awaited()
+    mock_contact_events.publish.assert_not_awaited()
+
+
+def test_cursor_round_trip():
+    position = (datetime(2026, 1, 1, 12, 30, tzinfo=timezone.utc), 42)
+
+    assert decode_cursor(encode_cursor(position, None)) == (position, None)
+    assert decode_cursor(None) == (None, None)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor(None, None)[:-2]])
+def test_invalid_cursor(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor)
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_get_changes_pages_both_streams(contact_service, user):
+    t1 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    t2 = datetime(2026, 1, 2, tzinfo=timezone.utc)
+    contacts = [Contact(id=3, updated_at=t1), Contact(id=1, updated_at=t2)]
+    tombstone = ContactTombstone(id=9, contact_id=2, deleted_at=t1)
+    contact_service.repository.get_changed_contacts = AsyncMock(
+        return_value=contacts
+    )
+    contact_service.repository.get_tombstones = AsyncMock(return_value=[tombstone])
+
+    changes = await contact_service.get_changes(user, None, limit=1)
+
+    assert changes["changed"] == contacts[:1]
+    assert changes["deleted"] == [2]
+    assert changes["has_more"] is True
+    assert decode_cursor(changes["cursor"]) == ((t1, 3), (t1, 9))
+    assert contact_service.repository.get_changed_contacts.call_args.args[3] == 2
+
+
+@pytest.mark.asyncio
+async def test_get_changes_keeps_cursor_when_nothing_changed(contact_service, user):
+    position = (datetime(2026, 1, 1, tzinfo=timezone.utc), 3)
+    since = encode_cursor(position, None)
+    contact_service.repository.get_changed_contacts = AsyncMock(return_value=[])
+    contact_service.repository.get_tombstones = AsyncMock(return_value=[])
+
+    changes = await contact_service.get_changes(user, since, limit=100)
+
+    assert changes["changed"] == [] and changes["deleted"] == []
+    assert changes["cursor"] == since
+    assert changes["has_more"] is False
+    get_changed = contact_service.repository.get_changed_contacts
+    assert get_changed.call_args.args[1] == position
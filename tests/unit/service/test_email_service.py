@@ -1,10 +1,14 @@
 import pytest
 from unittest.mock import patch, AsyncMock
-from src.services.email import send_email, send_password_reset_email
+from src.services.email import (
+    build_birthday_digest_email,
+    send_email,
+    send_password_reset_email,
+)
 
 
 @pytest.mark.asyncio
-@patch("src.services.email.FastMail.send_message", new_callable=AsyncMock)
+@patch("src.services.email.smtp_pool.send", new_callable=AsyncMock)
 @patch("src.services.email.create_email_token")
 async def test_send_email_success(mock_create_token, mock_send_message):
     mock_create_token.return_value = "mocked_token"
@@ -18,7 +22,7 @@ async def test_send_email_success(mock_create_token, mock_send_message):
 
 
 @pytest.mark.asyncio
-@patch("src.services.email.FastMail.send_message", new_callable=AsyncMock)
+@patch("src.services.email.smtp_pool.send", new_callable=AsyncMock)
 @patch("src.services.email.create_email_token")
 async def test_send_email_connection_error(mock_create_token, mock_send_message):
     mock_create_token.return_value = "mocked_token"
@@ -35,7 +39,7 @@ async def test_send_email_connection_error(mock_create_token, mock_send_message)
 
 
 @pytest.mark.asyncio
-@patch("src.services.email.FastMail.send_message", new_callable=AsyncMock)
+@patch("src.services.email.smtp_pool.send", new_callable=AsyncMock)
 async def test_send_password_reset_email_connection_error(mock_send_message):
     mock_send_message.side_effect = Exception("Connection error")
 
@@ -46,3 +50,18 @@ async def test_send_password_reset_email_connection_error(mock_send_message):
 
     mock_send_message.assert_awaited_once()
     assert exc.type is not None
+
+
+@pytest.mark.asyncio
+async def test_build_birthday_digest_email():
+    message = await build_birthday_digest_email(
+        email="test@example.com",
+        username="testuser",
+        contacts=[{"name": "<John> Doe", "birthday": "02 January"}],
+    )
+
+    body = message.get_content()
+    assert message["To"] == "test@example.com"
+    assert message.get_content_type() == "text/html"
+    assert "&lt;John&gt; Doe" in body
+    assert "02 January" in body
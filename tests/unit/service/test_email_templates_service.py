@@ -0,0 +1,39 @@
+import pytest
+from jinja2 import Environment, FileSystemLoader
+
+from src.services.email_templates import TEMPLATE_FOLDER, EmailTemplates, email_templates
+
+context = {"host": "http://testserver/", "username": "testuser", "token": "abc"}
+
+
+@pytest.mark.parametrize("name", ["verify_email.html", "password_reset_email.html"])
+def test_static_render_matches_jinja(name):
+    expected = (
+        Environment(loader=FileSystemLoader(TEMPLATE_FOLDER))
+        .get_template(name)
+        .render(**context)
+    )
+
+    assert email_templates.is_static(name)
+    assert email_templates.render(name, context) == expected
+
+
+def test_missing_variable_renders_empty():
+    rendered = email_templates.render("password_reset_email.html", {"token": "abc"})
+
+    assert "{{" not in rendered
+    assert "abc" in rendered
+
+
+def test_template_with_logic_falls_back_to_jinja(tmp_path):
+    (tmp_path / "plain.html").write_text("Hi {{ name }}!")
+    (tmp_path / "loop.html").write_text("{% for i in items %}{{ i }},{% endfor %}")
+    (tmp_path / "filter.html").write_text("{{ name | upper }}")
+    templates = EmailTemplates(tmp_path)
+
+    assert templates.is_static("plain.html")
+    assert not templates.is_static("loop.html")
+    assert not templates.is_static("filter.html")
+    assert templates.render("plain.html", {"name": "Bob"}) == "Hi Bob!"
+    assert templates.render("loop.html", {"items": [1, 2]}) == "1,2,"
+    assert templates.render("filter.html", {"name": "bob"}) == "BOB"
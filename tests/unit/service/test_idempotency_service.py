@@ -0,0 +1,157 @@
+import asyncio
+import json
+import pytest
+import fakeredis
+from unittest.mock import AsyncMock, MagicMock
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from redis.exceptions import ConnectionError
+from src.services.idempotency import IdempotencyStore, fingerprint
+
+
+@pytest.fixture
+def store():
+    return IdempotencyStore(
+        fakeredis.FakeAsyncRedis(), ttl=60, lock_timeout=5, wait_timeout=1
+    )
+
+
+def counting_handler(status_code=201):
+    calls = []
+
+    async def handler():
+        calls.append(1)
+        return JSONResponse({"id": len(calls)}, status_code=status_code)
+
+    return handler, calls
+
+
+@pytest.mark.asyncio
+async def test_without_key_always_runs(store):
+    handler, calls = counting_handler()
+
+    await store.run("1:create", None, fingerprint("{}"), handler)
+    await store.run("1:create", None, fingerprint("{}"), handler)
+
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_retry_replays_stored_response(store):
+    handler, calls = counting_handler()
+
+    first = await store.run("1:create", "k1", fingerprint("{}"), handler)
+    replay = await store.run("1:create", "k1", fingerprint("{}"), handler)
+
+    assert len(calls) == 1
+    assert replay.status_code == 201
+    assert replay.body == first.body
+    assert replay.headers["Idempotent-Replayed"] == "true"
+    assert replay.media_type == "application/json"
+
+
+@pytest.mark.asyncio
+async def test_keys_are_scoped(store):
+    handler, calls = counting_handler()
+
+    await store.run("1:create", "k1", fingerprint("{}"), handler)
+    await store.run("2:create", "k1", fingerprint("{}"), handler)
+
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicate_waits_for_result(store):
+    started = asyncio.Event()
+    release = asyncio.Event()
+    calls = []
+
+    async def slow():
+        calls.append(1)
+        started.set()
+        await release.wait()
+        return JSONResponse({"id": 1}, status_code=201)
+
+    first = asyncio.create_task(store.run("1:create", "k1", fingerprint("{}"), slow))
+    await started.wait()
+    second = asyncio.create_task(store.run("1:create", "k1", fingerprint("{}"), slow))
+    await asyncio.sleep(0.1)
+    release.set()
+
+    responses = await asyncio.gather(first, second)
+
+    assert len(calls) == 1
+    assert [r.body for r in responses] == [b'{"id":1}', b'{"id":1}']
+
+
+@pytest.mark.asyncio
+async def test_duplicate_gives_up_after_wait_timeout(store):
+    await store.redis.set(
+        "idempotency:1:create:k1",
+        json.dumps({"state": "pending", "hash": fingerprint("{}"), "id": "x"}),
+    )
+    handler, calls = counting_handler()
+
+    with pytest.raises(HTTPException) as exc:
+        await store.run("1:create", "k1", fingerprint("{}"), handler)
+
+    assert exc.value.status_code == 409
+    assert calls == []
+
+
+@pytest.mark.asyncio
+async def test_key_reused_with_different_body(store):
+    handler, _ = counting_handler()
+    await store.run("1:create", "k1", fingerprint('{"a":1}'), handler)
+
+    with pytest.raises(HTTPException) as exc:
+        await store.run("1:create", "k1", fingerprint('{"a":2}'), handler)
+    assert exc.value.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_replayed(store):
+    handler = AsyncMock(side_effect=HTTPException(status_code=404, detail="Not found"))
+
+    with pytest.raises(HTTPException):
+        await store.run("1:update:5", "k1", fingerprint("{}"), handler)
+    replay = await store.run("1:update:5", "k1", fingerprint("{}"), handler)
+
+    assert handler.await_count == 1
+    assert replay.status_code == 404
+    assert json.loads(replay.body) == {"detail": "Not found"}
+
+
+@pytest.mark.asyncio
+async def test_failed_request_can_be_retried(store):
+    handler, calls = counting_handler()
+    failing = AsyncMock(side_effect=RuntimeError("db down"))
+
+    with pytest.raises(RuntimeError):
+        await store.run("1:create", "k1", fingerprint("{}"), failing)
+    response = await store.run("1:create", "k1", fingerprint("{}"), handler)
+
+    assert response.status_code == 201
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_too_long_key(store):
+    handler, _ = counting_handler()
+
+    with pytest.raises(HTTPException) as exc:
+        await store.run("1:create", "k" * 256, fingerprint("{}"), handler)
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_redis_unavailable_runs_handler():
+    redis = MagicMock()
+    redis.set = AsyncMock(side_effect=ConnectionError("down"))
+    store = IdempotencyStore(redis, ttl=60, lock_timeout=5, wait_timeout=1)
+    handler, calls = counting_handler()
+
+    response = await store.run("1:create", "k1", fingerprint("{}"), handler)
+
+    assert response.status_code == 201
+    assert len(calls) == 1
@@ -0,0 +1,55 @@
+import pytest
+from io import BytesIO
+from unittest.mock import patch
+from fastapi import HTTPException, UploadFile
+from PIL import Image, ImageFile
+from src.services.images import prepare_avatar, read_limited
+
+
+def image_bytes(size, mode="RGB", format="PNG"):
+    buffer = BytesIO()
+    Image.new(mode, size).save(buffer, format=format)
+    return buffer.getvalue()
+
+
+@pytest.mark.asyncio
+async def test_read_limited_returns_content():
+    file = UploadFile(filename="a.png", file=BytesIO(b"x" * 100_000))
+
+    assert await read_limited(file, 100_000) == b"x" * 100_000
+
+
+@pytest.mark.asyncio
+async def test_read_limited_rejects_large_file():
+    file = UploadFile(filename="a.png", file=BytesIO(b"x" * 100_001))
+
+    with pytest.raises(HTTPException) as exc:
+        await read_limited(file, 100_000)
+    assert exc.value.status_code == 413
+
+
+@pytest.mark.parametrize("mode, format", [("RGB", "JPEG"), ("RGBA", "PNG"), ("P", "GIF")])
+def test_prepare_avatar_crops_to_square_webp(mode, format):
+    avatar = prepare_avatar(image_bytes((800, 400), mode, format))
+
+    with Image.open(BytesIO(avatar)) as image:
+        assert image.format == "WEBP"
+        assert image.size == (250, 250)
+
+
+def test_prepare_avatar_rejects_non_image():
+    with pytest.raises(HTTPException) as exc:
+        prepare_avatar(b"not an image")
+    assert exc.value.status_code == 400
+
+
+@patch("src.services.images.settings.AVATAR_MAX_PIXELS", 10_000)
+def test_prepare_avatar_rejects_too_many_pixels():
+    data = image_bytes((101, 100))
+
+    with patch.object(ImageFile.ImageFile, "load") as load:
+        with pytest.raises(HTTPException) as exc:
+            prepare_avatar(data)
+
+    assert exc.value.status_code == 413
+    load.assert_not_called()
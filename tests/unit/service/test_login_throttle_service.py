@@ -0,0 +1,58 @@
+import pytest
+import fakeredis
+from unittest.mock import MagicMock, patch
+from redis.exceptions import ConnectionError
+from src.conf.config import settings
+from src.services.login_throttle import LoginThrottle
+
+
+@pytest.fixture
+def throttle():
+    return LoginThrottle(fakeredis.FakeAsyncRedis())
+
+
+@pytest.mark.asyncio
+async def test_user_is_blocked_after_threshold(throttle):
+    for _ in range(settings.LOGIN_THROTTLE_USER_THRESHOLD - 1):
+        assert await throttle.register_failure("testuser", "10.0.0.1") == 0
+    assert await throttle.retry_after("testuser", "10.0.0.2") == 0
+
+    assert await throttle.register_failure("testuser", "10.0.0.1") == 1
+    assert await throttle.retry_after("testuser", "10.0.0.2") > 0
+    assert await throttle.retry_after("otheruser", "10.0.0.2") == 0
+    assert throttle.stats["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_block_grows_exponentially(throttle):
+    delays = [
+        await throttle.register_failure("testuser", "10.0.0.1")
+        for _ in range(settings.LOGIN_THROTTLE_USER_THRESHOLD + 3)
+    ]
+    assert delays[-4:] == [1, 2, 4, 8]
+
+
+@pytest.mark.asyncio
+async def test_ip_is_blocked_across_usernames(throttle):
+    with patch.object(settings, "LOGIN_THROTTLE_IP_THRESHOLD", 3):
+        for i in range(3):
+            await throttle.register_failure(f"user{i}", "10.0.0.1")
+
+    assert await throttle.retry_after("newuser", "10.0.0.1") > 0
+
+
+@pytest.mark.asyncio
+async def test_reset_clears_user_counter(throttle):
+    for _ in range(settings.LOGIN_THROTTLE_USER_THRESHOLD):
+        await throttle.register_failure("testuser", "10.0.0.1")
+
+    await throttle.reset("testuser")
+
+    assert await throttle.register_failure("testuser", "10.0.0.1") == 0
+
+
+@pytest.mark.asyncio
+async def test_fails_open_without_redis(throttle):
+    throttle.redis = MagicMock()
+    throttle.redis.pipeline.side_effect = ConnectionError("down")
+    assert await throttle.retry_after("testuser", "10.0.0.1") == 0
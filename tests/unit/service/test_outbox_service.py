@@ -0,0 +1,54 @@
+import json
+from unittest.mock import AsyncMock
+
+import pytest
+from fakeredis import FakeAsyncRedis
+from redis.exceptions import ConnectionError
+
+from src.services.outbox import (
+    OUTBOX_STREAM,
+    PASSWORD_RESET,
+    VERIFY_EMAIL,
+    EmailOutbox,
+)
+
+
+@pytest.mark.asyncio
+async def test_send_verification_appends_to_stream():
+    redis = FakeAsyncRedis()
+    outbox = EmailOutbox(redis)
+
+    await outbox.send_verification("a@example.com", "alice", "http://h/")
+
+    assert await outbox.depth() == 1
+    [(_, fields)] = await redis.xrange(OUTBOX_STREAM)
+    assert fields[b"kind"] == VERIFY_EMAIL.encode()
+    assert json.loads(fields[b"payload"])["email"] == "a@example.com"
+
+
+@pytest.mark.asyncio
+async def test_reserve_coalesces_repeated_requests_per_address():
+    outbox = EmailOutbox(FakeAsyncRedis())
+
+    assert await outbox.reserve(PASSWORD_RESET, "a@example.com")
+    assert not await outbox.reserve(PASSWORD_RESET, "A@example.com")
+    assert await outbox.reserve(VERIFY_EMAIL, "a@example.com")
+    assert await outbox.reserve(PASSWORD_RESET, "b@example.com")
+
+
+@pytest.mark.asyncio
+async def test_release_reopens_dedup_window():
+    outbox = EmailOutbox(FakeAsyncRedis())
+    await outbox.reserve(VERIFY_EMAIL, "a@example.com")
+
+    await outbox.release(VERIFY_EMAIL, "A@example.com")
+
+    assert await outbox.reserve(VERIFY_EMAIL, "a@example.com")
+
+
+@pytest.mark.asyncio
+async def test_reserve_fails_open_without_redis():
+    redis = AsyncMock()
+    redis.set.side_effect = ConnectionError("down")
+
+    assert await EmailOutbox(redis).reserve(VERIFY_EMAIL, "a@example.com")
@@ -0,0 +1,87 @@
+import pytest
+import fakeredis
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
+from redis.exceptions import ConnectionError
+from src.services.auth import create_access_token
+from src.services.rate_limit import RateLimiter, rate_limit, rate_limit_keys
+
+
+@pytest.fixture
+def limiter():
+    return RateLimiter(fakeredis.FakeAsyncRedis(), rate=1, capacity=10)
+
+
+def make_request(authorization: str = ""):
+    request = MagicMock()
+    request.client.host = "127.0.0.1"
+    request.headers = {"authorization": authorization} if authorization else {}
+    return request
+
+
+@pytest.mark.asyncio
+async def test_acquire_until_bucket_is_empty(limiter):
+    assert await limiter.acquire(["bucket"], 6) == 0
+    wait = await limiter.acquire(["bucket"], 6)
+    assert 0 < wait <= 2
+
+
+@pytest.mark.asyncio
+async def test_acquire_charges_all_buckets_or_none(limiter):
+    assert await limiter.acquire(["user"], 8) == 0
+    assert await limiter.acquire(["ip", "user"], 5) > 0
+    assert await limiter.acquire(["ip"], 10) == 0
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_keys_include_user():
+    token = await create_access_token({"sub": "testuser"})
+    keys = rate_limit_keys(make_request(f"Bearer {token}"))
+    assert keys == ["rate_limit:ip:127.0.0.1", "rate_limit:user:testuser"]
+
+
+def test_rate_limit_keys_ignore_invalid_token():
+    keys = rate_limit_keys(make_request("Bearer invalid.token.here"))
+    assert keys == ["rate_limit:ip:127.0.0.1"]
+
+
+@pytest.mark.parametrize(
+    "trusted, expected",
+    [
+        ("testclient", "rate_limit:ip:203.0.113.7"),
+        ("10.0.0.1", "rate_limit:ip:testclient"),
+    ],
+)
+def test_rate_limit_keys_use_forwarded_ip_from_trusted_proxy(trusted, expected):
+    app = FastAPI()
+    app.add_middleware(ProxyHeadersMiddleware, trusted_hosts=trusted)
+
+    @app.get("/keys")
+    def keys(request: Request):
+        return rate_limit_keys(request)
+
+    response = TestClient(app).get("/keys", headers={"X-Forwarded-For": "203.0.113.7"})
+
+    assert response.json() == [expected]
+
+
+@pytest.mark.asyncio
+@patch("src.services.rate_limit.limiter")
+async def test_rate_limit_rejects_with_retry_after(mock_limiter):
+    mock_limiter.acquire = AsyncMock(return_value=1.2)
+
+    with pytest.raises(HTTPException) as exc:
+        await rate_limit(5)(make_request())
+
+    assert exc.value.status_code == 429
+    assert exc.value.headers["Retry-After"] == "2"
+
+
+@pytest.mark.asyncio
+@patch("src.services.rate_limit.limiter")
+async def test_rate_limit_fails_open(mock_limiter):
+    mock_limiter.acquire = AsyncMock(side_effect=ConnectionError("down"))
+
+    assert await rate_limit(5)(make_request()) is None
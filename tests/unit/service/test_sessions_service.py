@@ -0,0 +1,102 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from src.repository.refresh_sessions import REUSED
+from src.services.auth import create_refresh_token, verify_refresh_token
+from src.services.sessions import RefreshSessionService
+from tests.unit.conftest import user
+
+
+@pytest.fixture
+def session_service():
+    service = RefreshSessionService(MagicMock())
+    service.repository = AsyncMock()
+    return service
+
+
+@pytest.mark.asyncio
+async def test_create_session_stores_new_family(session_service, user):
+    session_id, refresh_token = await session_service.create_session(
+        user, 2, "pytest"
+    )
+
+    payload = await verify_refresh_token(refresh_token)
+    session, ttl, previous_jti = session_service.repository.save.await_args.args
+    assert session["jti"] == payload["jti"]
+    assert session["family"] == payload["fam"] == session_id
+    assert session["username"] == "testuser"
+    assert session["device"] == "pytest"
+    assert session["epoch"] == 2
+    assert "claims" not in session
+    assert ttl == session_service.ttl
+    assert previous_jti is None
+
+
+@pytest.mark.asyncio
+async def test_rotate_issues_token_of_same_family(session_service):
+    refresh_token = await create_refresh_token(
+        {"sub": "testuser", "jti": "old", "fam": "family"}
+    )
+    session_service.repository.consume.return_value = {
+        "jti": "old",
+        "family": "family",
+        "username": "testuser",
+        "epoch": 1,
+        "device": None,
+        "created_at": "2025-01-01T00:00:00+00:00",
+    }
+
+    session, new_token = await session_service.rotate(refresh_token)
+
+    payload = await verify_refresh_token(new_token)
+    saved, _, previous_jti = session_service.repository.save.await_args.args
+    assert session["epoch"] == saved["epoch"] == 1
+    assert previous_jti == "old"
+    assert payload["fam"] == "family"
+    assert payload["jti"] != "old"
+    session_service.repository.consume.assert_awaited_once_with(
+        "old", session_service.ttl
+    )
+
+
+@pytest.mark.asyncio
+async def test_rotate_revoked_family(session_service):
+    refresh_token = await create_refresh_token(
+        {"sub": "testuser", "jti": "old", "fam": "family"}
+    )
+    session_service.repository.consume.return_value = {
+        "jti": "old",
+        "family": "family",
+        "username": "testuser",
+        "epoch": 1,
+        "device": None,
+        "created_at": "2025-01-01T00:00:00+00:00",
+    }
+    session_service.repository.save.return_value = False
+
+    assert await session_service.rotate(refresh_token) is None
+    assert session_service.repository.save.await_args.args[2] == "old"
+
+
+@pytest.mark.asyncio
+async def test_rotate_reused_token_revokes_family(session_service):
+    refresh_token = await create_refresh_token(
+        {"sub": "testuser", "jti": "old", "fam": "family"}
+    )
+    session_service.repository.consume.return_value = REUSED
+
+    assert await session_service.rotate(refresh_token) is None
+    session_service.repository.revoke_family.assert_awaited_once_with(
+        "testuser", "family"
+    )
+    session_service.repository.save.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_rotate_unknown_token(session_service):
+    refresh_token = await create_refresh_token(
+        {"sub": "testuser", "jti": "gone", "fam": "family"}
+    )
+    session_service.repository.consume.return_value = None
+
+    assert await session_service.rotate(refresh_token) is None
+    session_service.repository.revoke_family.assert_not_awaited()
@@ -0,0 +1,77 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from aiosmtplib import SMTPRecipientsRefused, SMTPServerDisconnected
+from fastapi_mail.errors import ConnectionErrors
+
+from src.services.email import conf
+from src.services.smtp import SMTPConnectionPool
+
+
+def make_client():
+    client = MagicMock()
+    client.is_connected = True
+    client.send_message = AsyncMock()
+    client.quit = AsyncMock()
+    return client
+
+
+@pytest.mark.asyncio
+async def test_send_many_reuses_one_connection():
+    pool = SMTPConnectionPool(conf, size=1)
+    client = make_client()
+
+    with patch.object(pool, "_connect", AsyncMock(return_value=client)) as connect:
+        assert await pool.send_many(["m1", "m2", "m3"]) == [None, None, None]
+        await pool.send("m4")
+
+    connect.assert_awaited_once()
+    assert client.send_message.await_count == 4
+
+
+@pytest.mark.asyncio
+async def test_send_reconnects_when_server_drops_connection():
+    pool = SMTPConnectionPool(conf, size=1)
+    dropped, fresh = make_client(), make_client()
+    dropped.send_message.side_effect = SMTPServerDisconnected("gone")
+
+    with patch.object(pool, "_connect", AsyncMock(side_effect=[dropped, fresh])):
+        await pool.send("message")
+
+    dropped.quit.assert_awaited_once()
+    fresh.send_message.assert_awaited_once_with("message")
+
+
+@pytest.mark.asyncio
+async def test_rejected_message_does_not_stop_batch():
+    pool = SMTPConnectionPool(conf, size=1)
+    client = make_client()
+    rejected = SMTPRecipientsRefused([])
+    client.send_message.side_effect = [None, rejected, None]
+
+    with patch.object(pool, "_connect", AsyncMock(return_value=client)):
+        assert await pool.send_many(["m1", "m2", "m3"]) == [None, rejected, None]
+
+
+@pytest.mark.asyncio
+async def test_connection_is_replaced_after_max_messages():
+    pool = SMTPConnectionPool(conf, size=1, max_messages=2)
+    first, second = make_client(), make_client()
+
+    with patch.object(pool, "_connect", AsyncMock(side_effect=[first, second])):
+        await pool.send_many(["m1", "m2"])
+        await pool.send("m3")
+
+    first.quit.assert_awaited_once()
+    second.send_message.assert_awaited_once_with("m3")
+
+
+@pytest.mark.asyncio
+async def test_send_raises_when_server_unreachable():
+    pool = SMTPConnectionPool(conf, size=1)
+
+    with patch.object(
+        pool, "_connect", AsyncMock(side_effect=ConnectionErrors("refused"))
+    ):
+        with pytest.raises(ConnectionErrors):
+            await pool.send("message")
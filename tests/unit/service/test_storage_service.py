@@ -0,0 +1,67 @@
+import hashlib
+from unittest.mock import MagicMock, patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.services.storage import (
+    CloudinaryStorage,
+    ImmutableStaticFiles,
+    LocalStorage,
+    content_key,
+)
+
+
+def test_content_key_is_sha256_of_bytes():
+    assert content_key(b"data") == (
+        f"avatars/{hashlib.sha256(b'data').hexdigest()}.webp"
+    )
+
+
+def test_local_storage_store(tmp_path):
+    storage = LocalStorage(str(tmp_path), "/media/")
+
+    url = storage.store(b"avatar")
+
+    key = content_key(b"avatar")
+    assert url == f"/media/{key}"
+    assert (tmp_path / key).read_bytes() == b"avatar"
+    assert storage.exists(key)
+
+
+@patch("cloudinary.uploader.upload")
+def test_cloudinary_storage_skips_existing_upload(mock_upload):
+    storage = CloudinaryStorage("demo", "key", "secret", timeout=5)
+    storage._http = MagicMock()
+    storage._http.request.return_value.status = 200
+
+    url = storage.store(b"avatar")
+
+    mock_upload.assert_not_called()
+    digest = hashlib.sha256(b"avatar").hexdigest()
+    assert url.endswith(f"RestApp/avatars/{digest}.webp")
+
+
+@patch("cloudinary.uploader.upload")
+def test_cloudinary_storage_uploads_missing_object(mock_upload):
+    storage = CloudinaryStorage("demo", "key", "secret", timeout=5)
+    storage._http = MagicMock()
+    storage._http.request.return_value.status = 404
+
+    storage.store(b"avatar")
+
+    digest = hashlib.sha256(b"avatar").hexdigest()
+    mock_upload.assert_called_once_with(
+        b"avatar", public_id=f"RestApp/avatars/{digest}", overwrite=False, timeout=5
+    )
+
+
+def test_media_mount_sends_immutable_cache_headers(tmp_path):
+    (tmp_path / "a.webp").write_bytes(b"avatar")
+    app = FastAPI()
+    app.mount("/media", ImmutableStaticFiles(directory=tmp_path), name="media")
+
+    response = TestClient(app).get("/media/a.webp")
+
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
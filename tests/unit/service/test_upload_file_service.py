@@ -1,21 +1,70 @@
+import asyncio
+import threading
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import MagicMock, patch
 from io import BytesIO
+from fastapi import HTTPException, UploadFile
+from PIL import Image
+from src.services import upload_file
+from src.services.storage import LocalStorage
 from src.services.upload_file import UploadFileService
 
+
+def photo(color="red"):
+    buffer = BytesIO()
+    Image.new("RGB", (1200, 900), color).save(buffer, format="JPEG")
+    buffer.seek(0)
+    return UploadFile(filename="avatar.jpg", file=buffer)
+
+
 @pytest.mark.asyncio
-@patch("cloudinary.uploader.upload")
-@patch("cloudinary.CloudinaryImage.build_url")
-def test_upload_file(mock_build_url, mock_upload):
-    file_mock = MagicMock()
-    file_mock.file = BytesIO(b"fake image data")
+async def test_upload_file(tmp_path):
+    service = UploadFileService(LocalStorage(str(tmp_path), "/media"))
+
+    result_url = await service.upload_file(photo())
+
+    assert result_url.startswith("/media/avatars/")
+    with Image.open(tmp_path / result_url.removeprefix("/media/")) as avatar:
+        assert avatar.format == "WEBP"
+        assert avatar.size == (250, 250)
+
+
+@pytest.mark.asyncio
+async def test_identical_upload_is_not_stored_again(tmp_path):
+    storage = LocalStorage(str(tmp_path), "/media")
+    service = UploadFileService(storage)
+
+    first = await service.upload_file(photo())
+    with patch.object(storage, "save") as save:
+        second = await service.upload_file(photo())
+        third = await service.upload_file(photo("blue"))
 
-    mock_upload.return_value = {"version": "123456"}
-    mock_build_url.return_value = "http://cloudinary.com/fake_image_url"
+    assert first == second
+    assert third != first
+    save.assert_called_once()
 
-    service = UploadFileService("demo_cloud", "demo_key", "demo_secret")
-    result_url = service.upload_file(file_mock, "testuser")
 
-    mock_upload.assert_called_once_with(file_mock.file, public_id="RestApp/testuser", overwrite=True)
-    mock_build_url.assert_called_once_with(width=250, height=250, crop="fill", version="123456")
-    assert result_url == "http://cloudinary.com/fake_image_url"
+@pytest.mark.asyncio
+async def test_upload_runs_off_event_loop():
+    threads = []
+
+    def store(data):
+        threads.append(threading.current_thread().name)
+        return "url"
+
+    storage = MagicMock()
+    storage.store.side_effect = store
+    await UploadFileService(storage).upload_file(photo())
+
+    assert threads[0].startswith("upload")
+
+
+@pytest.mark.asyncio
+@patch("src.services.upload_file.settings.UPLOAD_QUEUE_TIMEOUT", 0.01)
+async def test_upload_rejected_when_slots_exhausted():
+    with patch.object(upload_file, "_upload_slots", asyncio.Semaphore(0)):
+        service = UploadFileService(MagicMock())
+        with pytest.raises(HTTPException) as exc:
+            await service.upload_file(photo())
+
+    assert exc.value.status_code == 503
@@ -1,8 +1,12 @@
+import pickle
 import pytest
+import fakeredis
 from unittest.mock import AsyncMock, patch, MagicMock
+from src.services.auth import load_user
+from src.cache.revocation import RevocationList
 from src.services.users import UserService
 from src.schemas import UserCreate
-from src.database.models import User
+from src.database.models import User, UserRole
 from tests.unit.conftest import mock_session, user
 
 
@@ -13,6 +17,17 @@ def user_create():
     )
 
 
+@pytest.fixture(autouse=True)
+def redis(monkeypatch):
+    redis = fakeredis.FakeAsyncRedis()
+    monkeypatch.setattr("src.services.users.redis_client", redis)
+    monkeypatch.setattr("src.cache.cache_decorator.redis_client", redis)
+    monkeypatch.setattr(
+        "src.services.users.revocation_list", RevocationList(redis, sync_interval=60)
+    )
+    return redis
+
+
 @pytest.fixture
 def user_service(mock_session):
     return UserService(mock_session)
@@ -121,3 +136,51 @@ async def test_reset_password(user_service, user):
         "test@example.com", "newpass"
     )
     assert user.username == "testuser"
+
+
+@pytest.mark.asyncio
+async def test_writes_drop_cached_user(user_service, user, redis):
+    user_service.repository.confirmed_email = AsyncMock(return_value=user)
+    user_service.repository.reset_password = AsyncMock(return_value=user)
+
+    for write in (
+        lambda: user_service.confirmed_email(user.email),
+        lambda: user_service.reset_password(user.email, "newpass"),
+    ):
+        await redis.set("user(testuser)", pickle.dumps(user))
+        await write()
+        assert await redis.get("user(testuser)") is None
+
+
+@pytest.mark.asyncio
+async def test_user_is_reloaded_after_avatar_update(user_service, user):
+    updated = User(id=1, username="testuser", email=user.email, avatar="new")
+    user_service.repository.update_avatar_url = AsyncMock(return_value=updated)
+
+    with patch("src.services.auth.UserService") as loader_class:
+        loader = loader_class.return_value
+        loader.get_user_by_username = AsyncMock(side_effect=[user, updated])
+
+        assert (await load_user("testuser", None)).avatar == "url"
+        assert (await load_user("testuser", None)).avatar == "url"
+        await user_service.update_avatar_url(user.email, "new")
+        assert (await load_user("testuser", None)).avatar == "new"
+
+    assert loader.get_user_by_username.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_update_role_publishes_profile_version(user_service, user, redis):
+    user.role = UserRole.USER
+    user.profile_version = 4
+    user_service.repository.update_role = AsyncMock(return_value=user)
+    reader = RevocationList(redis, sync_interval=60)
+
+    await user_service.update_role(user.email, UserRole.USER)
+    await reader.sync()
+
+    user_service.repository.update_role.assert_awaited_once_with(
+        user.email, UserRole.USER
+    )
+    assert reader.is_stale(user.id, 3) is True
+    assert reader.is_stale(user.id, 4) is False
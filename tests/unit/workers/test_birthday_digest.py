@@ -0,0 +1,82 @@
+import json
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from src.services.outbox import OUTBOX_STREAM
+from src.workers.birthday_digest import BirthdayDigestJob, next_birthday
+
+TODAY = date(2026, 12, 29)
+
+
+def row(user_id, first_name, birthday):
+    return SimpleNamespace(
+        user_id=user_id,
+        email=f"user{user_id}@example.com",
+        username=f"user{user_id}",
+        first_name=first_name,
+        last_name="Doe",
+        birthday=birthday,
+    )
+
+
+ROWS = [
+    row(1, "Jan", date(1990, 1, 2)),
+    row(1, "Dec", date(1985, 12, 30)),
+    row(2, "Ann", date(2000, 12, 31)),
+    row(3, "Bob", date(1970, 1, 1)),
+]
+
+
+def make_job(redis, rows):
+    job = BirthdayDigestJob(MagicMock(), redis)
+
+    async def stream(today, days, after_user_id):
+        for r in rows:
+            if r.user_id > after_user_id:
+                yield r
+
+    job.repository.stream_upcoming_birthdays = stream
+    return job
+
+
+async def queued_digests(redis):
+    return [
+        json.loads(fields[b"payload"])
+        for _, fields in await redis.xrange(OUTBOX_STREAM)
+    ]
+
+
+def test_next_birthday_wraps_into_next_year():
+    assert next_birthday(date(1990, 1, 2), TODAY) == date(2027, 1, 2)
+    assert next_birthday(date(1990, 12, 29), TODAY) == date(2026, 12, 29)
+    assert next_birthday(date(2000, 2, 29), date(2026, 2, 1)) == date(2026, 3, 1)
+
+
+@pytest.mark.asyncio
+async def test_one_digest_per_user_in_birthday_order():
+    redis = FakeAsyncRedis()
+
+    assert await make_job(redis, ROWS).run(TODAY) == 3
+
+    digests = await queued_digests(redis)
+    assert [d["email"] for d in digests] == [
+        "user1@example.com",
+        "user2@example.com",
+        "user3@example.com",
+    ]
+    assert [c["name"] for c in digests[0]["contacts"]] == ["Dec Doe", "Jan Doe"]
+    assert digests[0]["contacts"][1]["birthday"] == "02 January"
+
+
+@pytest.mark.asyncio
+async def test_rerun_resumes_after_checkpoint():
+    redis = FakeAsyncRedis()
+    await redis.set(BirthdayDigestJob.checkpoint_key(TODAY), 2)
+
+    assert await make_job(redis, ROWS).run(TODAY) == 1
+    assert [d["email"] for d in await queued_digests(redis)] == ["user3@example.com"]
+    assert await make_job(redis, ROWS).run(TODAY) == 0
@@ -0,0 +1,163 @@
+import asyncio
+import json
+import socket
+
+import pytest
+import pytest_asyncio
+from aiosmtpd.controller import Controller
+from aiosmtpd.handlers import Sink
+from fakeredis import FakeAsyncRedis
+from fastapi_mail import ConnectionConfig
+from redis.exceptions import ConnectionError
+
+from src.services import email
+from src.services.smtp import SMTPConnectionPool
+from src.services.outbox import (
+    DEAD_LETTER_STREAM,
+    OUTBOX_STREAM,
+    RETRY_QUEUE,
+    EmailOutbox,
+)
+from src.workers.email_worker import EmailWorker
+
+
+class RecordingHandler(Sink):
+    def __init__(self):
+        self.messages = []
+        self.sessions = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        self.sessions.append(session)
+        return "250 OK"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def local_config(port):
+    return ConnectionConfig(
+        MAIL_USERNAME="",
+        MAIL_PASSWORD="",
+        MAIL_FROM="noreply@example.com",
+        MAIL_PORT=port,
+        MAIL_SERVER="127.0.0.1",
+        MAIL_STARTTLS=False,
+        MAIL_SSL_TLS=False,
+        USE_CREDENTIALS=False,
+        VALIDATE_CERTS=False,
+        TEMPLATE_FOLDER=email.conf.TEMPLATE_FOLDER,
+    )
+
+
+@pytest.fixture
+def smtp_server():
+    handler = RecordingHandler()
+    port = free_port()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    handler.config = local_config(port)
+    yield handler
+    controller.stop()
+
+
+@pytest_asyncio.fixture
+async def redis():
+    client = FakeAsyncRedis()
+    yield client
+    await client.aclose()
+
+
+def make_worker(redis, config):
+    return EmailWorker(
+        redis,
+        consumer="test",
+        concurrency=2,
+        max_attempts=2,
+        retry_base_delay=0,
+        claim_idle_ms=0,
+        pool=SMTPConnectionPool(config, size=2),
+    )
+
+
+@pytest_asyncio.fixture
+async def worker(redis, smtp_server):
+    worker = make_worker(redis, smtp_server.config)
+    await worker.setup()
+    yield worker
+    await worker.pool.close()
+
+
+@pytest.mark.asyncio
+async def test_worker_delivers_queued_emails(worker, redis, smtp_server):
+    outbox = EmailOutbox(redis)
+    for i in range(6):
+        await outbox.send_verification(f"{i}@example.com", "alice", "http://h/")
+    await outbox.send_password_reset("reset@example.com", "token", "http://h/")
+
+    assert await worker.process_batch() == 7
+
+    recipients = {rcpt for m in smtp_server.messages for rcpt in m.rcpt_tos}
+    assert len(recipients) == 7
+    assert "reset@example.com" in recipients
+    # The batch is split across the two pooled connections.
+    assert len({m.peer for m in smtp_server.sessions}) == 2
+    assert await redis.xlen(OUTBOX_STREAM) == 0
+
+
+@pytest.mark.asyncio
+async def test_worker_retries_then_dead_letters(redis):
+    worker = make_worker(redis, local_config(free_port()))
+    await worker.setup()
+    await EmailOutbox(redis).send_verification("a@example.com", "alice", "http://h/")
+
+    await worker.process_batch()
+    assert await redis.zcard(RETRY_QUEUE) == 1
+
+    assert await worker.requeue_due() == 1
+    await worker.process_batch()
+
+    assert await redis.zcard(RETRY_QUEUE) == 0
+    dead = await redis.xrange(DEAD_LETTER_STREAM)
+    assert len(dead) == 1
+    assert json.loads(dead[0][1][b"payload"])["email"] == "a@example.com"
+    assert dead[0][1][b"attempts"] == b"2"
+
+
+@pytest.mark.asyncio
+async def test_worker_reclaims_unacknowledged_messages(worker, redis, smtp_server):
+    await EmailOutbox(redis).send_verification("a@example.com", "alice", "http://h/")
+    crashed = EmailWorker(redis, consumer="crashed")
+    await crashed.redis.xreadgroup(
+        "email-workers", "crashed", {OUTBOX_STREAM: ">"}, count=10
+    )
+
+    await asyncio.sleep(0.01)
+    assert await worker.claim_stale() == 1
+
+    assert smtp_server.messages[0].rcpt_tos == ["a@example.com"]
+    assert await redis.xlen(OUTBOX_STREAM) == 0
+
+
+@pytest.mark.asyncio
+async def test_worker_backs_off_on_redis_errors(redis, caplog):
+    worker = make_worker(redis, local_config(free_port()))
+    worker.error_backoff = 0.01
+    stop = asyncio.Event()
+    calls = []
+
+    async def flaky(block_ms=None):
+        calls.append(block_ms)
+        if len(calls) < 3:
+            raise ConnectionError("Redis is down")
+        stop.set()
+        return 0
+
+    worker.process_batch = flaky
+    await asyncio.wait_for(worker.run(stop, block_ms=10), 5)
+
+    assert len(calls) == 3
+    assert caplog.text.count("Email worker failed") == 2